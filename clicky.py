@@ -14,11 +14,7 @@ import os
 # Add the parent directory to path to allow importing modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from modules.input_manager import InputManager
-from modules.window_manager import WindowManager
-from modules.image_processor import ImageProcessor
-from modules.action_controller import ActionController
-from modules.cli import CLI
+from modules import __version__
 
 def main():
     """Main entry point for Clicky the Clicker."""
@@ -26,6 +22,14 @@ def main():
         print("Clicky the Clicker - An X11 autoclicker for window automation")
         print("============================================================")
         
+        # Show version without importing or initializing any of the components
+        if "--version" in sys.argv[1:]:
+            print(f"Clicky the Clicker v{__version__}")
+            print("An X11 autoclicker that clicks within specific application windows")
+            return 0
+        
+        from modules.cli import CLI
+        
         # Use the CLI module to handle command-line arguments and execution
         cli = CLI()
         exit_code = cli.run()
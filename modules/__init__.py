@@ -1,3 +1,5 @@
 """
 Clicky the Clicker - Modular X11 window autoclicker
 """
+
+__version__ = "1.0.0"
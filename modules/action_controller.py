@@ -17,6 +17,10 @@ from .window_manager import WindowManager
 from .image_processor import ImageProcessor
 from .error_recovery import ErrorRecoveryManager, RecoveryAction, RecoveryStrategy
 
+# Templates are looked for within this many pixels of where they were last found
+# before the whole screenshot is searched
+TEMPLATE_SEARCH_MARGIN = 128
+
 class ActionController:
     """
     Controls the execution of automation actions and sequences.
@@ -48,6 +52,9 @@ class ActionController:
         self.continuous_mode = False
         self.click_interval = 0.1  # Time between actions in seconds
         
+        # Region around the last match of each template, searched first next time
+        self._template_regions = {}
+        
         # Error recovery options
         self.enable_recovery = enable_recovery
         self.create_checkpoints = create_checkpoints
@@ -201,11 +208,14 @@ class ActionController:
                 
                 # Create checkpoint if enabled and it's time for one
                 if (self.enable_recovery and self.recovery_manager and self.create_checkpoints and
-                    action_index % checkpoint_interval == 0 and retry_count == 0):
+                    action_index % checkpoint_interval == 0 and retry_count == 0 and
+                    self.recovery_manager.checkpoint_due()):
+                    # Capture in the background, overlapping the action's own capture
+                    # and OCR; the checkpoint writer waits for the result
                     screenshot = None
                     if window_id:
                         try:
-                            screenshot = self.image_processor.capture_window_screenshot(window_id)
+                            screenshot = self.image_processor.capture_window_screenshot_async(window_id)
                         except Exception:
                             pass  # Ignore screenshot errors
                     
@@ -429,7 +439,7 @@ class ActionController:
                                 # Try clicking the target with grid pattern for better accuracy
                                 success = self._perform_grid_click(x, y + y_offset, window_id, action.get('button', 1))
                                 return success, action_desc
-
+                        
                         # OCR didn't find it or couldn't capture screenshot
                         # Try fixed positions as last resort
                         result = self._find_common_ui_element(text, window_id)
@@ -525,11 +535,16 @@ class ActionController:
                     
                     # Find template in screenshot
                     result = self.image_processor.find_template_in_screenshot(
-                        template, screenshot, threshold=action.get('threshold', 0.7)
+                        template, screenshot, threshold=action.get('threshold', 0.7),
+                        search_roi=self._template_regions.get(template)
                     )
                     
                     if result:
                         x, y, confidence = result
+                        self._template_regions[template] = (
+                            x - TEMPLATE_SEARCH_MARGIN, y - TEMPLATE_SEARCH_MARGIN,
+                            x + TEMPLATE_SEARCH_MARGIN, y + TEMPLATE_SEARCH_MARGIN
+                        )
                         
                         if self.debug_mode:
                             print(f"Found template at ({x}, {y}) with confidence {confidence:.2f}")
@@ -539,6 +554,7 @@ class ActionController:
                     else:
                         if self.debug_mode:
                             print(f"Template not found")
+                        self._template_regions.pop(template, None)
                         success = False
                 
                 elif action_type == 'type_text':
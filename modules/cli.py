@@ -8,91 +8,336 @@ Handles command-line arguments and user interaction for the autoclicker.
 import os
 import sys
 import time
+import signal
 import argparse
+import threading
 import json
-from typing import List, Dict, Any, Optional
+import string
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 
-from .input_manager import InputManager
-from .window_manager import WindowManager
-from .image_processor import ImageProcessor
-from .action_controller import ActionController
+from . import __version__
 from .config_manager import ConfigManager
-from .recorder import ActionRecorder, ActionAnalyzer
+
+# The components pull in Xlib, OpenCV and OCR libraries, so they are imported by
+# the factories that construct them, when a mode first needs them
+if TYPE_CHECKING:
+    from .action_controller import ActionController
+
+# Translation table dropping every ASCII character not allowed in a recording filename
+_FILENAME_SAFE = frozenset(string.ascii_letters + string.digits + ' _-')
+_FILENAME_TRANS = str.maketrans({c: None for c in map(chr, range(128)) if c not in _FILENAME_SAFE})
+
+# Command-line flags: flag -> (namespace attribute, value type, default, help text)
+FLAGS = {
+    '--debug': ('debug', bool, False,
+        "Enable debug output"),
+    '--version': ('version', bool, False,
+        "Show version information"),
+    '--window-id': ('window_id', int, None,
+        "X11 window ID to click within"),
+    '--window-name': ('window_name', str, None,
+        "Name of window to click within (partial match)"),
+    '--list-windows': ('list_windows', bool, False,
+        "List all window IDs and names"),
+    '--i3': ('i3', bool, False,
+        "Use i3 window manager compatible mode"),
+    '--config': ('config', str, None,
+        "Path to configuration file"),
+    '--list-configs': ('list_configs', bool, False,
+        "List available configurations"),
+    '--save-config': ('save_config', str, None,
+        "Save current sequence to a configuration file"),
+    '--record': ('record', bool, False,
+        "Record actions for later replay"),
+    '--record-output': ('record_output', str, None,
+        "File to save recorded actions to"),
+    '--no-keyboard': ('no_keyboard', bool, False,
+        "Don't record keyboard events"),
+    '--no-mouse': ('no_mouse', bool, False,
+        "Don't record mouse events"),
+    '--optimize': ('optimize', bool, False,
+        "Optimize recorded actions for reliability"),
+    '--interval': ('interval', float, 0.1,
+        "Interval between actions in seconds"),
+    '--loop': ('loop', bool, False,
+        "Loop the action sequence indefinitely"),
+    '--continuous': ('continuous', bool, False,
+        "Continuous mode: retry on failure"),
+    '--max-cycles': ('max_cycles', int, 0,
+        "Maximum number of cycles (0 = unlimited)"),
+    '--virtual-pointer': ('virtual_pointer', bool, False,
+        "Use virtual pointer (requires root)"),
+    '--send-event': ('send_event', bool, False,
+        "Send clicks straight to the window without moving the cursor (some applications ignore them)"),
+    '--test-click': ('test_click', bool, False,
+        "Test click in the center of the window"),
+    '--test-ocr': ('test_ocr', bool, False,
+        "Test OCR capabilities"),
+    '--test-template': ('test_template', str, None,
+        "Test template matching with the given image"),
+}
+
+def parse_flags(argv: List[str]) -> Optional[argparse.Namespace]:
+    """
+    Parse command-line flags from the FLAGS table without building an argparse parser.
+    
+    Args:
+        argv: Command-line arguments (without the program name)
+        
+    Returns:
+        Parsed arguments, or None if argparse has to handle them
+        (help requested, unknown flag, missing or invalid value)
+    """
+    values = {dest: default for dest, _, default, _ in FLAGS.values()}
+    
+    i = 0
+    count = len(argv)
+    while i < count:
+        flag, has_value, value = argv[i].partition('=')
+        spec = FLAGS.get(flag)
+        if spec is None:
+            return None
+        
+        dest, kind, _, _ = spec
+        i += 1
+        
+        if kind is bool:
+            if has_value:
+                return None
+            values[dest] = True
+            continue
+        
+        if not has_value:
+            if i == count:
+                return None
+            value = argv[i]
+            i += 1
+        
+        try:
+            values[dest] = kind(value)
+        except ValueError:
+            return None
+    
+    return argparse.Namespace(**values)
+
+class _LazyComponents:
+    """
+    Constructs named components on first access and caches them.
+    """
+    
+    def __init__(self, factories: Dict[str, Any]):
+        """
+        Initialize the resolver.
+        
+        Args:
+            factories: Mapping of component name to a zero-argument constructor
+        """
+        self._factories = factories
+    
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names not yet cached as instance attributes
+        try:
+            factory = self.__dict__['_factories'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+        
+        component = factory()
+        setattr(self, name, component)
+        return component
 
 class CLI:
     """
     Command-line interface for the autoclicker.
     """
     
+    # Flags that select a single execution mode, in the order run() handles them
+    _MODE_FLAGS = (
+        '--version', '--list-windows', '--list-configs', '--test-click',
+        '--test-ocr', '--test-template', '--record', '--config', '--save-config'
+    )
+    
+    # Argument groups each mode needs on top of the general options.
+    # None means the full parser is required.
+    _MODE_GROUPS = {
+        '--version': (),
+        '--list-windows': ('window',),
+        '--list-configs': ('action',),
+        '--test-click': ('window', 'exec', 'test'),
+        '--test-ocr': ('window', 'exec', 'test'),
+        '--test-template': ('window', 'exec', 'test'),
+        '--record': ('window', 'record'),
+        '--config': None,
+        '--save-config': None,
+    }
+    
+    # Flags defined by each argument group
+    _GROUP_FLAGS = {
+        'general': ('--debug', '--version'),
+        'window': ('--window-id', '--window-name', '--list-windows', '--i3'),
+        'action': ('--config', '--list-configs', '--save-config'),
+        'record': ('--record', '--record-output', '--no-keyboard', '--no-mouse', '--optimize'),
+        'exec': ('--interval', '--loop', '--continuous', '--max-cycles', '--virtual-pointer',
+                 '--send-event'),
+        'test': ('--test-click', '--test-ocr', '--test-template'),
+    }
+    
+    # Help titles of the argument groups
+    _GROUP_TITLES = {
+        'window': 'Window Selection',
+        'action': 'Action Configuration',
+        'record': 'Recording',
+        'exec': 'Execution Control',
+        'test': 'Testing and Debugging',
+    }
+    
     def __init__(self):
         """Initialize the CLI."""
-        self.parser = self._create_parser()
+        self.parser = None
         self.config_manager = ConfigManager()
     
-    def _create_parser(self) -> argparse.ArgumentParser:
+    def _sniff_mode(self, argv: List[str]) -> Optional[str]:
+        """
+        Determine the execution mode from the raw arguments without building a parser.
+        
+        Args:
+            argv: Command-line arguments (without the program name)
+            
+        Returns:
+            The first mode flag found, or None if the full parser is needed
+        """
+        if '-h' in argv or '--help' in argv:
+            return None
+        
+        flags = {arg.split('=', 1)[0] for arg in argv if arg.startswith('-')}
+        for mode in self._MODE_FLAGS:
+            if mode in flags:
+                groups = self._MODE_GROUPS[mode]
+                if groups is None:
+                    return None
+                
+                # Fall back to the full parser if any flag lies outside this mode
+                allowed = set(self._GROUP_FLAGS['general'])
+                for group in groups:
+                    allowed.update(self._GROUP_FLAGS[group])
+                if not flags <= allowed:
+                    return None
+                return mode
+        
+        return None
+    
+    def _create_parser(self, mode: Optional[str] = None,
+                       help_requested: bool = False) -> argparse.ArgumentParser:
         """
         Create the argument parser.
         
+        Args:
+            mode: Execution mode from _sniff_mode (builds the full parser if None)
+            help_requested: Whether help will be printed (shows defaults in help text)
+        
         Returns:
             Configured argument parser
         """
-        parser = argparse.ArgumentParser(
-            description="Clicky the Clicker - An X11 autoclicker that clicks within specific application windows",
-            formatter_class=argparse.ArgumentDefaultsHelpFormatter
-        )
+        parser = self._base_parser(help_requested)
         
-        # General options
-        parser.add_argument('--debug', action='store_true', help="Enable debug output")
-        parser.add_argument('--version', action='store_true', help="Show version information")
+        groups = self._MODE_GROUPS.get(mode) if mode else None
+        if groups is None:
+            groups = ('window', 'action', 'record', 'exec', 'test')
         
-        # Window selection
-        window_group = parser.add_argument_group('Window Selection')
-        window_group.add_argument('--window-id', type=int, help="X11 window ID to click within")
-        window_group.add_argument('--window-name', type=str, help="Name of window to click within (partial match)")
-        window_group.add_argument('--list-windows', action='store_true', help="List all window IDs and names")
-        window_group.add_argument('--i3', action='store_true', help="Use i3 window manager compatible mode")
+        for group in groups:
+            self._add_group(parser, group)
         
-        # Action configuration
-        action_group = parser.add_argument_group('Action Configuration')
-        action_group.add_argument('--config', type=str, help="Path to configuration file")
-        action_group.add_argument('--list-configs', action='store_true', help="List available configurations")
-        action_group.add_argument('--save-config', type=str, help="Save current sequence to a configuration file")
+        parser.set_defaults(**{dest: default for dest, _, default, _ in FLAGS.values()})
+        return parser
+    
+    def _base_parser(self, help_requested: bool = False) -> argparse.ArgumentParser:
+        """
+        Create a parser holding only the general options.
         
-        # Recording options
-        record_group = parser.add_argument_group('Recording')
-        record_group.add_argument('--record', action='store_true', help="Record actions for later replay")
-        record_group.add_argument('--record-output', type=str, help="File to save recorded actions to")
-        record_group.add_argument('--no-keyboard', action='store_true', help="Don't record keyboard events")
-        record_group.add_argument('--no-mouse', action='store_true', help="Don't record mouse events")
-        record_group.add_argument('--optimize', action='store_true', help="Optimize recorded actions for reliability")
+        Args:
+            help_requested: Whether help will be printed (shows defaults in help text)
         
-        # Execution control
-        exec_group = parser.add_argument_group('Execution Control')
-        exec_group.add_argument('--interval', type=float, default=0.1, help="Interval between actions in seconds")
-        exec_group.add_argument('--loop', action='store_true', help="Loop the action sequence indefinitely")
-        exec_group.add_argument('--continuous', action='store_true', help="Continuous mode: retry on failure")
-        exec_group.add_argument('--max-cycles', type=int, default=0, help="Maximum number of cycles (0 = unlimited)")
-        exec_group.add_argument('--virtual-pointer', action='store_true', help="Use virtual pointer (requires root)")
+        Returns:
+            Argument parser with general options
+        """
+        parser = argparse.ArgumentParser(
+            description="Clicky the Clicker - An X11 autoclicker that clicks within specific application windows",
+            formatter_class=(argparse.ArgumentDefaultsHelpFormatter if help_requested
+                             else argparse.HelpFormatter)
+        )
         
-        # Testing and debugging
-        test_group = parser.add_argument_group('Testing and Debugging')
-        test_group.add_argument('--test-click', action='store_true', help="Test click in the center of the window")
-        test_group.add_argument('--test-ocr', action='store_true', help="Test OCR capabilities")
-        test_group.add_argument('--test-template', type=str, help="Test template matching with the given image")
+        # General options
+        for flag in self._GROUP_FLAGS['general']:
+            parser.add_argument(flag, action='store_true', help=FLAGS[flag][3])
         
         return parser
     
+    def _add_group(self, parser: argparse.ArgumentParser, group: str) -> None:
+        """
+        Add an argument group to the parser from the FLAGS table.
+        
+        Args:
+            parser: Parser to add the group to
+            group: Name of the group in _GROUP_FLAGS
+        """
+        arg_group = parser.add_argument_group(self._GROUP_TITLES[group])
+        for flag in self._GROUP_FLAGS[group]:
+            _, kind, default, help_text = FLAGS[flag]
+            if kind is bool:
+                arg_group.add_argument(flag, action='store_true', help=help_text)
+            else:
+                arg_group.add_argument(flag, type=kind, default=default, help=help_text)
+    
     def parse_args(self, args: Optional[List[str]] = None) -> argparse.Namespace:
         """
         Parse command-line arguments.
         
+        Arguments are parsed from the FLAGS table directly. An argparse parser
+        is only built when that fails, to print help or a usage error; it then
+        holds just the argument groups needed for the requested mode.
+        
         Args:
             args: Command-line arguments (uses sys.argv if None)
             
         Returns:
             Parsed arguments
         """
-        return self.parser.parse_args(args)
+        argv = sys.argv[1:] if args is None else list(args)
+        
+        parsed = parse_flags(argv)
+        if parsed is not None:
+            return parsed
+        
+        help_requested = '-h' in argv or '--help' in argv
+        self.parser = self._create_parser(self._sniff_mode(argv), help_requested)
+        return self.parser.parse_args(argv)
+    
+    def _create_action_controller(self, components: '_LazyComponents',
+                                  args: argparse.Namespace) -> 'ActionController':
+        """
+        Create the action controller with the execution parameters from the arguments.
+        
+        Args:
+            components: Lazily constructed components to wire into the controller
+            args: Parsed arguments
+            
+        Returns:
+            Configured action controller
+        """
+        from .action_controller import ActionController
+        
+        action_controller = ActionController(
+            input_manager=components.input_manager,
+            window_manager=components.window_manager,
+            image_processor=components.image_processor,
+            debug_mode=args.debug
+        )
+        
+        # Set execution parameters
+        action_controller.loop_actions = args.loop
+        action_controller.continuous_mode = args.continuous
+        action_controller.click_interval = args.interval
+        
+        return action_controller
     
     def run(self, args: Optional[argparse.Namespace] = None) -> int:
         """
@@ -110,25 +355,44 @@ class CLI:
         try:
             # Show version and exit
             if args.version:
-                print("Clicky the Clicker v1.0.0")
+                print(f"Clicky the Clicker v{__version__}")
                 print("An X11 autoclicker that clicks within specific application windows")
                 return 0
             
-            # Initialize components with debug mode if specified
-            window_manager = WindowManager(is_i3=args.i3, debug_mode=args.debug)
-            input_manager = InputManager(use_virtual_pointer=args.virtual_pointer, debug_mode=args.debug)
-            image_processor = ImageProcessor(debug_mode=args.debug)
+            # Components are imported and constructed with debug mode if specified,
+            # on first use, so each mode only pays for the ones it needs
+            def create_window_manager():
+                from .window_manager import WindowManager
+                return WindowManager(is_i3=args.i3, debug_mode=args.debug)
+            
+            def create_input_manager():
+                from .input_manager import InputManager
+                return InputManager(use_virtual_pointer=args.virtual_pointer,
+                                    debug_mode=args.debug,
+                                    use_send_event=args.send_event)
+            
+            def create_image_processor():
+                from .image_processor import ImageProcessor
+                return ImageProcessor(debug_mode=args.debug)
+            
+            components = _LazyComponents({
+                'window_manager': create_window_manager,
+                'input_manager': create_input_manager,
+                'image_processor': create_image_processor,
+                'action_controller': lambda: self._create_action_controller(components, args),
+            })
             
             # List windows and exit
             if args.list_windows:
-                windows = window_manager.list_windows()
+                windows = components.window_manager.list_windows()
                 if not windows:
                     print("No windows found")
                     return 1
                 
-                print("Available windows:")
-                for window in windows:
-                    print(f"  ID: {window['id']}, Name: {window['name']}")
+                # Write the listing in one call rather than one print per window
+                lines = ["Available windows:"]
+                lines.extend(f"  ID: {window['id']}, Name: {window['name']}" for window in windows)
+                sys.stdout.write("\n".join(lines) + "\n")
                 return 0
             
             # List configurations and exit
@@ -138,32 +402,20 @@ class CLI:
                     print("No configurations found")
                     return 1
                 
-                print("Available configurations:")
-                for config in configs:
-                    print(f"  {config}")
+                lines = ["Available configurations:"]
+                lines.extend(f"  {config}" for config in configs)
+                sys.stdout.write("\n".join(lines) + "\n")
                 return 0
             
-            # Create action controller
-            action_controller = ActionController(
-                input_manager=input_manager,
-                window_manager=window_manager,
-                image_processor=image_processor,
-                debug_mode=args.debug
-            )
-            
-            # Set execution parameters
-            action_controller.loop_actions = args.loop
-            action_controller.continuous_mode = args.continuous
-            action_controller.click_interval = args.interval
-            
             # Get window ID
             window_id = None
             if args.window_id:
                 window_id = args.window_id
             elif args.window_name:
-                windows = window_manager.list_windows()
+                windows = components.window_manager.list_windows()
+                needle = args.window_name.lower()
                 for window in windows:
-                    if args.window_name.lower() in window['name'].lower():
+                    if needle in window['name'].lower():
                         window_id = window['id']
                         print(f"Using window: {window['name']} (ID: {window_id})")
                         break
@@ -174,7 +426,7 @@ class CLI:
             
             # Test click in center of window
             if args.test_click and window_id:
-                window = window_manager.get_window_by_id(window_id)
+                window = components.window_manager.get_window_by_id(window_id)
                 if not window:
                     print(f"Window ID {window_id} not found")
                     return 1
@@ -183,7 +435,7 @@ class CLI:
                 center_y = window['height'] // 2
                 
                 print(f"Testing click at center of window: ({center_x}, {center_y})")
-                success = input_manager.click(center_x, center_y, window_id=window_id)
+                success = components.input_manager.click(center_x, center_y, window_id=window_id)
                 
                 if success:
                     print("Click successful")
@@ -195,7 +447,7 @@ class CLI:
             # Test OCR
             if args.test_ocr and window_id:
                 print("Testing OCR capabilities...")
-                screenshot = image_processor.capture_window_screenshot(window_id)
+                screenshot = components.image_processor.capture_window_screenshot(window_id)
                 if screenshot is None:
                     print("Failed to capture screenshot")
                     return 1
@@ -203,13 +455,13 @@ class CLI:
                 print("Screenshot captured. Please enter text to find:")
                 text = input("> ")
                 
-                result = image_processor.find_text_in_screenshot(text, screenshot)
+                result = components.image_processor.find_text_in_screenshot(text, screenshot)
                 if result:
                     x, y, confidence = result
                     print(f"Found text at ({x}, {y}) with confidence {confidence:.2f}")
                     
                     if input("Click on this position? (y/n) ").lower() == 'y':
-                        input_manager.click(x, y, window_id=window_id)
+                        components.input_manager.click(x, y, window_id=window_id)
                 else:
                     print(f"Text '{text}' not found")
                 
@@ -222,18 +474,18 @@ class CLI:
                     return 1
                 
                 print(f"Testing template matching with {args.test_template}...")
-                screenshot = image_processor.capture_window_screenshot(window_id)
+                screenshot = components.image_processor.capture_window_screenshot(window_id)
                 if screenshot is None:
                     print("Failed to capture screenshot")
                     return 1
                 
-                result = image_processor.find_template_in_screenshot(args.test_template, screenshot)
+                result = components.image_processor.find_template_in_screenshot(args.test_template, screenshot)
                 if result:
                     x, y, confidence = result
                     print(f"Found template at ({x}, {y}) with confidence {confidence:.2f}")
                     
                     if input("Click on this position? (y/n) ").lower() == 'y':
-                        input_manager.click(x, y, window_id=window_id)
+                        components.input_manager.click(x, y, window_id=window_id)
                 else:
                     print("Template not found")
                 
@@ -242,7 +494,7 @@ class CLI:
             # Load configuration
             if args.config:
                 # Use ActionController with ConfigManager for path resolution
-                success = action_controller.load_actions(
+                success = components.action_controller.load_actions(
                     config_file=args.config,
                     config_manager=self.config_manager
                 )
@@ -251,7 +503,7 @@ class CLI:
                     # Error message already printed by ConfigManager
                     return 1
                 
-                print(f"Loaded {len(action_controller.actions)} actions from configuration")
+                print(f"Loaded {len(components.action_controller.actions)} actions from configuration")
             
             # Recording functionality
             if args.record:
@@ -260,9 +512,10 @@ class CLI:
                     return 1
                 
                 # Initialize recorder
+                from .recorder import ActionRecorder, ActionAnalyzer
                 recorder = ActionRecorder(
-                    window_manager=window_manager,
-                    image_processor=image_processor,
+                    window_manager=components.window_manager,
+                    image_processor=components.image_processor,
                     debug_mode=args.debug
                 )
                 
@@ -296,12 +549,14 @@ class CLI:
                     print("Failed to start recording")
                     return 1
                 
+                # Wait for user to press Ctrl+C without waking up periodically
+                stop_event = threading.Event()
+                previous_handler = signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
                 try:
-                    # Wait for user to press Ctrl+C
-                    while True:
-                        time.sleep(0.5)
-                except KeyboardInterrupt:
-                    print("\nStopping recording...")
+                    stop_event.wait()
+                finally:
+                    signal.signal(signal.SIGINT, previous_handler)
+                print("\nStopping recording...")
                 
                 # Stop recording
                 actions = recorder.stop_recording()
@@ -316,8 +571,8 @@ class CLI:
                 # Optimize if requested
                 if args.optimize and len(actions) > 1:
                     analyzer = ActionAnalyzer(
-                        window_manager=window_manager,
-                        image_processor=image_processor,
+                        window_manager=components.window_manager,
+                        image_processor=components.image_processor,
                         debug_mode=args.debug
                     )
                     
@@ -328,12 +583,16 @@ class CLI:
                 output_file = args.record_output
                 if not output_file:
                     # Generate default filename based on window name and timestamp
-                    window = window_manager.get_window_by_id(window_id)
+                    window = components.window_manager.get_window_by_id(window_id)
                     window_name = window["name"] if window else "window"
                     timestamp = time.strftime("%Y%m%d_%H%M%S")
                     
                     # Sanitize window name for filename
-                    window_name = ''.join(c for c in window_name if c.isalnum() or c in ' _-').strip()
+                    window_name = window_name.translate(_FILENAME_TRANS)
+                    if not window_name.isascii():
+                        # Non-ASCII titles keep only their alphanumeric characters
+                        window_name = ''.join(c for c in window_name if c.isalnum() or c in ' _-')
+                    window_name = window_name.strip()
                     window_name = window_name.replace(' ', '_')
                     
                     output_file = f"{window_name}_{timestamp}.json"
@@ -355,11 +614,11 @@ class CLI:
             
             # Save configuration
             if args.save_config:
-                if not action_controller.actions:
+                if not components.action_controller.actions:
                     print("No actions to save")
                     return 1
                 
-                success = action_controller.save_actions(args.save_config)
+                success = components.action_controller.save_actions(args.save_config)
                 if not success:
                     print(f"Failed to save configuration: {args.save_config}")
                     return 1
@@ -368,11 +627,11 @@ class CLI:
                 return 0
             
             # Run automation if we have actions and a window
-            if action_controller.actions and window_id:
-                print(f"Running automation with {len(action_controller.actions)} actions")
-                stats = action_controller.run_automation(window_id, args.max_cycles)
+            if components.action_controller.actions and window_id:
+                print(f"Running automation with {len(components.action_controller.actions)} actions")
+                stats = components.action_controller.run_automation(window_id, args.max_cycles)
                 return 0
-            elif not action_controller.actions:
+            elif not components.action_controller.actions:
                 print("No actions to perform. Load a configuration with --config or create actions interactively.")
                 return 1
             elif not window_id:
@@ -7,14 +7,86 @@ Handles loading, saving, and managing configuration files for the autoclicker.
 
 import os
 import json
-import glob
+import hashlib
+import tempfile
+from collections.abc import Iterator
 from typing import List, Dict, Any, Optional
 
+# Check for optional dependencies
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
+# Directory under the user's cache home holding the listing index of each config directory
+INDEX_DIRNAME = 'clickytheclicker'
+
+def _dumps(value: Any) -> bytes:
+    """Serialize a value to compact JSON bytes."""
+    if HAVE_ORJSON:
+        return orjson.dumps(value)
+    return json.dumps(value).encode('utf-8')
+
+def _copy_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a configuration deeply enough that callers can edit its actions."""
+    actions = config.get('actions')
+    if not isinstance(actions, list):
+        return dict(config)
+    return {**config, 'actions': [dict(action) for action in actions]}
+
+def _index_path_for(config_dir: str) -> str:
+    """
+    Get the path of the listing index for a config directory.
+    
+    The index lives outside the config directory, so replacing it doesn't
+    change the directory mtime it is validated against.
+    
+    Args:
+        config_dir: Configuration directory
+        
+    Returns:
+        Path of the index file
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    digest = hashlib.sha1(os.path.abspath(config_dir).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_home, INDEX_DIRNAME, f'configs-{digest}.json')
+
+def write_config(config: Dict[str, Any], f) -> None:
+    """
+    Write a configuration to a binary file object.
+    
+    Actions are serialized and written one at a time, one per line, so long
+    recordings never have to be held in memory as a single JSON string. They may
+    also be given as an iterator, so callers needn't build a filtered copy.
+    
+    Args:
+        config: Configuration dictionary to write
+        f: File object opened in binary write mode
+    """
+    f.write(b'{')
+    for i, (key, value) in enumerate(config.items()):
+        f.write(b',\n  ' if i else b'\n  ')
+        f.write(_dumps(key) + b': ')
+        
+        if key == 'actions' and isinstance(value, (list, Iterator)):
+            f.write(b'[')
+            count = 0
+            for count, action in enumerate(value, start=1):
+                f.write(b',\n    ' if count > 1 else b'\n    ')
+                f.write(_dumps(action))
+            f.write(b'\n  ]' if count else b']')
+        else:
+            f.write(_dumps(value))
+    f.write(b'\n}\n')
+
 class ConfigManager:
     """
     Manages configuration files for the autoclicker.
     """
     
+    __slots__ = ("config_dir", "_index_path", "_list_cache", "_list_mtime", "_parsed_cache")
+    
     def __init__(self, config_dir: Optional[str] = None):
         """
         Initialize the configuration manager.
@@ -33,6 +105,16 @@ class ConfigManager:
         # Create config directory if it doesn't exist
         if not os.path.exists(self.config_dir):
             os.makedirs(self.config_dir, exist_ok=True)
+        
+        # Cached result of list_configs, valid while the directory mtime is unchanged.
+        # Seeded from the on-disk index on the first listing, so separate
+        # invocations can skip the scan; the path is set once it has been read.
+        self._index_path = None
+        self._list_cache = None
+        self._list_mtime = 0
+        
+        # Parsed configurations keyed by absolute path: (mtime_ns, config)
+        self._parsed_cache = {}
     
     def list_configs(self) -> List[str]:
         """
@@ -41,13 +123,66 @@ class ConfigManager:
         Returns:
             List of configuration filenames
         """
-        config_files = []
+        if self._index_path is None:
+            self._index_path = _index_path_for(self.config_dir)
+            self._read_index()
+        
+        # Adding, removing or renaming a file updates the directory mtime
+        st = os.stat(self.config_dir)
+        if self._list_cache is not None and st.st_mtime_ns == self._list_mtime:
+            return list(self._list_cache)
+        
+        # Get all JSON files in the config directory (hidden files excluded, as with glob).
+        # The suffix test needs no pattern matching, and is_file() answers from the
+        # directory entry type without a stat except for symlinks.
+        with os.scandir(self.config_dir) as entries:
+            config_files = [
+                entry.name for entry in entries
+                if entry.name.endswith('.json') and not entry.name.startswith('.')
+                and entry.is_file()
+            ]
         
-        # Get all JSON files in the config directory
-        json_pattern = os.path.join(self.config_dir, "*.json")
-        config_files = [os.path.basename(f) for f in glob.glob(json_pattern)]
+        self._list_cache = config_files
+        self._list_mtime = st.st_mtime_ns
+        self._write_index()
+        
+        return list(config_files)
+    
+    def _read_index(self) -> None:
+        """Load the cached listing from the on-disk index, if there is one."""
+        try:
+            with open(self._index_path, 'rb') as f:
+                data = f.read()
+            index = orjson.loads(data) if HAVE_ORJSON else json.loads(data)
+            files = index['files']
+            mtime = index['dir_mtime_ns']
+        except (OSError, ValueError, TypeError, KeyError):
+            return
+        
+        if isinstance(files, list) and isinstance(mtime, int):
+            self._list_cache = files
+            self._list_mtime = mtime
+    
+    def _write_index(self) -> None:
+        """Save the cached listing to the on-disk index (best effort)."""
+        # Write a temp file and rename it over the index, so concurrent readers
+        # see either the old index or the new one, never a truncated file
+        index_dir = os.path.dirname(self._index_path)
+        try:
+            os.makedirs(index_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=index_dir, prefix='.configs-', suffix='.tmp')
+        except OSError:
+            return
         
-        return config_files
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_dumps({'dir_mtime_ns': self._list_mtime, 'files': self._list_cache}))
+            os.replace(tmp_path, self._index_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
     
     def load_config(self, filename: str) -> Optional[Dict[str, Any]]:
         """
@@ -63,24 +198,43 @@ class ConfigManager:
         if not filename.endswith('.json'):
             filename += '.json'
         
-        # First, try with the path as provided
-        filepath = filename
-        
-        # If that doesn't exist and the filename doesn't have a directory path,
-        # try in the config directory
-        if not os.path.exists(filepath) and not os.path.dirname(filename):
-            filepath = os.path.join(self.config_dir, filename)
+        # First, try with the path as provided; if the filename doesn't have a
+        # directory path, fall back to the config directory
+        candidates = [filename]
+        if not os.path.dirname(filename):
+            candidates.append(os.path.join(self.config_dir, filename))
         
-        if not os.path.exists(filepath):
+        # The stat doubles as the existence check and the cache validator
+        for filepath in candidates:
+            try:
+                mtime = os.stat(filepath).st_mtime_ns
+                break
+            except FileNotFoundError:
+                continue
+        else:
             print(f"Configuration file not found: {filename}")
             print(f"Searched in: {filepath}")
             print(f"Config directory is: {self.config_dir}")
             return None
         
         try:
-            with open(filepath, 'r') as f:
-                config = json.load(f)
-            return config
+            # Reuse the parsed configuration if the file hasn't changed since
+            cache_key = os.path.abspath(filepath)
+            cached = self._parsed_cache.get(cache_key)
+            if cached is None or cached[0] != mtime:
+                if HAVE_ORJSON:
+                    with open(filepath, 'rb') as f:
+                        config = orjson.loads(f.read())
+                else:
+                    with open(filepath, 'r') as f:
+                        config = json.load(f)
+                
+                cached = (mtime, config)
+                self._parsed_cache[cache_key] = cached
+            
+            # Callers edit the returned actions, so hand out copies of those;
+            # the rest of the configuration is only read
+            return _copy_config(cached[1])
         except Exception as e:
             print(f"Error loading configuration: {e}")
             return None
@@ -107,8 +261,12 @@ class ConfigManager:
             filepath = filename
         
         try:
-            with open(filepath, 'w') as f:
-                json.dump(config, f, indent=2)
+            with open(filepath, 'wb') as f:
+                write_config(config, f)
+            
+            # The saved actions may have been streamed from an iterator, so the
+            # next load parses the file again rather than caching the argument
+            self._parsed_cache.pop(os.path.abspath(filepath), None)
             return True
         except Exception as e:
             print(f"Error saving configuration: {e}")
@@ -135,12 +293,12 @@ class ConfigManager:
             filepath = filename
         
         try:
-            if os.path.exists(filepath):
-                os.remove(filepath)
-                return True
-            else:
-                print(f"Configuration file not found: {filepath}")
-                return False
+            os.remove(filepath)
+            self._parsed_cache.pop(os.path.abspath(filepath), None)
+            return True
+        except FileNotFoundError:
+            print(f"Configuration file not found: {filepath}")
+            return False
         except Exception as e:
             print(f"Error deleting configuration: {e}")
             return False
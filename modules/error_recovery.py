@@ -6,16 +6,43 @@ Provides strategies for recovering from failures during automation.
 Implements retry logic, fallback actions, and checkpoint verification.
 """
 
+import io
 import os
 import time
 import json
 import logging
-from typing import List, Dict, Tuple, Optional, Any, Callable
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Tuple, Optional, Any, Callable, Iterable
 from enum import Enum
 
 from .window_manager import WindowManager
 from .image_processor import ImageProcessor
 
+# Shared logger, configured once at import rather than per manager
+_logger = logging.getLogger('error_recovery')
+if not _logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    _logger.addHandler(_handler)
+
+def _write_file(path: str, data) -> None:
+    """
+    Write a complete in-memory buffer to a file with as few syscalls as possible.
+    
+    Args:
+        path: Destination file path
+        data: Bytes-like object to write
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
 class RecoveryStrategy(Enum):
     """Types of recovery strategies."""
     RETRY = "retry"               # Simply retry the same action
@@ -58,8 +85,26 @@ class ErrorRecoveryManager:
     Manages error recovery for failed actions.
     """
     
+    # Default recoveries by action type. These instances are shared between
+    # calls, so callers must not modify their params.
+    _DEFAULT_RECOVERIES = {
+        # For text clicking, retry a few times with increasing delays
+        'click_text': RecoveryAction(RecoveryStrategy.WAIT_AND_RETRY, {'max_retries': 3, 'wait_time': 2.0}),
+        # For template matching, retry with wait
+        'click_template': RecoveryAction(RecoveryStrategy.WAIT_AND_RETRY, {'max_retries': 3, 'wait_time': 1.5}),
+        # For fixed position clicks, simple retry
+        'click_position': RecoveryAction(RecoveryStrategy.RETRY, {'max_retries': 2}),
+        # For typing, simple retry
+        'type_text': RecoveryAction(RecoveryStrategy.RETRY, {'max_retries': 2}),
+    }
+    
+    # Default strategy for other action types
+    _FALLBACK_RECOVERY = RecoveryAction(RecoveryStrategy.RETRY, {'max_retries': 1})
+    
     def __init__(self, window_manager: WindowManager, 
-                 image_processor: ImageProcessor, debug_mode: bool = False):
+                 image_processor: ImageProcessor, debug_mode: bool = False,
+                 checkpoint_dir: Optional[str] = None,
+                 min_checkpoint_interval: float = 0.5):
         """
         Initialize the error recovery manager.
         
@@ -67,24 +112,54 @@ class ErrorRecoveryManager:
             window_manager: WindowManager instance
             image_processor: ImageProcessor instance
             debug_mode: Whether to output debug information
+            checkpoint_dir: Directory for checkpoint screenshots (default: <app_dir>/config/checkpoints)
+            min_checkpoint_interval: Minimum seconds between checkpoints; more frequent
+                requests reuse the latest checkpoint
         """
         self.window_manager = window_manager
         self.image_processor = image_processor
         self.debug_mode = debug_mode
         
-        # Configure logging
-        self.logger = logging.getLogger('error_recovery')
-        if not self.logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
+        if checkpoint_dir is None:
+            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            checkpoint_dir = os.path.join(app_dir, "config", "checkpoints")
+        self.checkpoint_dir = checkpoint_dir
+        self._checkpoint_dir_created = False
         
+        # Configure logging
+        self.logger = _logger
         self.logger.setLevel(logging.DEBUG if debug_mode else logging.INFO)
         
         # Initialize checkpoint system
-        self.checkpoints = []
-        self.recovery_history = []
+        # Keep only the last 5 checkpoints to avoid using too much disk space
+        self.checkpoints = deque(maxlen=5)
+        
+        # Recent recovery attempts; the oldest are dropped to bound memory
+        self.recovery_history = deque(maxlen=1000)
+        
+        # Failure counts kept up to date with recovery_history
+        self._action_failures = Counter()
+        self._strategy_usage = Counter()
+        
+        # Throttle checkpoint creation so fast loops don't flood the disk
+        self.min_checkpoint_interval = min_checkpoint_interval
+        self._last_checkpoint_time = 0.0
+        
+        # Screenshots are encoded and written on a background thread, started on
+        # first use; pending writes are keyed by screenshot path
+        self._encode_pool = None
+        self._pending_writes = {}
+    
+    def checkpoint_due(self) -> bool:
+        """
+        Check whether create_checkpoint would record a new checkpoint now.
+        
+        Returns:
+            Whether the minimum interval since the last checkpoint has passed
+        """
+        if not self.checkpoints:
+            return True
+        return time.time() - self._last_checkpoint_time >= self.min_checkpoint_interval
     
     def create_checkpoint(self, action_index: int, 
                          window_id: Optional[int] = None,
@@ -95,66 +170,153 @@ class ErrorRecoveryManager:
         Args:
             action_index: Current action index
             window_id: Window ID for the checkpoint
-            screenshot: Optional screenshot at checkpoint time
+            screenshot: Optional screenshot at checkpoint time, or a Future of one
+                (e.g. from capture_window_screenshot_async) that is resolved on the
+                encode thread
             
         Returns:
-            Checkpoint dictionary
+            Checkpoint dictionary (the latest one if called again within
+            min_checkpoint_interval)
         """
+        now = time.time()
+        if self.checkpoints and now - self._last_checkpoint_time < self.min_checkpoint_interval:
+            return self.checkpoints[-1]
+        self._last_checkpoint_time = now
+        
         checkpoint = {
             'action_index': action_index,
             'window_id': window_id,
-            'timestamp': time.time(),
+            'timestamp': now,
         }
         
         # Take a screenshot if one wasn't provided
         if screenshot is None and window_id is not None:
             try:
                 screenshot = self.image_processor.capture_window_screenshot(window_id)
-                # Convert numpy array to PIL Image if needed
-                if hasattr(screenshot, 'shape') and not hasattr(screenshot, 'save'):
-                    import numpy as np
-                    from PIL import Image
-                    if isinstance(screenshot, np.ndarray):
-                        screenshot = Image.fromarray(screenshot)
                 self.logger.debug(f"Created checkpoint screenshot at action index {action_index}")
             except Exception as e:
                 self.logger.warning(f"Failed to capture checkpoint screenshot: {e}")
                 screenshot = None
         
         if screenshot is not None:
-            # Save the screenshot to a temporary file in the app directory
-            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            checkpoint_dir = os.path.join(app_dir, "config", "checkpoints")
-            os.makedirs(checkpoint_dir, exist_ok=True)
+            # Save the screenshot to a temporary file in the checkpoint directory,
+            # creating it on the first save only
+            if not self._checkpoint_dir_created:
+                os.makedirs(self.checkpoint_dir, exist_ok=True)
+                self._checkpoint_dir_created = True
             
             screenshot_path = os.path.join(
-                checkpoint_dir, 
-                f"checkpoint_{action_index}_{int(time.time())}.png"
+                self.checkpoint_dir, 
+                f"checkpoint_{action_index}_{int(checkpoint['timestamp'])}.png"
             )
             
-            try:
-                screenshot.save(screenshot_path)
-                checkpoint['screenshot_path'] = screenshot_path
-                self.logger.debug(f"Saved checkpoint screenshot to {screenshot_path}")
-            except Exception as e:
-                self.logger.warning(f"Failed to save checkpoint screenshot: {e}")
+            # Encode and write in the background so the next action isn't held up;
+            # the writer drops the path again if saving fails
+            checkpoint['screenshot_path'] = screenshot_path
+            if self._encode_pool is None:
+                self._encode_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='checkpoint')
+            self._pending_writes[screenshot_path] = self._encode_pool.submit(
+                self._encode_and_write, screenshot, checkpoint
+            )
+        
+        # Evict the oldest checkpoint (and its screenshot) before the deque drops it
+        if len(self.checkpoints) == self.checkpoints.maxlen:
+            self._remove_screenshots([self.checkpoints.popleft()])
         
         # Add to checkpoints list
         self.checkpoints.append(checkpoint)
         
-        # Keep only the last 5 checkpoints to avoid using too much disk space
-        if len(self.checkpoints) > 5:
-            old_checkpoint = self.checkpoints.pop(0)
-            if 'screenshot_path' in old_checkpoint:
-                try:
-                    if os.path.exists(old_checkpoint['screenshot_path']):
-                        os.remove(old_checkpoint['screenshot_path'])
-                        self.logger.debug(f"Removed old checkpoint screenshot {old_checkpoint['screenshot_path']}")
-                except Exception as e:
-                    self.logger.warning(f"Failed to remove old checkpoint screenshot: {e}")
-        
         return checkpoint
     
+    def _encode_and_write(self, screenshot: Any, checkpoint: Dict[str, Any]) -> None:
+        """
+        Encode a checkpoint screenshot and write it to disk (runs on the encode thread).
+        
+        If nothing is saved, the checkpoint's screenshot_path is removed so it
+        never points at a missing file.
+        
+        Args:
+            screenshot: Screenshot to save, or a Future of one
+            checkpoint: Checkpoint whose screenshot_path is the destination file path
+        """
+        screenshot_path = checkpoint['screenshot_path']
+        try:
+            if isinstance(screenshot, Future):
+                screenshot = screenshot.result()
+                if screenshot is None:
+                    self.logger.warning("Failed to capture checkpoint screenshot")
+                    checkpoint.pop('screenshot_path', None)
+                    return
+            
+            # Encode in memory, then hand the whole PNG to the kernel in one write
+            _write_file(screenshot_path, self._encode_screenshot(screenshot))
+            self.logger.debug(f"Saved checkpoint screenshot to {screenshot_path}")
+        except Exception as e:
+            self.logger.warning(f"Failed to save checkpoint screenshot: {e}")
+            checkpoint.pop('screenshot_path', None)
+    
+    def wait_for_checkpoints(self) -> None:
+        """Wait until all pending checkpoint screenshots have been written."""
+        for future in list(self._pending_writes.values()):
+            future.result()
+        self._pending_writes.clear()
+    
+    def _encode_screenshot(self, screenshot: Any):
+        """
+        Encode a checkpoint screenshot as PNG in memory.
+        
+        Args:
+            screenshot: PIL Image or numpy array (BGR, as captured by OpenCV)
+            
+        Returns:
+            Bytes-like PNG data
+        """
+        # Encode numpy arrays directly rather than copying them into a PIL Image first
+        if hasattr(screenshot, 'shape') and not hasattr(screenshot, 'save'):
+            try:
+                import cv2
+                ok, encoded = cv2.imencode('.png', screenshot, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+                if ok:
+                    return encoded
+            except ImportError:
+                pass
+            
+            from PIL import Image
+            screenshot = Image.fromarray(screenshot)
+        
+        # Checkpoints are only compared structurally, so a 128-color palette
+        # (fast octree) is enough and shrinks the PNG several times.
+        # Debug mode keeps full color for inspection.
+        if not self.debug_mode and getattr(screenshot, 'mode', None) in ('RGB', 'RGBA'):
+            screenshot = screenshot.quantize(colors=128, method=2)  # Image.Quantize.FASTOCTREE
+        
+        buffer = io.BytesIO()
+        screenshot.save(buffer, format='PNG')
+        return buffer.getbuffer()
+    
+    def _remove_screenshots(self, checkpoints: Iterable[Dict[str, Any]]) -> None:
+        """
+        Remove the screenshot files of the given checkpoints.
+        
+        Args:
+            checkpoints: Checkpoints whose screenshots should be deleted
+        """
+        paths = [path for path in (cp.get('screenshot_path') for cp in checkpoints) if path]
+        for path in paths:
+            # Let a pending write finish first so it can't recreate the file
+            future = self._pending_writes.pop(path, None)
+            if future is not None:
+                future.result()
+            
+            # Unlink directly; a file that is already gone needs no extra stat
+            try:
+                os.remove(path)
+                self.logger.debug(f"Removed checkpoint screenshot {path}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                self.logger.warning(f"Failed to remove checkpoint screenshot: {e}")
+    
     def get_latest_checkpoint(self) -> Optional[Dict[str, Any]]:
         """
         Get the most recent checkpoint.
@@ -176,10 +338,12 @@ class ErrorRecoveryManager:
         Returns:
             Checkpoint before specified action or None if no valid checkpoint
         """
-        valid_checkpoints = [cp for cp in self.checkpoints if cp['action_index'] < action_index]
-        if not valid_checkpoints:
-            return None
-        return valid_checkpoints[-1]
+        # Action indices aren't monotonic (loops restart and checkpoint recovery
+        # jumps back), so scan newest-first rather than bisecting
+        for checkpoint in reversed(self.checkpoints):
+            if checkpoint['action_index'] < action_index:
+                return checkpoint
+        return None
     
     def apply_recovery_strategy(self, failed_action: Dict[str, Any], 
                                recovery: RecoveryAction,
@@ -205,14 +369,21 @@ class ErrorRecoveryManager:
         
         self.logger.info(f"Applying recovery strategy: {strategy.value} for action at index {action_index}")
         
-        # Record recovery attempt
+        # Record recovery attempt, uncounting the entry the history is about to drop
+        action_type = failed_action.get('type', 'unknown')
+        if len(self.recovery_history) == self.recovery_history.maxlen:
+            evicted = self.recovery_history[0]
+            self._action_failures[evicted['action_type']] -= 1
+            self._strategy_usage[evicted['strategy']] -= 1
         self.recovery_history.append({
             'timestamp': time.time(),
             'action_index': action_index,
-            'action_type': failed_action.get('type', 'unknown'),
+            'action_type': action_type,
             'strategy': strategy.value,
             'params': params
         })
+        self._action_failures[action_type] += 1
+        self._strategy_usage[strategy.value] += 1
         
         # Apply the strategy
         if strategy == RecoveryStrategy.RETRY:
@@ -262,7 +433,7 @@ class ErrorRecoveryManager:
             action: Action to get recovery for
             
         Returns:
-            Recovery action
+            Recovery action (default recoveries are shared; don't modify their params)
         """
         # Check if action has explicit recovery instructions
         if 'on_failure' in action:
@@ -279,42 +450,7 @@ class ErrorRecoveryManager:
                 self.logger.warning(f"Invalid recovery strategy in action, using default")
         
         # Default recovery strategies based on action type
-        action_type = action.get('type', 'unknown')
-        
-        if action_type == 'click_text':
-            # For text clicking, retry a few times with increasing delays
-            return RecoveryAction(
-                RecoveryStrategy.WAIT_AND_RETRY,
-                {'max_retries': 3, 'wait_time': 2.0}
-            )
-            
-        elif action_type == 'click_template':
-            # For template matching, retry with wait
-            return RecoveryAction(
-                RecoveryStrategy.WAIT_AND_RETRY,
-                {'max_retries': 3, 'wait_time': 1.5}
-            )
-            
-        elif action_type == 'click_position':
-            # For fixed position clicks, simple retry
-            return RecoveryAction(
-                RecoveryStrategy.RETRY,
-                {'max_retries': 2}
-            )
-            
-        elif action_type == 'type_text':
-            # For typing, simple retry
-            return RecoveryAction(
-                RecoveryStrategy.RETRY,
-                {'max_retries': 2}
-            )
-            
-        else:
-            # Default strategy for other action types
-            return RecoveryAction(
-                RecoveryStrategy.RETRY,
-                {'max_retries': 1}
-            )
+        return self._DEFAULT_RECOVERIES.get(action.get('type', 'unknown'), self._FALLBACK_RECOVERY)
     
     def analyze_failure_pattern(self) -> Dict[str, Any]:
         """
@@ -326,21 +462,9 @@ class ErrorRecoveryManager:
         if not self.recovery_history:
             return {'patterns': [], 'recommendations': []}
         
-        # Count failures by action type and strategy
-        action_failures = {}
-        strategy_usage = {}
-        
-        for recovery in self.recovery_history:
-            action_type = recovery['action_type']
-            strategy = recovery['strategy']
-            
-            if action_type not in action_failures:
-                action_failures[action_type] = 0
-            action_failures[action_type] += 1
-            
-            if strategy not in strategy_usage:
-                strategy_usage[strategy] = 0
-            strategy_usage[strategy] += 1
+        # Failures by action type and strategy are counted as recoveries are applied
+        action_failures = {key: count for key, count in self._action_failures.items() if count > 0}
+        strategy_usage = {key: count for key, count in self._strategy_usage.items() if count > 0}
         
         # Identify patterns
         patterns = []
@@ -387,11 +511,9 @@ class ErrorRecoveryManager:
     def cleanup(self) -> None:
         """Clean up resources used by the error recovery manager."""
         # Remove checkpoint screenshots
-        for checkpoint in self.checkpoints:
-            if 'screenshot_path' in checkpoint:
-                try:
-                    if os.path.exists(checkpoint['screenshot_path']):
-                        os.remove(checkpoint['screenshot_path'])
-                        self.logger.debug(f"Removed checkpoint screenshot {checkpoint['screenshot_path']}")
-                except Exception as e:
-                    self.logger.warning(f"Failed to remove checkpoint screenshot: {e}")
+        self._remove_screenshots(self.checkpoints)
+        
+        # Stop the encode thread; it is restarted if more checkpoints are saved
+        if self._encode_pool is not None:
+            self._encode_pool.shutdown(wait=True)
+            self._encode_pool = None
@@ -6,11 +6,23 @@ Handles screenshot capture, text recognition (OCR), and template matching
 for finding UI elements within application windows.
 """
 
+import io
 import os
+import re
 import time
+import hashlib
+import itertools
+import shlex
+import shutil
+import struct
 import tempfile
+import functools
 import subprocess
-from typing import List, Tuple, Dict, Optional, Any, Union
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from difflib import SequenceMatcher
+from typing import List, Tuple, Dict, Optional, Any, Union, Callable
 import numpy as np
 
 # Check for optional dependencies
@@ -26,12 +38,347 @@ try:
 except ImportError:
     HAVE_PIL = False
 
+# Tesseract's OpenMP threading costs more than it gains on single pages and would
+# oversubscribe the CPU under concurrent OCR passes. Set before tesserocr loads the
+# library in-process; users who want it can still override the variable.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 try:
     import pytesseract
     HAVE_TESSERACT = True
 except ImportError:
     HAVE_TESSERACT = False
 
+try:
+    import tesserocr
+    HAVE_TESSEROCR = True
+except ImportError:
+    HAVE_TESSEROCR = False
+
+try:
+    import mss
+    from Xlib import display
+    HAVE_MSS = True
+except ImportError:
+    HAVE_MSS = False
+
+try:
+    import ahocorasick
+    HAVE_AHOCORASICK = True
+except ImportError:
+    HAVE_AHOCORASICK = False
+
+try:
+    from rapidfuzz import fuzz, process
+    HAVE_RAPIDFUZZ = True
+except ImportError:
+    HAVE_RAPIDFUZZ = False
+
+# Page segmentation modes for the OCR configurations run through tesserocr
+_TESSEROCR_PSM = {
+    "": 3,                 # Fully automatic page segmentation (tesseract default)
+    "--psm 6": 6,          # Assume single block of text
+    "--psm 7": 7,          # Treat the image as a single text line
+    "--psm 11 --oem 1": 11  # Sparse text detection
+}
+
+# Screenshots taller than this are downscaled before OCR
+OCR_MAX_HEIGHT = 1080
+
+# Templates need at least this many pixels per side at half resolution to be
+# searched coarse-to-fine; smaller ones lose too much detail when downsampled
+PYRAMID_MIN_TEMPLATE = 8
+
+# Coarse-to-fine template search starts at most this many halvings down, and
+# refines at most this many of the best coarse candidate regions
+PYRAMID_MAX_LEVELS = 3
+PYRAMID_MAX_CANDIDATES = 8
+
+# Direct matches at least this confident end the OCR sweep early
+EARLY_MATCH_CONFIDENCE = 0.85
+
+# Text regions are OCR'd one by one before the full-frame passes, as long as
+# there are at most this many and they cover at most this share of the frame
+OCR_MAX_REGIONS = 32
+OCR_MAX_REGION_AREA = 0.5
+
+# Where the fast integer LSTM models (tessdata_fast) are looked for. They read
+# UI text about as well as the default models in a fraction of the time.
+TESSDATA_FAST_DIRS = (
+    "/usr/share/tessdata_fast",
+    "/usr/share/tesseract-ocr/tessdata_fast",
+    "/usr/local/share/tessdata_fast",
+)
+
+# In-process tesseract engine, created on first use and shared by all callers
+_tesserocr_api = None
+_tesserocr_lock = threading.Lock()
+
+def _find_tessdata_fast() -> Optional[str]:
+    """
+    Find an installed copy of the fast English model (tessdata_fast).
+    
+    Returns:
+        Directory holding eng.traineddata from TESSDATA_FAST_DIRS, or None
+    """
+    for path in TESSDATA_FAST_DIRS:
+        if os.path.isfile(os.path.join(path, "eng.traineddata")):
+            return path
+    return None
+
+def _tesserocr_image_to_data(image: 'Image.Image', psm: int,
+                             tessdata_dir: Optional[str] = None) -> Dict[str, List[Any]]:
+    """
+    Run OCR in-process with tesserocr, returning word boxes like pytesseract's DICT output.
+    
+    Args:
+        image: PIL image to recognize
+        psm: Tesseract page segmentation mode
+        tessdata_dir: Directory to load the models from when the engine is created
+                      (default: tesserocr's own)
+        
+    Returns:
+        Dictionary with 'text', 'conf' (0-100), 'left', 'top', 'width' and 'height' lists
+    """
+    global _tesserocr_api
+    
+    data = {'text': [], 'conf': [], 'left': [], 'top': [], 'width': [], 'height': []}
+    level = tesserocr.RIL.WORD
+    
+    # The engine isn't thread-safe, so calls are serialized
+    with _tesserocr_lock:
+        if _tesserocr_api is None:
+            # LSTM only, as with --oem 1; the legacy engine's models are never loaded
+            kwargs = {'path': os.path.join(tessdata_dir, '')} if tessdata_dir else {}
+            _tesserocr_api = tesserocr.PyTessBaseAPI(lang='eng', oem=tesserocr.OEM.LSTM_ONLY, **kwargs)
+        api = _tesserocr_api
+        
+        api.SetPageSegMode(psm)
+        api.SetImage(image)
+        api.Recognize()
+        
+        for word in tesserocr.iterate_level(api.GetIterator(), level):
+            text = word.GetUTF8Text(level)
+            box = word.BoundingBox(level)
+            if text is None or box is None:
+                continue
+            
+            x1, y1, x2, y2 = box
+            data['text'].append(text)
+            data['conf'].append(word.Confidence(level))
+            data['left'].append(x1)
+            data['top'].append(y1)
+            data['width'].append(x2 - x1)
+            data['height'].append(y2 - y1)
+    
+    return data
+
+def _tesserocr_end() -> None:
+    """Release the shared tesserocr engine; the next OCR call creates a new one."""
+    global _tesserocr_api
+    
+    with _tesserocr_lock:
+        if _tesserocr_api is not None:
+            _tesserocr_api.End()
+            _tesserocr_api = None
+
+# Characters ignored when comparing OCR text
+_CLEAN_RE = re.compile(r'[^a-z0-9]')
+
+@functools.lru_cache(maxsize=4096)
+def _clean(text: str) -> str:
+    """Lowercase text and strip everything but ASCII letters and digits."""
+    return _CLEAN_RE.sub('', text.lower())
+
+def _fingerprint(image: Union[np.ndarray, 'Image.Image']) -> bytes:
+    """
+    Hash the pixels of a screenshot into a short cache key.
+    
+    Args:
+        image: Numpy array or PIL image
+        
+    Returns:
+        16-byte digest that changes whenever the size or any pixel changes
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(image, np.ndarray):
+        digest.update(repr((image.shape, image.dtype.str)).encode())
+        digest.update(np.ascontiguousarray(image))
+    else:
+        digest.update(repr((image.mode, image.size)).encode())
+        digest.update(image.tobytes())
+    return digest.digest()
+
+def _read_template(path: str) -> Optional[Tuple[np.ndarray, ...]]:
+    """
+    Decode a template image to grayscale along with its image pyramid.
+    
+    Args:
+        path: Path to template image
+        
+    Returns:
+        Tuple of the template followed by its pyrDown levels, halving in size down
+        to PYRAMID_MIN_TEMPLATE pixels per side and at most PYRAMID_MAX_LEVELS deep
+        (just the template if it is too small for a coarse search), or None if
+        the image could not be loaded
+    """
+    template = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if template is None:
+        return None
+    
+    levels = [template]
+    while len(levels) <= PYRAMID_MAX_LEVELS and min(levels[-1].shape[:2]) >= 2 * PYRAMID_MIN_TEMPLATE:
+        levels.append(cv2.pyrDown(levels[-1]))
+    
+    # The arrays are shared between callers through the cache
+    for level in levels:
+        level.flags.writeable = False
+    return tuple(levels)
+
+@functools.lru_cache(maxsize=64)
+def _read_template_cached(path: str, mtime_ns: int) -> Optional[Tuple[np.ndarray, ...]]:
+    """Cached _read_template; the modification time invalidates stale entries."""
+    return _read_template(path)
+
+def _load_template(path: str) -> Optional[Tuple[np.ndarray, ...]]:
+    """
+    Load a template image, reusing the decoded image while the file is unchanged.
+    
+    Args:
+        path: Path to template image
+        
+    Returns:
+        Same as _read_template
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        # Can't tell whether it changed, so don't cache it
+        return _read_template(path)
+    return _read_template_cached(path, mtime_ns)
+
+def _decode_xwd(data: bytes) -> Optional[np.ndarray]:
+    """
+    Decode a true-colour ZPixmap XWD dump, as written by xwd on common displays.
+    
+    Args:
+        data: Contents of the XWD file
+        
+    Returns:
+        RGB uint8 numpy array, or None for layouts this decoder doesn't handle
+    """
+    if len(data) < 100:
+        return None
+    
+    # The header is 25 big-endian CARD32 fields
+    header = struct.unpack('>25I', data[:100])
+    header_size, pixmap_format, width, height = header[0], header[2], header[4], header[5]
+    byte_order, bits_per_pixel, bytes_per_line = header[7], header[11], header[12]
+    masks, ncolors = header[14:17], header[19]
+    
+    # Only ZPixmap with 32-bit pixels and an 8-bit mask per channel
+    shifts = [(mask & -mask).bit_length() - 1 for mask in masks]
+    if pixmap_format != 2 or bits_per_pixel != 32:
+        return None
+    if any(mask == 0 or mask >> shift != 0xff for mask, shift in zip(masks, shifts)):
+        return None
+    
+    # Skip the window name and the colormap (12 bytes per entry)
+    offset = header_size + 12 * ncolors
+    if len(data) < offset + bytes_per_line * height:
+        return None
+    
+    pixels = np.frombuffer(data, dtype='<u4' if byte_order == 0 else '>u4',
+                           count=(bytes_per_line // 4) * height, offset=offset)
+    pixels = pixels.reshape(height, bytes_per_line // 4)[:, :width]
+    
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    for channel, shift in enumerate(shifts):
+        rgb[:, :, channel] = pixels >> shift  # truncated to the channel's 8 bits
+    return rgb
+
+# Columns of tesseract's TSV output that text search uses
+_TSV_COLUMNS = ('left', 'top', 'width', 'height', 'conf', 'text')
+
+def _parse_tsv(tsv: str, names: Tuple[str, ...] = _TSV_COLUMNS) -> Dict[str, List[str]]:
+    """
+    Extract the word box columns from tesseract's TSV output.
+    
+    Args:
+        tsv: TSV text with a header row
+        names: Columns to extract
+        
+    Returns:
+        Dictionary with a list of strings for each column in names
+    """
+    lines = tsv.splitlines()
+    if not lines:
+        return {name: [] for name in names}
+    
+    header = lines[0].split('\t')
+    width = len(header)
+    
+    # Rows without text may lack the trailing field; pad them before transposing
+    rows = [row if len(row) == width else row + [''] * (width - len(row))
+            for row in (line.split('\t') for line in lines[1:] if line)]
+    columns = list(zip(*rows)) if rows else [()] * width
+    
+    return {name: list(columns[header.index(name)]) for name in names}
+
+def _to_gray_ndarray(screenshot: Union[np.ndarray, 'Image.Image'],
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Convert a screenshot to a contiguous 8-bit grayscale array in one pass.
+    
+    Args:
+        screenshot: BGR/BGRA numpy array (as captured by OpenCV) or PIL image
+        out: Optional uint8 array to write the result into; only used for
+             BGR/BGRA input of the same height and width
+        
+    Returns:
+        Grayscale uint8 numpy array (out, if it was used)
+    """
+    if isinstance(screenshot, np.ndarray):
+        # Common capture layouts convert straight from BGR(A), no RGB copy in between
+        if screenshot.dtype == np.uint8 and screenshot.ndim == 3 and screenshot.shape[2] in (3, 4):
+            code = cv2.COLOR_BGR2GRAY if screenshot.shape[2] == 3 else cv2.COLOR_BGRA2GRAY
+            if out is not None and out.shape == screenshot.shape[:2]:
+                return cv2.cvtColor(screenshot, code, dst=out)
+            return cv2.cvtColor(screenshot, code)
+        if screenshot.ndim == 2:
+            return np.ascontiguousarray(screenshot, dtype=np.uint8)
+        return cv2.cvtColor(np.ascontiguousarray(screenshot, dtype=np.uint8), cv2.COLOR_BGR2GRAY)
+    
+    # PIL does the luma conversion itself, so only one channel is copied out
+    return np.ascontiguousarray(screenshot.convert('L'))
+
+def _gray_to_pil(gray: np.ndarray) -> 'Image.Image':
+    """
+    Wrap a contiguous grayscale array as a PIL image without copying it.
+    
+    Args:
+        gray: Contiguous 2-D uint8 numpy array
+        
+    Returns:
+        Read-only PIL image sharing the array's memory
+    """
+    height, width = gray.shape
+    return Image.frombuffer('L', (width, height), gray, 'raw', 'L', 0, 1)
+
+def _save_pnm(image: 'Image.Image', path: str) -> None:
+    """
+    Write an image for tesseract as PGM or PPM.
+    
+    PNM is uncompressed, so cheap to write and for tesseract to read.
+    
+    Args:
+        image: PIL image
+        path: Destination file path
+    """
+    if image.mode not in ('L', 'RGB'):
+        image = image.convert('L' if image.mode == '1' else 'RGB')
+    image.save(path, format='PPM')
+
 class ImageProcessor:
     """
     Handles image processing tasks like OCR and template matching.
@@ -47,15 +394,65 @@ class ImageProcessor:
         self.debug_mode = debug_mode
         
         # Check for required dependencies
-        self.has_ocr = HAVE_TESSERACT
+        self.has_ocr = HAVE_TESSERACT or HAVE_TESSEROCR
+        self.use_tesserocr = HAVE_TESSEROCR
+        
+        # Fast LSTM models, used instead of the default ones when installed
+        self.tessdata_dir = _find_tessdata_fast() if self.has_ocr else None
+        
+        # Thread pool for running independent OCR passes concurrently (created on first use)
+        self._ocr_pool = None
+        
+        # Text blocks of recently OCR'd screenshots keyed by pixel fingerprint, oldest first
+        self._ocr_cache = OrderedDict()
+        self.ocr_cache_size = 16
+        
+        # Moving-average rate at which each OCR pass produced the match, keyed by
+        # "<variation>_<configuration>"; used to order the passes
+        self._ocr_success = {}
+        
+        # In-process screen grabber and X connection for window geometry (created on
+        # first use); the lock keeps background captures from sharing them concurrently
+        self._sct = None
+        self._display = None
+        self._capture_lock = threading.Lock()
+        
+        # Background thread for captures that overlap other work (created on first use)
+        self._capture_pool = None
+        
+        # Background writer for debug images and its unfinished writes (created on first use)
+        self._debug_pool = None
+        self._debug_writes = []
+        
+        # Directory for the files handed to external tools (created on first use)
+        self._tmpdir = None
+        self._tmpdir_lock = threading.Lock()
         self.has_template_matching = HAVE_CV2
         self.has_screenshot = HAVE_PIL
         
+        # Whether template matching runs on OpenCL; probing it initializes the OpenCL
+        # runtime, so it is decided on the first match (None until then)
+        self.use_opencl = None
+        
+        # Last search for each template path: (template, (fingerprint, threshold,
+        # search_roi), result); repeated on an unchanged frame without matching
+        self._template_results = {}
+        
+        # Templates uploaded to the OpenCL device, least recently used first
+        self._umat_cache = OrderedDict()
+        
+        # Output buffers reused by template matching, for the match scores and the
+        # grayscale screenshot (allocated on first use, valid until the next search)
+        self._result_buf = None
+        self._gray_buf = None
+        
         # Print capability information in debug mode
         if debug_mode:
             print("ImageProcessor capabilities:")
-            print(f"- OCR: {'Available' if self.has_ocr else 'Not available (install pytesseract)'}")
-            print(f"- Template matching: {'Available' if self.has_template_matching else 'Not available (install opencv-python)'}")
+            print(f"- OCR: {'Available' if self.has_ocr else 'Not available (install pytesseract or tesserocr)'}"
+                  f"{' (fast models)' if self.tessdata_dir else ''}")
+            print(f"- Template matching: {'Available' if self.has_template_matching else 'Not available (install opencv-python)'}"
+                  f"{' (OpenCL)' if self._opencl_enabled() else ''}")
             print(f"- Screenshot: {'Available' if self.has_screenshot else 'Not available (install Pillow)'}")
     
     def capture_window_screenshot(self, window_id: int) -> Optional[Union[str, np.ndarray, 'Image.Image']]:
@@ -70,15 +467,30 @@ class ImageProcessor:
             None if capture failed
         """
         try:
-            # Create a temporary file for the screenshot
-            temp_file = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-            temp_file.close()
-            screenshot_path = temp_file.name
+            # Grab the window in-process first; the external tools below run as subprocesses
+            if HAVE_MSS:
+                image = self._capture_with_mss(window_id)
+                if image is not None:
+                    if self.debug_mode:
+                        print("Successfully captured screenshot using _capture_with_mss")
+                    return image
+            
+            # xwd and import output is decoded straight from memory
+            for method in (self._capture_with_xwd, self._capture_with_import):
+                image = method(window_id)
+                if image is not None:
+                    if self.debug_mode:
+                        print(f"Successfully captured screenshot using {method.__name__}")
+                    else:
+                        print(f"Screenshot captured using {method.__name__}")
+                    return image
             
-            # Try multiple screenshot capture methods
+            # scrot can only write a file; each thread reuses its own file in the
+            # instance's temporary directory
+            screenshot_path = self._temp_path("capture", ".png")
+            
+            # Fall back to the capture methods that go through a file
             screenshot_methods = [
-                self._capture_with_xwd,
-                self._capture_with_import,
                 self._capture_with_scrot
             ]
             
@@ -143,60 +555,132 @@ class ImageProcessor:
             print(f"Error capturing window screenshot: {e}")
             return None
     
-    def _capture_with_xwd(self, window_id: int, output_path: str) -> bool:
+    def capture_window_screenshot_async(self, window_id: int) -> Future:
         """
-        Capture window screenshot using xwd and convert with imagemagick.
+        Start capturing a screenshot of a window on a background thread.
+        
+        Capture mostly waits on the X server or a subprocess, so it overlaps well
+        with OCR and template matching, which release the GIL.
         
         Args:
             window_id: X11 window ID
-            output_path: Path to save the screenshot
             
         Returns:
-            True if successful, False otherwise
+            Future resolving to the result of capture_window_screenshot
+        """
+        if self._capture_pool is None:
+            self._capture_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='capture')
+        return self._capture_pool.submit(self.capture_window_screenshot, window_id)
+    
+    def _capture_with_mss(self, window_id: int) -> Optional[Union[np.ndarray, 'Image.Image']]:
+        """
+        Capture the screen area of a window in-process using mss.
+        
+        Args:
+            window_id: X11 window ID
+            
+        Returns:
+            BGRA numpy array viewing the grabbed pixels (PIL Image without OpenCV,
+            BGR numpy array without either), None if capture failed
         """
         try:
-            # Capture window using xwd and convert with imagemagick
-            xwd_path = "/tmp/window_temp.xwd"
-            subprocess.run([
-                "xwd", "-silent", "-id", str(window_id), "-out", xwd_path
-            ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            with self._capture_lock:
+                if self._sct is None:
+                    self._display = display.Display()
+                    self._sct = mss.mss()
+                
+                # Window size, and its top-left corner translated to root coordinates
+                window = self._display.create_resource_object('window', window_id)
+                geom = window.get_geometry()
+                origin = self._display.screen().root.translate_coords(window, 0, 0)
+                bbox = {'left': origin.x, 'top': origin.y, 'width': geom.width, 'height': geom.height}
+                
+                raw = self._sct.grab(bbox)
+        except Exception as e:
+            if self.debug_mode:
+                print(f"mss screenshot failed: {e}")
+            return None
+        
+        # View the grab's own pixel buffer; nothing is copied or decoded
+        pixels = np.frombuffer(raw.raw, dtype=np.uint8).reshape(raw.height, raw.width, 4)
+        if HAVE_CV2:
+            return pixels
+        if HAVE_PIL:
+            return Image.frombuffer('RGB', raw.size, raw.raw, 'raw', 'BGRX', 0, 1)
+        return pixels[:, :, :3]
+    
+    def _capture_with_xwd(self, window_id: int) -> Optional[Union[np.ndarray, 'Image.Image']]:
+        """
+        Capture window screenshot using xwd, decoded in memory.
+        
+        Args:
+            window_id: X11 window ID
             
-            subprocess.run([
-                "convert", xwd_path, output_path
-            ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        Returns:
+            PIL Image (numpy array without Pillow), None if capture failed
+        """
+        try:
+            data = subprocess.run([
+                "xwd", "-silent", "-id", str(window_id)
+            ], check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=3).stdout
             
-            # Clean up the temporary xwd file
-            if os.path.exists(xwd_path):
-                os.unlink(xwd_path)
-                
-            return os.path.exists(output_path)
+            # True-colour dumps decode directly; anything else goes through imagemagick
+            rgb = _decode_xwd(data)
+            if rgb is not None:
+                if HAVE_PIL:
+                    return Image.fromarray(rgb)
+                return np.ascontiguousarray(rgb[:, :, ::-1])
+            
+            # PPM is uncompressed, so cheap to encode and decode
+            data = subprocess.run([
+                "convert", "xwd:-", "ppm:-"
+            ], input=data, check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=3).stdout
+            
+            return self._decode_capture(data)
         except Exception as e:
             if self.debug_mode:
                 print(f"xwd screenshot failed: {e}")
-            return False
+            return None
     
-    def _capture_with_import(self, window_id: int, output_path: str) -> bool:
+    def _capture_with_import(self, window_id: int) -> Optional[Union[np.ndarray, 'Image.Image']]:
         """
-        Capture window screenshot using ImageMagick's import tool.
+        Capture window screenshot using ImageMagick's import tool, decoded in memory.
         
         Args:
             window_id: X11 window ID
-            output_path: Path to save the screenshot
             
         Returns:
-            True if successful, False otherwise
+            PIL Image (BGR numpy array without Pillow), None if capture failed
         """
         try:
-            # Import directly captures to the desired format
-            subprocess.run([
-                "import", "-window", str(window_id), output_path
-            ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=3)
+            # Import writes to stdout as uncompressed PPM, so no file and no PNG compression
+            data = subprocess.run([
+                "import", "-window", str(window_id), "ppm:-"
+            ], check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=3).stdout
             
-            return os.path.exists(output_path)
+            return self._decode_capture(data)
         except Exception as e:
             if self.debug_mode:
                 print(f"import screenshot failed: {e}")
-            return False
+            return None
+    
+    def _decode_capture(self, data: bytes) -> Optional[Union[np.ndarray, 'Image.Image']]:
+        """
+        Decode an image file held in memory, as written by a capture tool.
+        
+        Args:
+            data: Contents of the image file
+            
+        Returns:
+            PIL Image (BGR numpy array without Pillow), None if no decoder is available
+        """
+        if HAVE_PIL:
+            image = Image.open(io.BytesIO(data))
+            image.load()
+            return image
+        if self.has_template_matching:
+            return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return None
     
     def _capture_with_scrot(self, window_id: int, output_path: str) -> bool:
         """
@@ -221,6 +705,228 @@ class ImageProcessor:
                 print(f"scrot screenshot failed: {e}")
             return False
             
+    def _image_to_data(self, image: 'Image.Image', config: str = "") -> Dict[str, List[Any]]:
+        """
+        Run OCR on an image and return word boxes in pytesseract's DICT layout.
+        
+        Uses the in-process tesserocr engine when available, which avoids starting
+        a tesseract process and reloading its models on every call.
+        
+        Args:
+            image: PIL image to recognize
+            config: Tesseract configuration string
+            
+        Returns:
+            Dictionary with 'text', 'conf', 'left', 'top', 'width' and 'height' lists
+            (the numeric ones may hold strings)
+        """
+        psm = _TESSEROCR_PSM.get(config)
+        if self.use_tesserocr and psm is not None:
+            try:
+                return _tesserocr_image_to_data(image, psm, self.tessdata_dir)
+            except RuntimeError as e:
+                # Engine failed to initialize (e.g. no tessdata); use pytesseract from now on
+                if self.debug_mode:
+                    print(f"tesserocr unavailable, falling back to pytesseract: {e}")
+                self.use_tesserocr = False
+                if not HAVE_TESSERACT:
+                    raise
+        
+        # pytesseract would encode a PNG for every pass; hand tesseract an
+        # uncompressed file instead, reused by each thread for its passes
+        path = self._temp_path("ocr", ".pnm")
+        _save_pnm(image, path)
+        
+        # Same TSV as image_to_data, but only the columns used are kept and nothing
+        # is converted per cell; callers convert whole columns at once
+        tsv = pytesseract.run_and_get_output(path, extension='tsv', config=self._tesseract_config(config))
+        return _parse_tsv(tsv)
+    
+    def _temp_path(self, name: str, extension: str = "") -> str:
+        """
+        Get the calling thread's path for a temporary file.
+        
+        Args:
+            name: Purpose of the file, used as its name prefix
+            extension: File name extension
+            
+        Returns:
+            Path in the instance's temporary directory, which is created on first use
+        """
+        with self._tmpdir_lock:
+            if self._tmpdir is None:
+                self._tmpdir = tempfile.mkdtemp(prefix='clicky_')
+        return os.path.join(self._tmpdir, f"{name}_{threading.get_ident()}{extension}")
+    
+    def _tesseract_config(self, config: str) -> str:
+        """
+        Build the tesseract command-line options for a TSV run.
+        
+        Args:
+            config: Tesseract configuration string of the OCR pass
+            
+        Returns:
+            Options asking for TSV output, from the fast models if installed
+        """
+        options = "-c tessedit_create_tsv=1"
+        if self.tessdata_dir:
+            options += f" --tessdata-dir {shlex.quote(self.tessdata_dir)}"
+        return f"{options} {config}".strip()
+    
+    def _image_to_data_many(self, jobs: List[Tuple['Image.Image', str]]) -> List[Tuple[Optional[Dict[str, List[Any]]], Optional[Exception]]]:
+        """
+        Run several OCR passes, concurrently when tesseract runs as a subprocess.
+        
+        Args:
+            jobs: List of (image, config) pairs
+            
+        Returns:
+            List of (ocr_data, error) pairs in the same order as jobs
+        """
+        def run(job):
+            try:
+                return self._image_to_data(*job), None
+            except Exception as e:
+                return None, e
+        
+        # The in-process engine serializes calls anyway, so only pool subprocess runs
+        if self.use_tesserocr or len(jobs) < 2:
+            return [run(job) for job in jobs]
+        
+        # Decode lazily loaded images up front so worker threads only read them
+        for image, _ in jobs:
+            if hasattr(image, 'load'):
+                image.load()
+        
+        if self._ocr_pool is None:
+            self._ocr_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                                thread_name_prefix='ocr')
+        
+        return list(self._ocr_pool.map(run, jobs))
+    
+    def _save_debug_image(self, image: 'Image.Image', path: str) -> None:
+        """
+        Write a debug image on a background thread, off the OCR path.
+        
+        Args:
+            image: Image to save
+            path: Destination PNG path
+        """
+        # Drop the image rather than queue up behind a slow disk
+        self._debug_writes = [write for write in self._debug_writes if not write.done()]
+        if len(self._debug_writes) >= 8:
+            print(f"Debug image writer busy, skipping {path}")
+            return
+        
+        if self._debug_pool is None:
+            self._debug_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='debug-writer')
+        
+        # Read lazily opened files now, so the writer never shares the file handle
+        image.load()
+        self._debug_writes.append(self._debug_pool.submit(image.save, path, compress_level=1))
+    
+    def _load_screenshot(self, screenshot: Union[str, np.ndarray, 'Image.Image']) -> Optional[Tuple['Image.Image', Optional[np.ndarray]]]:
+        """
+        Load a screenshot for OCR.
+        
+        Args:
+            screenshot: Path to screenshot image, numpy array (BGR) or PIL image
+            
+        Returns:
+            Tuple of (PIL image, numpy array), or None if the screenshot couldn't be
+            loaded. Exactly one of the two is set, depending on the input type.
+        """
+        if isinstance(screenshot, str):
+            if os.path.exists(screenshot):
+                return Image.open(screenshot), None
+            if self.debug_mode:
+                print(f"Screenshot file not found: {screenshot}")
+            return None
+        elif isinstance(screenshot, np.ndarray):
+            # The PIL copy is only made if OCR actually has to run, see _array_to_pil
+            return None, screenshot
+        elif HAVE_PIL and isinstance(screenshot, Image.Image):
+            return screenshot, None
+        
+        if self.debug_mode:
+            print(f"Unsupported screenshot type: {type(screenshot)}")
+        return None
+    
+    def _array_to_pil(self, np_image: np.ndarray) -> 'Image.Image':
+        """
+        Convert a numpy screenshot to a PIL image for tesseract.
+        
+        Args:
+            np_image: Screenshot as a BGR, BGRA or grayscale numpy array
+            
+        Returns:
+            RGB (or grayscale) PIL image
+        """
+        # PIL unpacks BGR/BGRA pixels into RGB itself, so no converted copy of the
+        # array is made first
+        if np_image.dtype == np.uint8 and np_image.ndim == 3 and np_image.shape[2] in (3, 4):
+            height, width = np_image.shape[:2]
+            rawmode = 'BGR' if np_image.shape[2] == 3 else 'BGRX'
+            return Image.frombuffer('RGB', (width, height), np.ascontiguousarray(np_image),
+                                    'raw', rawmode, 0, 1)
+        return Image.fromarray(np_image)
+    
+    def _ocr_text_blocks(self, pil_image: Optional['Image.Image'], np_image: Optional[np.ndarray],
+                         text: Optional[str] = None, debug_dir: str = "/tmp/clicky_debug",
+                         debug_time: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get the text blocks of a screenshot, reusing them if it was OCR'd recently.
+        
+        Args:
+            pil_image: Screenshot as a PIL image, if available
+            np_image: Screenshot as a BGR numpy array, if available
+            text: Text being searched for; a confident match may end OCR early
+            debug_dir: Directory for debug images
+            debug_time: Timestamp used in debug image names
+            
+        Returns:
+            Detected text blocks, highest confidence first
+        """
+        # Convert to grayscale once; every image variation derives from it
+        gray = None
+        if self.has_template_matching:
+            gray = _to_gray_ndarray(np_image if np_image is not None else pil_image)
+        elif pil_image is None:
+            pil_image = self._array_to_pil(np_image)
+        
+        # Polling loops often OCR the same frame again; reuse the blocks found last time.
+        # Blocks from a sweep that stopped early are only reused if they contain the text.
+        cache_key = _fingerprint(gray if gray is not None else pil_image)
+        cached = self._ocr_cache.get(cache_key)
+        if cached is not None:
+            self._ocr_cache.move_to_end(cache_key)
+            if cached[1] or (text is not None and self._has_confident_match(cached[0], text)):
+                if self.debug_mode:
+                    print(f"Reusing {len(cached[0])} text blocks from unchanged screenshot")
+                return cached[0]
+        
+        # A partial sweep already missed the text, so run every pass this time
+        search = text if cached is None else None
+        if pil_image is None:
+            pil_image = self._array_to_pil(np_image)
+        all_blocks, complete = self._detect_text_blocks(pil_image, gray, debug_dir, debug_time, search)
+        self._cache_text_blocks(cache_key, all_blocks, complete)
+        return all_blocks
+    
+    def _cache_text_blocks(self, cache_key: bytes, blocks: List[Dict[str, Any]], complete: bool) -> None:
+        """
+        Remember the text blocks of a screenshot, evicting the least recently used.
+        
+        Args:
+            cache_key: Fingerprint of the screenshot
+            blocks: Detected text blocks, highest confidence first
+            complete: Whether every OCR pass contributed to the blocks
+        """
+        self._ocr_cache[cache_key] = (blocks, complete)
+        self._ocr_cache.move_to_end(cache_key)
+        if len(self._ocr_cache) > self.ocr_cache_size:
+            self._ocr_cache.popitem(last=False)
+    
     def find_text_in_screenshot(self, text: str, screenshot: Union[str, np.ndarray, 'Image.Image'], 
                                min_confidence: float = 0.5) -> Optional[Tuple[int, int, float]]:
         """
@@ -240,219 +946,508 @@ class ImageProcessor:
             return None
         
         try:
-            # Store the original text for debugging
-            original_text = text
             # Create a debug directory
             debug_dir = "/tmp/clicky_debug"
             if self.debug_mode:
                 os.makedirs(debug_dir, exist_ok=True)
                 debug_time = int(time.time())
+            else:
+                debug_time = None
         
             # Load and prepare the image
-            pil_image = None
-            np_image = None
-            
-            # Handle different input types
-            if isinstance(screenshot, str):
-                if os.path.exists(screenshot):
-                    pil_image = Image.open(screenshot)
-                else:
-                    if self.debug_mode:
-                        print(f"Screenshot file not found: {screenshot}")
-                    return None
-            elif isinstance(screenshot, np.ndarray):
-                np_image = screenshot
-                # Convert BGR to RGB if needed
-                if len(np_image.shape) == 3 and np_image.shape[2] == 3:
-                    np_image_rgb = cv2.cvtColor(np_image, cv2.COLOR_BGR2RGB)
-                    pil_image = Image.fromarray(np_image_rgb)
-                else:
-                    pil_image = Image.fromarray(np_image)
-            elif HAVE_PIL and isinstance(screenshot, Image.Image):
-                pil_image = screenshot
-            else:
-                if self.debug_mode:
-                    print(f"Unsupported screenshot type: {type(screenshot)}")
+            loaded = self._load_screenshot(screenshot)
+            if loaded is None:
                 return None
+            pil_image, np_image = loaded
             
             # Save the original image for debugging
             if self.debug_mode:
+                if pil_image is None:
+                    pil_image = self._array_to_pil(np_image)
                 original_path = f"{debug_dir}/original_{debug_time}.png"
-                pil_image.save(original_path)
-                print(f"Saved original image to {original_path}")
+                self._save_debug_image(pil_image, original_path)
+                print(f"Saving original image to {original_path}")
+                print(f"Looking for text: '{text}'")
             
-            # Create a list of processed images with different filters for better OCR
-            processed_images = []
+            all_blocks = self._ocr_text_blocks(pil_image, np_image, text, debug_dir, debug_time)
             
-            # Original image (always include first)
-            processed_images.append(("original", pil_image))
+            return self._match_text_in_blocks(text, all_blocks)
             
-            # Get numpy representation for transformations if needed
-            if np_image is None and self.has_template_matching:
-                np_image = np.array(pil_image)
-                
-            # Only apply these transformations if we have OpenCV available
-            if self.has_template_matching:
-                # Convert to grayscale
-                gray = cv2.cvtColor(np_image, cv2.COLOR_RGB2GRAY) if len(np_image.shape) == 3 else np_image
-                
-                # Apply different thresholds for better text detection
-                _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-                processed_images.append(("binary", Image.fromarray(binary)))
-                
-                # Inverted binary (for white text on dark backgrounds)
-                inverted = cv2.bitwise_not(binary)
-                processed_images.append(("inverted", Image.fromarray(inverted)))
-                
-                # Adaptive threshold (better for varying backgrounds)
-                adaptive = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
-                processed_images.append(("adaptive", Image.fromarray(adaptive)))
-                
-            # Debug log the processing steps
+        except Exception as e:
             if self.debug_mode:
-                print(f"Looking for text: '{text}'")
-                print(f"Created {len(processed_images)} image variations for OCR processing")
-                
-                # Save all processed images
-                for name, img in processed_images:
-                    img_path = f"{debug_dir}/{name}_{debug_time}.png"
-                    img.save(img_path)
-                    print(f"Saved {name} image to {img_path}")
-            
-            # Try different OCR configurations with all processed images
-            ocr_configs = [
-                "",  # Default configuration
-                "--psm 6",  # Assume single block of text
-                "--psm 11 --oem 1"  # Sparse text detection
-            ]
+                print(f"Error finding text in screenshot: {e}")
+                import traceback
+                traceback.print_exc()
+            return None
+    
+    def find_texts_in_screenshots(self, queries: List[Tuple[str, Union[str, np.ndarray, 'Image.Image']]],
+                                  min_confidence: float = 0.5) -> List[Optional[Tuple[int, int, float]]]:
+        """
+        Find several texts, each in its own screenshot, sharing one OCR run.
+        
+        Screenshots that weren't OCR'd recently are recognized together by a single
+        tesseract process reading a list of images, so its models load once for the
+        whole batch. Queries the batch pass doesn't answer get the full
+        find_text_in_screenshot treatment.
+        
+        Args:
+            queries: List of (text, screenshot) pairs
+            min_confidence: Minimum confidence level for a match (0-1)
             
-            # Store all detected text blocks from all processing attempts
-            all_blocks = []
-            for proc_name, proc_image in processed_images:
-                for config in ocr_configs:
-                    try:
-                        # Run OCR on this processed image with this config
-                        ocr_data = pytesseract.image_to_data(proc_image, output_type=pytesseract.Output.DICT, config=config)
-                        
-                        # Extract and store text blocks with positions
-                        for i, detected_text in enumerate(ocr_data['text']):
-                            # Skip empty results
-                            if not detected_text.strip():
-                                continue
-                            
-                            # Get confidence and position
-                            conf = float(ocr_data['conf'][i]) / 100.0
-                            if conf < 0.2:  # Filter extremely low confidence to reduce noise
-                                continue
-                                
-                            # Get position and size
-                            x = ocr_data['left'][i]
-                            y = ocr_data['top'][i]
-                            w = ocr_data['width'][i]
-                            h = ocr_data['height'][i]
-                            
-                            # Add to our block collection
-                            all_blocks.append({
-                                'text': detected_text.strip(),
-                                'x': x,
-                                'y': y,
-                                'width': w,
-                                'height': h,
-                                'conf': conf,
-                                'source': f"{proc_name}_{config}"
-                            })
-                            
-                            if self.debug_mode and conf > 0.3:
-                                print(f"Detected: '{detected_text}' at ({x}, {y}) with conf {conf:.2f} [{proc_name} {config}]")
-                    except Exception as e:
-                        if self.debug_mode:
-                            print(f"OCR error with {proc_name} using config '{config}': {e}")
-            
-            # Sort all blocks by confidence (highest first)
-            all_blocks.sort(key=lambda b: b['conf'], reverse=True)
-            
-            # ===== Try different matching strategies =====
-            # 1. Direct text matches (exact or fuzzy)
-            direct_matches = []
-            for block in all_blocks:
-                if self._text_matches(block['text'], text):
-                    # Calculate center of the text block
-                    x = block['x'] + block['width'] // 2
-                    y = block['y'] + block['height'] // 2
-                    direct_matches.append({
-                        'x': x, 
-                        'y': y, 
-                        'conf': block['conf'],
-                        'text': block['text'],
-                        'source': block['source']
-                    })
-            
-            if direct_matches:
-                # Take the match with highest confidence
-                best_match = direct_matches[0]
-                if self.debug_mode:
-                    print(f"Found direct match: '{best_match['text']}' at ({best_match['x']}, {best_match['y']}) "  
-                          f"with conf {best_match['conf']:.2f} [{best_match['source']}]")
-                return (best_match['x'], best_match['y'], best_match['conf'])
+        Returns:
+            List with the (x, y, confidence) of the best match, or None, per query
+        """
+        results = [None] * len(queries)
+        if not self.has_ocr:
+            return results
+        
+        # Without a tesseract process to amortize, the batch pass has nothing to save
+        if HAVE_TESSERACT and not self.use_tesserocr:
+            keys = []
+            pending = {}
+            for _, screenshot in queries:
+                loaded = self._load_screenshot(screenshot)
+                cache_key = self._screenshot_key(*loaded) if loaded is not None else None
+                if cache_key is not None and cache_key not in self._ocr_cache:
+                    pending.setdefault(cache_key, loaded[0] if loaded[0] is not None
+                                       else self._array_to_pil(loaded[1]))
+                keys.append(cache_key)
+            
+            if pending:
+                try:
+                    self._ocr_batch(pending)
+                except Exception as e:
+                    if self.debug_mode:
+                        print(f"Batch OCR failed, searching screenshots one by one: {e}")
+            
+            # Answer what the cached blocks can
+            for i, ((text, _), cache_key) in enumerate(zip(queries, keys)):
+                cached = self._ocr_cache.get(cache_key) if cache_key is not None else None
+                if cached is not None:
+                    results[i] = self._match_text_in_blocks(text, cached[0])
+        
+        for i, (text, screenshot) in enumerate(queries):
+            if results[i] is None:
+                results[i] = self.find_text_in_screenshot(text, screenshot, min_confidence)
+        return results
+    
+    def _ocr_batch(self, images: Dict[bytes, 'Image.Image'], config: str = "--psm 6") -> None:
+        """
+        OCR several screenshots in one tesseract run and cache their text blocks.
+        
+        The blocks are cached as partial results, so a later search that finds
+        nothing in them still runs the full set of OCR passes.
+        
+        Args:
+            images: Screenshots as PIL images, keyed by their OCR cache key
+            config: Tesseract configuration string
+        """
+        prefix = self._temp_path("batch")
+        
+        # Tesseract treats a text file of image paths as a multi-page document
+        paths = []
+        scales = []
+        try:
+            for i, image in enumerate(images.values()):
+                scale = min(1.0, OCR_MAX_HEIGHT / image.size[1])
+                if scale < 1.0:
+                    image = image.resize((max(1, round(image.size[0] * scale)),
+                                          max(1, round(image.size[1] * scale))), Image.BOX)
                 
-            # 2. Partial word matching for multi-word text
-            if ' ' in text:
-                # Tokenize the search text into words
-                search_parts = text.lower().split()
-                if self.debug_mode:
-                    print(f"Searching for words: {search_parts}")
+                path = f"{prefix}_{i}.pnm"
+                _save_pnm(image, path)
+                paths.append(path)
+                scales.append(scale)
+            
+            list_path = f"{prefix}.txt"
+            with open(list_path, 'w') as f:
+                f.write("\n".join(paths) + "\n")
+            paths.append(list_path)
+            
+            tsv = pytesseract.run_and_get_output(list_path, extension='tsv',
+                                                 config=self._tesseract_config(config))
+        finally:
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        
+        # Split the rows by page, one page per image in list order
+        data = _parse_tsv(tsv, _TSV_COLUMNS + ('page_num',))
+        pages = np.asarray(data.pop('page_num'), dtype=np.int64)
+        
+        for page, (cache_key, image) in enumerate(images.items(), start=1):
+            rows = np.flatnonzero(pages == page)
+            page_data = {name: [column[row] for row in rows] for name, column in data.items()}
+            blocks = self._collect_text_blocks([("original", image, config)], [(page_data, None)],
+                                               scales[page - 1])
+            self._cache_text_blocks(cache_key, blocks, False)
+    
+    def _screenshot_key(self, pil_image: Optional['Image.Image'], np_image: Optional[np.ndarray]) -> bytes:
+        """
+        Compute the OCR cache key of a loaded screenshot.
+        
+        Args:
+            pil_image: Screenshot as a PIL image, if available
+            np_image: Screenshot as a BGR numpy array, if available
+            
+        Returns:
+            Fingerprint of the screenshot's grayscale pixels (or of the PIL image
+            without OpenCV)
+        """
+        if self.has_template_matching:
+            return _fingerprint(_to_gray_ndarray(np_image if np_image is not None else pil_image))
+        return _fingerprint(pil_image if pil_image is not None else self._array_to_pil(np_image))
+    
+    def _match_text_in_blocks(self, text: str, all_blocks: List[Dict[str, Any]]) -> Optional[Tuple[int, int, float]]:
+        """
+        Find text among detected text blocks.
+        
+        Args:
+            text: Text to find
+            all_blocks: Detected text blocks, highest confidence first
+            
+        Returns:
+            Tuple of (x, y, confidence) for the best match, or None if no matches
+        """
+        # ===== Try different matching strategies =====
+        # 1. Direct text matches (exact or fuzzy)
+        direct_matches = []
+        matches = self._text_matcher(text)
+        for block in all_blocks:
+            if matches(block['text']):
+                # Calculate center of the text block
+                x = block['x'] + block['width'] // 2
+                y = block['y'] + block['height'] // 2
+                direct_matches.append({
+                    'x': x, 
+                    'y': y, 
+                    'conf': block['conf'],
+                    'text': block['text'],
+                    'source': block['source']
+                })
+        
+        if direct_matches:
+            # Take the match with highest confidence
+            best_match = direct_matches[0]
+            if self.debug_mode:
+                print(f"Found direct match: '{best_match['text']}' at ({best_match['x']}, {best_match['y']}) "  
+                      f"with conf {best_match['conf']:.2f} [{best_match['source']}]")
+            self._record_ocr_success(best_match['source'])
+            return (best_match['x'], best_match['y'], best_match['conf'])
+            
+        # 2. Partial word matching for multi-word text
+        if ' ' in text:
+            # Tokenize the search text into words
+            search_parts = text.lower().split()
+            if self.debug_mode:
+                print(f"Searching for words: {search_parts}")
+            
+            # Track which blocks match which search parts. Blocks are sorted by
+            # confidence, so the first block matching a word is its best match.
+            block_texts = [block['text'].lower() for block in all_blocks]
+            word_matches = {word: all_blocks[index]
+                            for word, index in self._match_search_words(search_parts, block_texts).items()}
+            
+            # Find how many words we matched and their quality
+            matched_words = list(word_matches.keys())
+            matched_word_pct = len(matched_words) / len(search_parts)
+            
+            if self.debug_mode:
+                print(f"Matched {len(matched_words)}/{len(search_parts)} words: {matched_words}")
+            
+            # If we matched at least 50% of the words, consider it a match
+            if matched_word_pct >= 0.5:
+                # Find the center of the matched blocks
+                blocks = list(word_matches.values())
+                min_x = min(b['x'] for b in blocks)
+                max_x = max(b['x'] + b['width'] for b in blocks)
+                min_y = min(b['y'] for b in blocks)
+                max_y = max(b['y'] + b['height'] for b in blocks)
                 
-                # Track which blocks match which search parts
-                word_matches = {}
-                for block in all_blocks:
-                    block_text = block['text'].lower()
-                    # Check each search word against this block
-                    for word in search_parts:
-                        # Use improved text matching for fuzzy comparison
-                        if self._text_matches(block_text, word, fuzzy_threshold=0.8) or word in block_text:
-                            if word not in word_matches or block['conf'] > word_matches[word]['conf']:
-                                word_matches[word] = block
+                center_x = min_x + (max_x - min_x) // 2
+                center_y = min_y + (max_y - min_y) // 2
                 
-                # Find how many words we matched and their quality
-                matched_words = list(word_matches.keys())
-                matched_word_pct = len(matched_words) / len(search_parts)
+                # Calculate overall match quality
+                avg_conf = sum(b['conf'] for b in blocks) / len(blocks)
+                quality = matched_word_pct * avg_conf
                 
                 if self.debug_mode:
-                    print(f"Matched {len(matched_words)}/{len(search_parts)} words: {matched_words}")
+                    print(f"Found partial match for '{text}' at ({center_x}, {center_y})")
+                    print(f"  Quality: {quality:.2f} (words: {matched_word_pct:.2f}, conf: {avg_conf:.2f})")
                 
-                # If we matched at least 50% of the words, consider it a match
-                if matched_word_pct >= 0.5:
-                    # Find the center of the matched blocks
-                    blocks = list(word_matches.values())
-                    min_x = min(b['x'] for b in blocks)
-                    max_x = max(b['x'] + b['width'] for b in blocks)
-                    min_y = min(b['y'] for b in blocks)
-                    max_y = max(b['y'] + b['height'] for b in blocks)
-                    
-                    center_x = min_x + (max_x - min_x) // 2
-                    center_y = min_y + (max_y - min_y) // 2
-                    
-                    # Calculate overall match quality
-                    avg_conf = sum(b['conf'] for b in blocks) / len(blocks)
-                    quality = matched_word_pct * avg_conf
-                    
-                    if self.debug_mode:
-                        print(f"Found partial match for '{original_text}' at ({center_x}, {center_y})")
-                        print(f"  Quality: {quality:.2f} (words: {matched_word_pct:.2f}, conf: {avg_conf:.2f})")
-                    
-                    return (center_x, center_y, quality)
+                return (center_x, center_y, quality)
+        
+        # No matches found
+        if self.debug_mode:
+            print(f"No matches found for '{text}'")
+        return None
+    
+    def _detect_text_blocks(self, pil_image: 'Image.Image', gray: Optional[np.ndarray],
+                            debug_dir: str, debug_time: Optional[int],
+                            text: Optional[str] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Run OCR over several processed variations of a screenshot.
+        
+        Args:
+            pil_image: Screenshot as a PIL image
+            gray: Grayscale version of the screenshot, or None without OpenCV
+            debug_dir: Directory for debug images
+            debug_time: Timestamp used in debug image names
+            text: Text being searched for; a confident match stops the sweep early
             
-            # No matches found
+        Returns:
+            Tuple of (detected text blocks, highest confidence first, and whether
+            all OCR passes were run)
+        """
+        # Tall screenshots cost OCR time without adding legible text; downscale them
+        # and map the block coordinates back to the original size afterwards
+        width, height = pil_image.size
+        scale = min(1.0, OCR_MAX_HEIGHT / height)
+        if scale < 1.0:
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            pil_image = pil_image.resize(size, Image.BOX)
+            if gray is not None:
+                gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
             if self.debug_mode:
-                print(f"No matches found for '{text}'")
-            return None
+                print(f"Downscaled screenshot from {width}x{height} to {size[0]}x{size[1]} for OCR")
+        
+        # Create a list of processed images with different filters for better OCR
+        processed_images = []
+        
+        # Original image (always include first)
+        processed_images.append(("original", pil_image))
+        
+        # Only apply these transformations if we have OpenCV available
+        if gray is not None:
+            # Apply different thresholds for better text detection
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            processed_images.append(("binary", _gray_to_pil(binary)))
+            
+            # Inverted binary (for white text on dark backgrounds). Only useful when
+            # the binary image is mostly dark; on light backgrounds it just repeats
+            # the binary pass with flipped polarity.
+            if binary.mean() < 128:
+                inverted = cv2.bitwise_not(binary)
+                processed_images.append(("inverted", _gray_to_pil(inverted)))
+            elif self.debug_mode:
+                print("Skipping inverted variation (light background)")
+            
+            # Adaptive threshold (better for varying backgrounds). On flat UI
+            # backgrounds it is nearly identical to the binary image, so skip it
+            # when less than 1% of the pixels differ.
+            adaptive = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+            if np.count_nonzero(adaptive != binary) >= binary.size // 100:
+                processed_images.append(("adaptive", _gray_to_pil(adaptive)))
+            elif self.debug_mode:
+                print("Skipping adaptive variation (same as binary)")
+            
+        # Debug log the processing steps
+        if self.debug_mode:
+            print(f"Created {len(processed_images)} image variations for OCR processing")
+            
+            # Save all processed images
+            for name, img in processed_images:
+                img_path = f"{debug_dir}/{name}_{debug_time}.png"
+                self._save_debug_image(img, img_path)
+                print(f"Saving {name} image to {img_path}")
+        
+        # Try different OCR configurations with all processed images
+        ocr_configs = [
+            "",  # Default configuration
+            "--psm 6",  # Assume single block of text
+            "--psm 11 --oem 1"  # Sparse text detection
+        ]
+        
+        # Every image variation with every configuration, the passes that most
+        # often produced the match first
+        ocr_jobs = [(proc_name, proc_image, config)
+                    for proc_name, proc_image in processed_images
+                    for config in ocr_configs]
+        ocr_jobs.sort(key=lambda job: self._ocr_success.get(f"{job[0]}_{job[2]}", 0.0), reverse=True)
+        
+        # Text usually covers a small part of a UI frame; OCR just the text regions
+        # as single lines first, which is much cheaper than any full-frame pass
+        if text is not None and gray is not None:
+            regions = self._preprocess_for_ocr(gray)
+            if regions:
+                region_jobs = [("regions", region, "--psm 7") for region, _ in regions]
+                region_results = self._image_to_data_many([(region, "--psm 7") for region, _ in regions])
+                blocks = self._collect_text_blocks(region_jobs, region_results, scale,
+                                                   [offset for _, offset in regions])
+                if self._has_confident_match(blocks, text):
+                    if self.debug_mode:
+                        print(f"Skipping full-frame OCR passes after confident match in {len(regions)} text regions")
+                    return blocks, False
+        
+        # The leading pass usually finds the text on its own; only run the rest if it doesn't
+        ocr_results = []
+        if text is not None:
+            ocr_results = self._image_to_data_many([(ocr_jobs[0][1], ocr_jobs[0][2])])
+            blocks = self._collect_text_blocks(ocr_jobs[:1], ocr_results, scale)
+            if self._has_confident_match(blocks, text):
+                if self.debug_mode:
+                    print(f"Skipping remaining OCR passes after confident match [{ocr_jobs[0][0]} {ocr_jobs[0][2]}]")
+                return blocks, False
+        
+        # Run the remaining passes concurrently
+        ocr_results += self._image_to_data_many(
+            [(image, config) for _, image, config in ocr_jobs[len(ocr_results):]])
+        return self._collect_text_blocks(ocr_jobs, ocr_results, scale), True
+    
+    def _preprocess_for_ocr(self, gray: np.ndarray) -> List[Tuple['Image.Image', Tuple[int, int]]]:
+        """
+        Find the text regions of a screenshot and crop them out for OCR.
+        
+        Args:
+            gray: Grayscale screenshot
+        
+        Returns:
+            List of (binarized crop with dark text on white, (x, y) offset of the crop),
+            top to bottom; empty if the regions aren't worth OCR'ing separately
+        """
+        # Binarize so text is white on black, whatever the background polarity
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        if binary.mean() >= 128:
+            binary = cv2.bitwise_not(binary)
+        
+        # Smear the characters of a line together into one blob per line
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 5))
+        closed = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
+        contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        
+        height, width = gray.shape
+        boxes = [box for box in map(cv2.boundingRect, contours)
+                 if box[2] >= 8 and 8 <= box[3] < height // 2]
+        if not boxes or len(boxes) > OCR_MAX_REGIONS:
+            return []
+        if sum(w * h for _, _, w, h in boxes) > OCR_MAX_REGION_AREA * width * height:
+            return []
+        
+        # Crop with a small margin; tesseract reads dark text on a light background best
+        regions = []
+        for x, y, w, h in sorted(boxes, key=lambda box: (box[1], box[0])):
+            x0, y0 = max(0, x - 4), max(0, y - 4)
+            x1, y1 = min(width, x + w + 4), min(height, y + h + 4)
+            crop = cv2.bitwise_not(binary[y0:y1, x0:x1])
+            regions.append((_gray_to_pil(crop), (x0, y0)))
+        
+        if self.debug_mode:
+            print(f"Found {len(regions)} text regions for OCR")
+        return regions
+    
+    def _collect_text_blocks(self, ocr_jobs: List[Tuple[str, 'Image.Image', str]],
+                             ocr_results: List[Tuple[Optional[Dict[str, List[Any]]], Optional[Exception]]],
+                             scale: float = 1.0,
+                             offsets: Optional[List[Tuple[int, int]]] = None) -> List[Dict[str, Any]]:
+        """
+        Merge the OCR output of several passes into one list of text blocks.
+        
+        Args:
+            ocr_jobs: (variation name, image, configuration) of each pass
+            ocr_results: (data, error) of each pass, as returned by _image_to_data_many
+            scale: Factor the OCR'd images were resized by; coordinates are divided by it
+            offsets: (x, y) position of each pass's image in the (resized) screenshot,
+                     for passes run on crops
+        
+        Returns:
+            Usable text blocks, highest confidence first
+        """
+        if offsets is None:
+            offsets = [(0, 0)] * len(ocr_jobs)
+        
+        # Collect the OCR output of all processing attempts as columns
+        columns = {key: [] for key in ('text', 'conf', 'left', 'top', 'width', 'height', 'source')}
+        sources = []
+        for (proc_name, proc_image, config), (ocr_data, error), (dx, dy) in zip(ocr_jobs, ocr_results, offsets):
+            if error is not None:
+                if self.debug_mode:
+                    print(f"OCR error with {proc_name} using config '{config}': {error}")
+                continue
+            
+            # Filter extremely low confidence to reduce noise. Most rows are layout
+            # rows (confidence -1) or noise, so drop them before touching the other
+            # columns; only the surviving rows are stripped and converted.
+            conf = np.asarray(ocr_data['conf'], dtype=np.float64) / 100.0
+            rows = np.flatnonzero(conf >= 0.2)
+            
+            # Skip empty results
+            texts = np.char.strip(np.asarray(ocr_data['text'], dtype=object)[rows].astype(str))
+            nonempty = np.char.str_len(texts) > 0
+            rows, texts = rows[nonempty], texts[nonempty]
+            if not rows.size:
+                continue
+            conf = conf[rows]
+            
+            columns['text'].append(texts)
+            columns['conf'].append(conf)
+            for key in ('left', 'top', 'width', 'height'):
+                values = np.asarray(ocr_data[key], dtype=object)[rows].astype(np.int64)
+                if key == 'left' and dx:
+                    values += dx
+                elif key == 'top' and dy:
+                    values += dy
+                if scale != 1.0:
+                    values = np.rint(values / scale).astype(np.int64)
+                columns[key].append(values)
+            columns['source'].append(np.full(rows.size, len(sources)))
+            sources.append(f"{proc_name}_{config}")
             
-        except Exception as e:
             if self.debug_mode:
-                print(f"Error finding text in screenshot: {e}")
-                import traceback
-                traceback.print_exc()
-            return None
+                for detected_text, x, y, block_conf in zip(texts, columns['left'][-1],
+                                                           columns['top'][-1], conf):
+                    if block_conf > 0.3:
+                        print(f"Detected: '{detected_text}' at ({x}, {y}) with conf {block_conf:.2f} [{proc_name} {config}]")
+        
+        if not sources:
+            return []
+        
+        # Sort all blocks by confidence (highest first), then build the block records
+        merged = {key: np.concatenate(parts) for key, parts in columns.items()}
+        order = np.argsort(-merged['conf'], kind='stable')
+        merged = {key: column[order].tolist() for key, column in merged.items()}
+        
+        return [
+            {
+                'text': detected_text,
+                'x': x,
+                'y': y,
+                'width': w,
+                'height': h,
+                'conf': conf,
+                'source': sources[source]
+            }
+            for detected_text, x, y, w, h, conf, source in zip(
+                merged['text'], merged['left'], merged['top'], merged['width'],
+                merged['height'], merged['conf'], merged['source'])
+        ]
+    
+    def _has_confident_match(self, blocks: List[Dict[str, Any]], text: str) -> bool:
+        """
+        Check whether any text block is a confident direct match for the text.
+        
+        Args:
+            blocks: Detected text blocks
+            text: Text we're looking for
+            
+        Returns:
+            Whether a block matches with at least EARLY_MATCH_CONFIDENCE
+        """
+        matches = self._text_matcher(text)
+        return any(block['conf'] >= EARLY_MATCH_CONFIDENCE and matches(block['text'])
+                   for block in blocks)
+    
+    def _record_ocr_success(self, source: str) -> None:
+        """
+        Update the moving-average success rate of the OCR passes.
+        
+        Args:
+            source: "<variation>_<configuration>" of the pass that produced the match
+        """
+        for key in self._ocr_success:
+            self._ocr_success[key] *= 0.9
+        self._ocr_success[source] = self._ocr_success.get(source, 0.0) + 0.1
     
     def _text_matches(self, found_text: str, target_text: str, fuzzy_threshold: float = 0.75) -> bool:
         """
@@ -466,40 +1461,114 @@ class ImageProcessor:
         Returns:
             Whether the texts match
         """
-        import re
-        from difflib import SequenceMatcher
+        return self._text_matcher(target_text, fuzzy_threshold)(found_text)
+    
+    def _text_matcher(self, target_text: str, fuzzy_threshold: float = 0.75) -> Callable[[str], bool]:
+        """
+        Build a matcher for one target text, to test against many found texts.
         
-        # Skip empty texts
-        if not found_text or not target_text:
-            return False
+        The target is lowercased, split and cleaned once here rather than once
+        per OCR block.
         
-        # Convert both to lowercase for case-insensitive matching
-        found_lower = found_text.lower()
+        Args:
+            target_text: Text we're looking for
+            fuzzy_threshold: Threshold for fuzzy matching (0.0 to 1.0)
+            
+        Returns:
+            Function telling whether a found text matches the target (see _text_matches)
+        """
+        # Convert to lowercase for case-insensitive matching
         target_lower = target_text.lower()
+        target_set = frozenset(target_lower.split())
+        target_clean = _clean(target_lower)
+        multi_word = len(target_set) > 1
+        
+        def matches(found_text: str) -> bool:
+            # Skip empty texts
+            if not found_text or not target_lower:
+                return False
+            
+            found_lower = found_text.lower()
+            
+            # 1. Check for exact or substring match (ignoring case)
+            if target_lower in found_lower:
+                return True
+            
+            # 2. All the target's words, in any order
+            if multi_word and target_set.issubset(found_lower.split()):
+                return True
+            
+            # 3. Allow for common OCR errors and fuzzy matching
+            # Remove non-alphanumeric characters and whitespace
+            found_clean = _clean(found_lower)
+            
+            # Handle empty strings after cleaning
+            if not found_clean or not target_clean:
+                return False
+            
+            # Fuzzy matching for similar but not identical text
+            if HAVE_RAPIDFUZZ:
+                similarity = fuzz.ratio(found_clean, target_clean) / 100.0
+            else:
+                similarity = SequenceMatcher(None, found_clean, target_clean).ratio()
+            return similarity >= fuzzy_threshold
+        
+        return matches
+    
+    def _match_search_words(self, words: List[str], block_texts: List[str],
+                            fuzzy_threshold: float = 0.8) -> Dict[str, int]:
+        """
+        Find the first text block that matches each search word.
         
-        # 1. Check for exact match (ignoring case)
-        if found_lower == target_lower:
-            return True
+        Args:
+            words: Lowercase search words
+            block_texts: Lowercase block texts, in order of preference
+            fuzzy_threshold: Threshold for fuzzy matching (0.0 to 1.0)
+            
+        Returns:
+            Dictionary mapping each matched word to the index of its first matching block
+        """
+        words = set(words)
+        first = {}
         
-        # 2. Check for substring match
-        if target_lower in found_lower:
-            return True
+        # Exact (substring) hits for all words, scanning each block once
+        if HAVE_AHOCORASICK:
+            automaton = ahocorasick.Automaton()
+            for word in words:
+                automaton.add_word(word, word)
+            automaton.make_automaton()
             
-        # 3. Allow for common OCR errors and fuzzy matching
-        # Remove non-alphanumeric characters and whitespace
-        found_clean = re.sub(r'[^a-z0-9]', '', found_lower)
-        target_clean = re.sub(r'[^a-z0-9]', '', target_lower)
+            for i, block_text in enumerate(block_texts):
+                for _, word in automaton.iter(block_text):
+                    first.setdefault(word, i)
+                if len(first) == len(words):
+                    break
+        else:
+            for word in words:
+                index = next((i for i, block_text in enumerate(block_texts) if word in block_text), None)
+                if index is not None:
+                    first[word] = index
         
-        # Handle empty strings after cleaning
-        if not found_clean or not target_clean:
-            return False
+        # Fuzzy top-ups, only over the blocks ranked above the word's exact hit
+        for word in words:
+            candidates = block_texts[:first.get(word, len(block_texts))]
+            if not candidates:
+                continue
             
-        # Fuzzy matching for similar but not identical text
-        similarity = SequenceMatcher(None, found_clean, target_clean).ratio()
-        if similarity >= fuzzy_threshold:
-            return True
+            if HAVE_RAPIDFUZZ:
+                if not _clean(word):
+                    continue
+                matches = process.extract(word, candidates, scorer=fuzz.ratio, processor=_clean,
+                                          score_cutoff=fuzzy_threshold * 100, limit=None)
+                index = min((index for _, _, index in matches), default=None)
+            else:
+                matches = self._text_matcher(word, fuzzy_threshold)
+                index = next((i for i, block_text in enumerate(candidates) if matches(block_text)), None)
             
-        return False
+            if index is not None:
+                first[word] = index
+        
+        return first
         
     def get_all_text_regions(self, screenshot: Union[str, np.ndarray, 'Image.Image'], 
                            min_confidence: float = 0.3) -> List[Tuple[str, int, int, float]]:
@@ -508,65 +1577,33 @@ class ImageProcessor:
         
         Args:
             screenshot: Path to screenshot image or numpy array
-            min_confidence: Minimum confidence level (0-1)
+            min_confidence: Minimum confidence level (0-1); below 0.2 is always dropped as noise
             
         Returns:
-            List of tuples (text, x, y, confidence) for each text region
+            List of tuples (text, x, y, confidence) for each text region, highest confidence first
         """
         if not self.has_ocr:
             return []
             
-        # Process the image using the same code as in find_text_in_screenshot
-        pil_image = None
-        
-        if isinstance(screenshot, str):
-            if os.path.exists(screenshot):
-                pil_image = Image.open(screenshot)
-            else:
-                return []
-        elif isinstance(screenshot, np.ndarray):
-            np_image = screenshot
-            # Convert BGR to RGB if needed
-            if len(np_image.shape) == 3 and np_image.shape[2] == 3:
-                np_image_rgb = cv2.cvtColor(np_image, cv2.COLOR_BGR2RGB)
-                pil_image = Image.fromarray(np_image_rgb)
-            else:
-                pil_image = Image.fromarray(np_image)
-        elif HAVE_PIL and isinstance(screenshot, Image.Image):
-            pil_image = screenshot
-        else:
+        # Same input handling, OCR passes and cache as find_text_in_screenshot
+        loaded = self._load_screenshot(screenshot)
+        if loaded is None:
             return []
-            
-        # Get all text from the image
-        results = []
         
         try:
-            # Use multiple OCR configurations for better results
-            ocr_configs = ["", "--psm 6", "--psm 11 --oem 1"]
-            
-            for config in ocr_configs:
-                ocr_data = pytesseract.image_to_data(pil_image, output_type=pytesseract.Output.DICT, config=config)
-                
-                for i, text in enumerate(ocr_data['text']):
-                    if not text.strip():
-                        continue
-                        
-                    conf = float(ocr_data['conf'][i]) / 100.0
-                    if conf < min_confidence:
-                        continue
-                        
-                    x = ocr_data['left'][i] + ocr_data['width'][i] // 2
-                    y = ocr_data['top'][i] + ocr_data['height'][i] // 2
-                    
-                    results.append((text.strip(), x, y, conf))
+            blocks = self._ocr_text_blocks(*loaded)
         except Exception as e:
             if self.debug_mode:
                 print(f"Error getting all text regions: {e}")
-                
-        return results
+            return []
+        
+        # Blocks come highest confidence first, so stop at the first one below the minimum
+        return [(block['text'], block['x'] + block['width'] // 2, block['y'] + block['height'] // 2, block['conf'])
+                for block in itertools.takewhile(lambda block: block['conf'] >= min_confidence, blocks)]
     
     def find_template_in_screenshot(self, template_path: str, screenshot: Union[str, np.ndarray], 
-                                    threshold: float = 0.7) -> Optional[Tuple[int, int, float]]:
+                                    threshold: float = 0.7,
+                                    search_roi: Optional[Tuple[int, int, int, int]] = None) -> Optional[Tuple[int, int, float]]:
         """
         Find a template image in a screenshot using template matching.
         
@@ -574,6 +1611,9 @@ class ImageProcessor:
             template_path: Path to template image
             screenshot: Path to screenshot image or numpy array
             threshold: Minimum confidence level for a match (0-1)
+            search_roi: Optional (x0, y0, x1, y1) region to search first, such as
+                        where the template was last found; the whole screenshot
+                        is searched if there's no match inside it
             
         Returns:
             Tuple of (x, y, confidence) for the best match, or None if no matches
@@ -584,36 +1624,63 @@ class ImageProcessor:
             return None
         
         try:
-            # Load the template
-            template = cv2.imread(template_path)
-            if template is None:
+            # Load the template (decoded once per version of the file)
+            loaded = _load_template(template_path)
+            if loaded is None:
                 if self.debug_mode:
                     print(f"Could not load template image: {template_path}")
                 return None
             
-            # Load the screenshot if it's a file path
+            # Load the screenshot if it's a file path. Matching runs on grayscale,
+            # a third of the data of BGR.
             if isinstance(screenshot, str):
-                screenshot_img = cv2.imread(screenshot)
+                screenshot_img = cv2.imread(screenshot, cv2.IMREAD_GRAYSCALE)
                 if screenshot_img is None:
                     if self.debug_mode:
                         print(f"Could not load screenshot image: {screenshot}")
                     return None
             else:
-                screenshot_img = screenshot
+                # Captures of the same window come in the same size every poll, so the
+                # conversion writes into the previous call's buffer
+                if isinstance(screenshot, np.ndarray) and screenshot.ndim == 3:
+                    if self._gray_buf is None or self._gray_buf.shape != screenshot.shape[:2]:
+                        self._gray_buf = np.empty(screenshot.shape[:2], dtype=np.uint8)
+                screenshot_img = _to_gray_ndarray(screenshot, self._gray_buf)
             
             # Get dimensions of template for later use
-            h, w = template.shape[:2]
+            h, w = loaded[0].shape[:2]
+            
+            # Polling loops mostly search frames that haven't changed since the last
+            # search for the same template; hashing the pixels is far cheaper than matching
+            search_key = None
+            if screenshot_img.ndim == 2:
+                search_key = (_fingerprint(screenshot_img), threshold, search_roi)
+                cached = self._template_results.get(template_path)
+                if cached is not None and cached[0] is loaded and cached[1] == search_key:
+                    if self.debug_mode:
+                        print(f"Screenshot unchanged since last search, reusing template result: {cached[2]}")
+                    return cached[2]
             
-            # Perform template matching
-            result = cv2.matchTemplate(screenshot_img, template, cv2.TM_CCOEFF_NORMED)
+            # A local search around the last known position is much cheaper than a full one
+            max_val, max_loc = -1.0, (0, 0)
+            if search_roi is not None and screenshot_img.ndim == 2:
+                x0, y0, x1, y1 = search_roi
+                x0, y0 = max(0, x0), max(0, y0)
+                x1, y1 = min(screenshot_img.shape[1], x1), min(screenshot_img.shape[0], y1)
+                if x1 - x0 >= w and y1 - y0 >= h:
+                    max_val, max_loc = self._locate_template(screenshot_img[y0:y1, x0:x1], loaded, threshold)
+                    max_loc = (max_loc[0] + x0, max_loc[1] + y0)
+                    if self.debug_mode and max_val < threshold:
+                        print(f"No template match in search region {search_roi}, searching whole screenshot")
             
-            # Find the best match location
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+            if max_val < threshold:
+                max_val, max_loc = self._locate_template(screenshot_img, loaded, threshold)
             
             if self.debug_mode:
                 print(f"Template match confidence: {max_val:.4f} (threshold: {threshold:.4f})")
             
             # Check if the match meets the threshold
+            result = None
             if max_val >= threshold:
                 # Calculate the center point of the match
                 x = max_loc[0] + w // 2
@@ -622,17 +1689,211 @@ class ImageProcessor:
                 if self.debug_mode:
                     print(f"Template match found at ({x}, {y}) with confidence {max_val:.4f}")
                 
-                return (x, y, max_val)
+                result = (x, y, max_val)
             else:
                 if self.debug_mode:
                     print(f"No template match above threshold {threshold:.4f}")
-                return None
+            
+            if search_key is not None:
+                self._template_results[template_path] = (loaded, search_key, result)
+            return result
             
         except Exception as e:
             if self.debug_mode:
                 print(f"Error finding template in screenshot: {e}")
             return None
     
+    def _locate_template(self, image: np.ndarray, templates: Tuple[np.ndarray, ...],
+                         threshold: float) -> Tuple[float, Tuple[int, int]]:
+        """
+        Find the best match of a template in an image.
+        
+        Args:
+            image: Grayscale image to search
+            templates: Template followed by its pyrDown levels, as returned by _load_template
+            threshold: Minimum confidence level for a match (0-1)
+            
+        Returns:
+            Tuple of (best confidence, top-left corner of the best match)
+        """
+        template = templates[0]
+        h, w = template.shape[:2]
+        
+        # Coarse-to-fine when the template is large enough
+        fits = image.ndim == 2 and image.shape[0] >= h and image.shape[1] >= w
+        if fits and len(templates) > 1:
+            return self._match_template_pyramid(image, templates, threshold)
+        
+        result = self._match_template(image, template)
+        
+        # Find the best match location
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        return max_val, max_loc
+    
+    def _match_template(self, image: np.ndarray, template: np.ndarray) -> np.ndarray:
+        """
+        Run normalized cross-correlation template matching over a whole image.
+        
+        The result is written into a buffer reused across calls, so it is only
+        valid until the next call.
+        
+        Args:
+            image: Grayscale image to search
+            template: Grayscale template
+            
+        Returns:
+            Match score for every template position
+        """
+        if self._opencl_enabled():
+            # Transparent API: the same call runs as an OpenCL kernel on UMat inputs
+            return cv2.matchTemplate(cv2.UMat(image), self._template_umat(template), cv2.TM_CCOEFF_NORMED).get()
+        
+        if image.ndim != 2:
+            return cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
+        
+        # Same frame and template sizes come round again in polling loops
+        shape =(image.shape[0] - template.shape[0] + 1, image.shape[1] - template.shape[1] + 1)
+        if self._result_buf is None or self._result_buf.shape != shape:
+            self._result_buf = np.empty(shape, dtype=np.float32)
+        return cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED, result=self._result_buf)
+    
+    def _opencl_enabled(self) -> bool:
+        """
+        Check whether template matching runs on OpenCL, probing for it on first use.
+        
+        Returns:
+            True if OpenCV found a usable OpenCL device
+        """
+        if self.use_opencl is None:
+            self.use_opencl = HAVE_CV2 and cv2.ocl.haveOpenCL()
+            if self.use_opencl:
+                cv2.ocl.setUseOpenCL(True)
+        return self.use_opencl
+    
+    def _template_umat(self, template: np.ndarray) -> 'cv2.UMat':
+        """
+        Get a template's copy in OpenCL device memory, uploading it on first use.
+        
+        Args:
+            template: Grayscale template, as cached by _load_template
+            
+        Returns:
+            UMat holding the template
+        """
+        # Keyed by identity; each entry keeps its array alive so the id can't be reused
+        cached = self._umat_cache.get(id(template))
+        if cached is not None:
+            self._umat_cache.move_to_end(id(template))
+            return cached[1]
+        
+        umat = cv2.UMat(template)
+        self._umat_cache[id(template)] = (template, umat)
+        while len(self._umat_cache) > 64:
+            self._umat_cache.popitem(last=False)
+        return umat
+    
+    def _match_template_pyramid(self, image: np.ndarray, templates: Tuple[np.ndarray, ...],
+                                threshold: float) -> Tuple[float, Tuple[int, int]]:
+        """
+        Match a template at the coarsest pyramid level, then refine the best candidates level by level.
+        
+        Args:
+            image: Grayscale screenshot as a numpy array
+            templates: Template followed by its pyrDown levels, as returned by _load_template
+            threshold: Minimum confidence level for a match (0-1)
+            
+        Returns:
+            Tuple of (best confidence, top-left corner of the best match)
+        """
+        # Screenshot pyramid matching the template's
+        images = [image]
+        for _ in templates[1:]:
+            images.append(cv2.pyrDown(images[-1]))
+        depth = len(templates) - 1
+        
+        # Coarse pass; anything reasonably close to the threshold is a candidate
+        coarse = self._match_template(images[depth], templates[depth])
+        candidates = (coarse >= 0.6 * threshold).astype(np.uint8)
+        
+        # Join neighbouring candidates into regions (square kernel, cheapest to apply)
+        candidates = cv2.morphologyEx(candidates, cv2.MORPH_CLOSE, np.ones((3, 3), np.uint8))
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(candidates, connectivity=8)
+        
+        if count <= 1:
+            # Nothing came close; report the coarse score for diagnostics
+            _, max_val, _, max_loc = cv2.minMaxLoc(coarse)
+            return max_val, (max_loc[0] << depth, max_loc[1] << depth)
+        
+        # Refine only the regions with the highest coarse peaks
+        regions = stats[1:, :4]
+        if len(regions) > PYRAMID_MAX_CANDIDATES:
+            mask = labels > 0
+            peaks = np.full(count, -1.0, dtype=np.float32)
+            np.maximum.at(peaks, labels[mask], coarse[mask])
+            regions = regions[np.argpartition(-peaks[1:], PYRAMID_MAX_CANDIDATES)[:PYRAMID_MAX_CANDIDATES]]
+        
+        # Each region's match positions, as (x0, y0, x1, y1) at the coarsest level
+        windows = [(left, top, left + width - 1, top + height - 1)
+                   for left, top, width, height in regions.tolist()]
+        
+        best_val, best_loc = -1.0, (0, 0)
+        for level in range(depth - 1, -1, -1):
+            level_image = images[level]
+            template = templates[level]
+            image_h, image_w = level_image.shape[:2]
+            h, w = template.shape[:2]
+            
+            # Search each window at twice the resolution, with a margin of two
+            # pixels for the rounding in pyrDown; finer levels only need the
+            # neighbourhood of each window's best position
+            refined = []
+            for x0, y0, x1, y1 in windows:
+                x0 = max(0, 2 * x0 - 2)
+                y0 = max(0, 2 * y0 - 2)
+                x1 = min(image_w - w, 2 * x1 + 2)
+                y1 = min(image_h - h, 2 * y1 + 2)
+                if x1 < x0 or y1 < y0:
+                    continue
+                
+                result = cv2.matchTemplate(level_image[y0:y1 + h, x0:x1 + w], template, cv2.TM_CCOEFF_NORMED)
+                _, max_val, _, max_loc = cv2.minMaxLoc(result)
+                x, y = x0 + max_loc[0], y0 + max_loc[1]
+                refined.append((x, y, x, y))
+                if level == 0 and max_val > best_val:
+                    best_val, best_loc = max_val, (x, y)
+            windows = refined
+        
+        return best_val, best_loc
+    
     def cleanup(self) -> None:
         """Clean up any resources or temporary files."""
-        pass
\ No newline at end of file
+        self._ocr_cache.clear()
+        self._umat_cache.clear()
+        self._template_results.clear()
+        if self.use_tesserocr:
+            _tesserocr_end()
+        
+        if self._debug_pool is not None:
+            self._debug_pool.shutdown(wait=False)
+            self._debug_pool = None
+            self._debug_writes = []
+        
+        if self._ocr_pool is not None:
+            self._ocr_pool.shutdown(wait=True)
+            self._ocr_pool = None
+        
+        # Let a running capture finish before its X connection is closed
+        if self._capture_pool is not None:
+            self._capture_pool.shutdown(wait=True)
+            self._capture_pool = None
+        
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
+        if self._display is not None:
+            self._display.close()
+            self._display = None
+        
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
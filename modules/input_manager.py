@@ -8,11 +8,13 @@ Supports both standard XTest-based input and virtual pointer input via xinput.
 
 import os
 import time
+import shutil
 import subprocess
 from typing import Tuple, Optional, Dict, Any
 import Xlib
 from Xlib import X, XK, display
 from Xlib.ext import xtest
+from Xlib.protocol import event
 
 class InputManager:
     """
@@ -20,19 +22,37 @@ class InputManager:
     Can work with either the standard cursor or a virtual cursor.
     """
     
-    def __init__(self, use_virtual_pointer: bool = False, debug_mode: bool = False):
+    def __init__(self, use_virtual_pointer: bool = False, debug_mode: bool = False,
+                 use_send_event: bool = False):
         """
         Initialize the input manager.
         
         Args:
             use_virtual_pointer: Whether to use a virtual pointer instead of moving the main cursor
             debug_mode: Whether to output debug information
+            use_send_event: Whether to send clicks in a window straight to it with
+                            XSendEvent instead of moving the pointer with XTest
         """
         self.debug_mode = debug_mode
         self.use_virtual_pointer = use_virtual_pointer
+        self.use_send_event = use_send_event
         self.display = display.Display()
         self.root = self.display.screen().root
         
+        # Delay between button press and release in milliseconds, applied by the X server
+        self.click_delay = 50
+        
+        # xdotool types whole strings in one process, modifiers included
+        self.has_xdotool = shutil.which("xdotool") is not None
+        
+        # Screen offset of each window clicked in: window_id -> (dx, dy, time looked up).
+        # Offsets are reused for geometry_ttl seconds, in case the window moves.
+        self._geom_cache = {}
+        self.geometry_ttl = 1.0
+        
+        # Keycode of each character typed so far (0 if it has none), filled on first use
+        self._keycode_cache = {}
+        
         # Virtual pointer details if enabled
         self.virtual_pointer_id = None
         
@@ -107,6 +127,8 @@ class InputManager:
         try:
             if self.use_virtual_pointer and self.virtual_pointer_id:
                 return self._click_virtual(x, y, button, window_id)
+            elif self.use_send_event and window_id:
+                return self._click_send_event(x, y, button, window_id)
             else:
                 return self._click_xtest(x, y, button, window_id)
         except Exception as e:
@@ -114,6 +136,59 @@ class InputManager:
                 print(f"Click error: {e}")
             return False
     
+    def _to_root_coords(self, x: int, y: int, window_id: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Convert window coordinates to screen coordinates.
+        
+        Args:
+            x: X coordinate relative to window
+            y: Y coordinate relative to window
+            window_id: Window the coordinates are relative to; None if they are
+                       screen coordinates already
+            
+        Returns:
+            Tuple of (x, y) relative to the root window
+        """
+        if not window_id:
+            # Use coordinates as given
+            return x, y
+        
+        dx, dy = self._resolve_abs(window_id)
+        return x + dx, y + dy
+    
+    def _resolve_abs(self, window_id: int) -> Tuple[int, int]:
+        """
+        Get the screen position of a window's origin, cached for geometry_ttl seconds.
+        
+        Args:
+            window_id: X11 window ID
+            
+        Returns:
+            Tuple of (dx, dy) to add to window coordinates
+        """
+        now = time.monotonic()
+        cached = self._geom_cache.get(window_id)
+        if cached is not None and now - cached[2] < self.geometry_ttl:
+            return cached[0], cached[1]
+        
+        # One request, rather than walking up the window tree a parent at a time
+        window = self.display.create_resource_object('window', window_id)
+        coords = self.root.translate_coords(window, 0, 0)
+        self._geom_cache[window_id] = (coords.x, coords.y, now)
+        return coords.x, coords.y
+    
+    def invalidate_geometry(self, window_id: Optional[int] = None) -> None:
+        """
+        Forget cached window positions, e.g. after moving a window.
+        
+        Args:
+            window_id: Window to forget, or None for all windows
+        """
+        if window_id is None:
+            self._geom_cache.clear()
+        else:
+            self._geom_cache.pop(window_id, None)
+    
     def _click_xtest(self, x: int, y: int, button: int = 1, window_id: Optional[int] = None) -> bool:
         """
         Perform a mouse click using XTest.
@@ -129,24 +204,7 @@ class InputManager:
         """
         try:
             # Get absolute coordinates if window_id is provided
-            if window_id:
-                window = self.display.create_resource_object('window', window_id)
-                geom = window.get_geometry()
-                x_abs, y_abs = x, y
-                
-                # Translate to absolute coordinates
-                while True:
-                    parent = window.query_tree().parent
-                    pgeom = parent.get_geometry()
-                    x_abs += geom.x
-                    y_abs += geom.y
-                    if parent == self.root:
-                        break
-                    window = parent
-                    geom = pgeom
-            else:
-                # Use coordinates as given
-                x_abs, y_abs = x, y
+            x_abs, y_abs = self._to_root_coords(x, y, window_id)
             
             if self.debug_mode:
                 print(f"Targeting absolute position: ({x_abs}, {y_abs})")
@@ -159,21 +217,21 @@ class InputManager:
             # The previous implementation was incorrect as XTest fake_input doesn't support 
             # passing x,y coordinates directly to click events
             
-            # 1. Move the synthetic pointer using XTest (this doesn't move the real cursor)
+            # 1. Move the synthetic pointer using XTest (this doesn't move the real cursor).
+            # The server handles the queued events in order, so nothing is synced in between.
             xtest.fake_input(self.display, X.MotionNotify, 0, x=x_abs, y=y_abs)
-            self.display.sync()
             
-            # 2. Send button events at the current synthetic position
+            # 2. Send button events at the current synthetic position. The server
+            # holds the release for click_delay ms, so we don't sleep here
             xtest.fake_input(self.display, X.ButtonPress, button)
-            self.display.sync()
-            time.sleep(0.1)  # Small delay between press and release
-            xtest.fake_input(self.display, X.ButtonRelease, button)
-            self.display.sync()
+            xtest.fake_input(self.display, X.ButtonRelease, button, self.click_delay)
             
             # 3. Move the synthetic pointer back to original position
             # This ensures we don't leave the synthetic cursor somewhere unexpected
             xtest.fake_input(self.display, X.MotionNotify, 0, x=old_x, y=old_y)
-            self.display.sync()
+            
+            # Send without waiting: a sync would block until the delayed release is processed
+            self.display.flush()
             
             if self.debug_mode:
                 print(f"Click executed at ({x_abs}, {y_abs}), then restored to ({old_x}, {old_y})")
@@ -185,6 +243,47 @@ class InputManager:
                 print(f"XTest click error: {e}")
             return False
     
+    def _click_send_event(self, x: int, y: int, button: int, window_id: int) -> bool:
+        """
+        Perform a mouse click by sending button events straight to a window.
+        
+        The pointer never moves, so there is no position to save and restore.
+        The events are marked as synthetic, and some applications ignore them.
+        
+        Args:
+            x: X coordinate relative to window
+            y: Y coordinate relative to window
+            button: Mouse button (1=left, 2=middle, 3=right)
+            window_id: Window to click in
+            
+        Returns:
+            bool: Whether the events were sent
+        """
+        try:
+            x_abs, y_abs = self._to_root_coords(x, y, window_id)
+            window = self.display.create_resource_object('window', window_id)
+            
+            fields = dict(time=X.CurrentTime, root=self.root, window=window, child=X.NONE,
+                          root_x=x_abs, root_y=y_abs, event_x=x, event_y=y, detail=button,
+                          same_screen=1)
+            
+            # The release reports the button as held, as a real one would
+            window.send_event(event.ButtonPress(state=0, **fields),
+                              event_mask=X.ButtonPressMask, propagate=True)
+            window.send_event(event.ButtonRelease(state=X.Button1Mask << (button - 1), **fields),
+                              event_mask=X.ButtonReleaseMask, propagate=True)
+            self.display.flush()
+            
+            if self.debug_mode:
+                print(f"Sent click to window {window_id} at ({x}, {y})")
+            
+            return True
+            
+        except Exception as e:
+            if self.debug_mode:
+                print(f"SendEvent click error: {e}")
+            return False
+    
     def _click_virtual(self, x: int, y: int, button: int = 1, window_id: Optional[int] = None) -> bool:
         """
         Perform a mouse click using the virtual pointer.
@@ -205,25 +304,8 @@ class InputManager:
         
         # For now, we'll just simulate it with xinput command
         try:
-            # Get absolute coordinates if window_id is provided (similar to _click_xtest)
-            if window_id:
-                window = self.display.create_resource_object('window', window_id)
-                geom = window.get_geometry()
-                x_abs, y_abs = x, y
-                
-                # Translate to absolute coordinates
-                while True:
-                    parent = window.query_tree().parent
-                    pgeom = parent.get_geometry()
-                    x_abs += geom.x
-                    y_abs += geom.y
-                    if parent == self.root:
-                        break
-                    window = parent
-                    geom = pgeom
-            else:
-                # Use coordinates as given
-                x_abs, y_abs = x, y
+            # Get absolute coordinates if window_id is provided
+            x_abs, y_abs = self._to_root_coords(x, y, window_id)
                 
             # Here we'd use XInput to move the virtual pointer and generate click events
             # This is just a placeholder that prints what would happen
@@ -240,7 +322,7 @@ class InputManager:
     
     def type_text(self, text: str, window_id: Optional[int] = None) -> bool:
         """
-        Type text using XTest keyboard events.
+        Type text, with xdotool if available and XTest keyboard events otherwise.
         
         Args:
             text: Text to type
@@ -250,16 +332,35 @@ class InputManager:
             bool: Whether the typing was successful
         """
         try:
-            # Focus window if provided
+            use_xdotool = self.has_xdotool and bool(text)
+            
+            # Focus window if provided. Our own key events queue up behind the
+            # request, but xdotool has its own connection, so wait for the focus
+            # change to be processed before it starts typing.
             if window_id:
                 window = self.display.create_resource_object('window', window_id)
                 window.set_input_focus(X.RevertToParent, X.CurrentTime)
-                self.display.sync()
+                if use_xdotool:
+                    self.display.sync()
+            
+            # One xdotool run sends the whole string and syncs once at the end.
+            # It types into the focused window; --window would use XSendEvent,
+            # which many applications ignore.
+            if use_xdotool:
+                result = subprocess.run(
+                    ["xdotool", "type", "--delay", "1", "--", text],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+                if result.returncode == 0:
+                    return True
+                if self.debug_mode:
+                    print(f"xdotool type failed with exit code {result.returncode}, using XTest")
             
-            # Type each character
+            # Type each character. The server processes the events in order, so
+            # they are queued without delays and sent with a single round-trip.
             for char in text:
                 self._type_character(char)
-                time.sleep(0.01)  # Small delay between characters
+            self.display.sync()
                 
             return True
             
@@ -270,22 +371,21 @@ class InputManager:
     
     def _type_character(self, char: str) -> None:
         """
-        Type a single character using XTest.
+        Queue the XTest key events that type a single character.
         
         Args:
             char: Character to type
         """
         # Get the keycode for the character
-        keysym = XK.string_to_keysym(char)
-        keycode = self.display.keysym_to_keycode(keysym)
+        keycode = self._keycode_cache.get(char)
+        if keycode is None:
+            keysym = XK.string_to_keysym(char)
+            keycode = self._keycode_cache[char] = self.display.keysym_to_keycode(keysym)
         
         if keycode:
             # Press and release the key
             xtest.fake_input(self.display, X.KeyPress, keycode)
-            self.display.sync()
-            time.sleep(0.01)
             xtest.fake_input(self.display, X.KeyRelease, keycode)
-            self.display.sync()
         else:
             if self.debug_mode:
                 print(f"Could not find keycode for character: {char}")
@@ -8,10 +8,12 @@ Captures mouse clicks and keyboard input within a specified window.
 
 import os
 import time
-import json
+import struct
 import threading
-from typing import List, Dict, Tuple, Optional, Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Any, Callable
 from datetime import datetime
+import numpy as np
 
 from Xlib import X
 from Xlib.display import Display
@@ -20,6 +22,17 @@ from Xlib.protocol import rq
 
 from .window_manager import WindowManager
 from .image_processor import ImageProcessor
+from .config_manager import write_config
+
+# Keysyms of the modifier keys (Shift_L through Hyper_R), which aren't recorded
+MODIFIER_KEYSYMS = frozenset(range(0xffe1, 0xffeb))
+
+# Recorded core events are 32 bytes in the client's byte order. Key and button
+# events start with the type and carry their event window at byte 12.
+_EVENT_SIZE = 32
+_EVENT_HEADER = struct.Struct('=B11xL')
+_EVENT_FIELD = rq.EventField(None)
+_RECORDED_TYPES = frozenset((X.ButtonPress, X.KeyPress))
 
 class ActionRecorder:
     """
@@ -40,23 +53,57 @@ class ActionRecorder:
         self.image_processor = image_processor
         self.debug_mode = debug_mode
         
-        # X11 display for recording
+        # X11 display for recording. XRecord blocks the connection a context is
+        # enabled on, so a second one is opened for each recording and closed
+        # by the record thread when it ends
         self.display = Display()
-        self.record_display = Display()
+        self.record_display = None
         
-        # Recording state
-        self.is_recording = False
+        # Recording state; the event is set whenever no recording is running
+        self._stop = threading.Event()
+        self._stop.set()
         self.record_thread = None
         self.start_time = 0
         self.actions = []
         self.target_window_id = None
         self.window_geometry = None
+        
+        # Target window position and size as plain ints, for per-event bounds checks
+        self._wx = self._wy = self._ww = self._wh = 0
         self.last_action_time = 0
         self.record_keyboard = True
         self.record_mouse = True
+        self._recorded_types = _RECORDED_TYPES
         
-        # Context for Xlib recording
+        # Context for Xlib recording, freed by the record thread once it ends
         self.ctx = None
+        
+        # Debug-mode screenshot and OCR of recorded clicks runs on its own thread
+        # (created on first use), so the record callback never waits for it. At most
+        # max_pending_analyses clicks wait their turn; later ones aren't analysed.
+        self._analysis_pool = None
+        self._analysis_jobs = []
+        self.max_pending_analyses = 64
+        
+        # Actions recorded so far, owned by the record thread, and the click_text
+        # alternative found for each click (by id), owned by the analysis thread.
+        # stop_recording splices both into self.actions once the threads are done.
+        self._pending = []
+        self._alternatives = {}
+        
+        # type_text action still being typed and its characters, joined into its
+        # text by _flush_typed_text rather than concatenated per keystroke
+        self._typing_action = None
+        self._typed_chars = []
+        
+        # Character typed by each keycode seen so far (None for modifiers and
+        # unmappable keys), filled on first use
+        self._char_cache = {}
+    
+    @property
+    def is_recording(self) -> bool:
+        """Whether a recording is running."""
+        return not self._stop.is_set()
     
     def start_recording(self, window_id: int, record_keyboard: bool = True,
                       record_mouse: bool = True) -> bool:
@@ -84,16 +131,26 @@ class ActionRecorder:
             return False
         
         self.target_window_id = window_id
-        self.window_geometry = window
+        self._set_window_geometry(window)
         self.record_keyboard = record_keyboard
         self.record_mouse = record_mouse
         
+        # Event types _process_event parses, checked with one set lookup per event
+        self._recorded_types = frozenset(
+            event_type for event_type, enabled in ((X.ButtonPress, record_mouse), (X.KeyPress, record_keyboard))
+            if enabled)
+        
         # Reset actions list and start time
         self.actions = []
+        self._pending = []
+        self._alternatives = {}
+        self._typing_action = None
+        self._typed_chars = []
         self.start_time = time.time()
         self.last_action_time = self.start_time
         
-        # Create record context
+        # Create record context on a connection of its own
+        self.record_display = Display()
         self.ctx = self.record_display.record_create_context(
             0,
             [record.AllClients],
@@ -113,7 +170,7 @@ class ActionRecorder:
         )
         
         # Start recording thread
-        self.is_recording = True
+        self._stop.clear()
         self.record_thread = threading.Thread(target=self._record_thread)
         self.record_thread.daemon = True
         self.record_thread.start()
@@ -142,16 +199,38 @@ class ActionRecorder:
             return self.actions
         
         # Stop recording
-        self.is_recording = False
+        self._stop.set()
         
-        # Stop record context
-        if self.ctx:
-            self.record_display.record_free_context(self.ctx)
-            self.ctx = None
+        # Disabling the context from the other connection makes the record thread's
+        # record_enable_context return; the thread then frees the context
+        ctx = self.ctx
+        if ctx is not None:
+            try:
+                self.display.record_disable_context(ctx)
+                self.display.flush()
+            except Exception as e:
+                if self.debug_mode:
+                    print(f"Error disabling record context: {e}")
         
         if self.record_thread:
             self.record_thread.join(timeout=1.0)
         
+        # Let queued click analyses add their alternatives first
+        if self._analysis_pool is not None:
+            self._analysis_pool.shutdown(wait=True)
+            self._analysis_pool = None
+            self._analysis_jobs = []
+        
+        # Splice the recorded actions in, each click followed by its alternative
+        self._flush_typed_text()
+        for action in self._pending:
+            self.actions.append(action)
+            alternative = self._alternatives.pop(id(action), None)
+            if alternative is not None:
+                self.actions.append(alternative)
+        self._pending = []
+        self._alternatives = {}
+        
         # Calculate relative timing for all actions
         if self.actions:
             self._normalize_action_timing()
@@ -165,17 +244,23 @@ class ActionRecorder:
     
     def _record_thread(self) -> None:
         """Record thread function."""
+        record_display = self.record_display
         try:
-            self.record_display.record_enable_context(self.ctx, self._process_event)
+            record_display.record_enable_context(self.ctx, self._process_event)
             # This is a blocking call that returns after record_disable_context()
         except Exception as e:
             if self.debug_mode:
                 print(f"Recording error: {e}")
         finally:
-            # Clean up
-            if self.ctx:
-                self.record_display.record_free_context(self.ctx)
-                self.ctx = None
+            # Clean up; only this thread frees the context and its connection
+            try:
+                if self.ctx is not None:
+                    record_display.record_free_context(self.ctx)
+                    self.ctx = None
+            finally:
+                record_display.close()
+                if self.record_display is record_display:
+                    self.record_display = None
             
             if self.debug_mode:
                 print("Recording thread ended")
@@ -187,7 +272,7 @@ class ActionRecorder:
         Args:
             reply: X11 event reply
         """
-        if not self.is_recording:
+        if self._stop.is_set():
             return
         
         if reply.category != record.FromServer:
@@ -197,40 +282,30 @@ class ActionRecorder:
             # Not handling swapped clients
             return
         
+        # Peek at each event's type and window, and only parse the ones recorded;
+        # most are pointer motion or meant for other windows
         data = reply.data
-        while len(data):
-            event, data = rq.EventField(None).parse_binary_value(
-                data, self.record_display.display, None, None)
+        target = self.target_window_id
+        recorded_types = self._recorded_types
+        for offset in range(0, len(data) - _EVENT_SIZE + 1, _EVENT_SIZE):
+            event_type, window_id = _EVENT_HEADER.unpack_from(data, offset)
+            event_type &= 0x7f  # strip the SendEvent flag
             
-            # Skip events for windows other than our target
-            window_id = self._get_event_window_id(event)
-            if window_id is None or window_id != self.target_window_id:
+            # Skip unrecorded event types and windows other than our target
+            if event_type not in recorded_types or window_id != target:
                 continue
             
+            event, _ = _EVENT_FIELD.parse_binary_value(
+                data[offset:offset + _EVENT_SIZE], self.record_display.display, None, None)
             current_time = time.time()
             
-            if event.type == X.ButtonPress and self.record_mouse:
+            if event_type == X.ButtonPress:
                 # Mouse button press
                 self._add_mouse_click_action(event, current_time)
-            
-            elif event.type == X.KeyPress and self.record_keyboard:
+            else:
                 # Keyboard key press
                 self._add_keyboard_action(event, current_time)
     
-    def _get_event_window_id(self, event) -> Optional[int]:
-        """
-        Get the window ID from an X11 event.
-        
-        Args:
-            event: X11 event
-            
-        Returns:
-            Window ID or None
-        """
-        if hasattr(event, 'event'):
-            return event.event
-        return None
-    
     def _add_mouse_click_action(self, event, timestamp: float) -> None:
         """
         Add a mouse click action to the recording.
@@ -239,11 +314,13 @@ class ActionRecorder:
             event: X11 event
             timestamp: Event timestamp
         """
-        # Get relative coordinates within the window
-        x_rel, y_rel = self._get_relative_coordinates(event.root_x, event.root_y)
+        # Translate global coordinates to window-relative
+        x_rel = event.root_x - self._wx
+        y_rel = event.root_y - self._wy
         
-        # Only record if coordinates are within window bounds
-        if x_rel < 0 or y_rel < 0 or x_rel > self.window_geometry['width'] or y_rel > self.window_geometry['height']:
+        # Only record if coordinates are within window bounds; the OR of two ints
+        # is negative if either of them is
+        if (x_rel | y_rel) < 0 or x_rel > self._ww or y_rel > self._wh:
             return
         
         # Add action
@@ -255,42 +332,70 @@ class ActionRecorder:
             'timestamp': timestamp
         }
         
-        self.actions.append(action)
+        self._pending.append(action)
         self.last_action_time = timestamp
         
         if self.debug_mode:
             print(f"Recorded mouse click: button={event.detail}, pos=({x_rel}, {y_rel})")
-            
-            # Take a screenshot and check if there's text or an image at the clicked location
-            try:
-                screenshot = self.image_processor.capture_window_screenshot(self.target_window_id)
-                if screenshot:
-                    # Try to find text near the click
-                    words = self.image_processor.get_text_in_region(
-                        screenshot, 
-                        x_rel - 50, y_rel - 50, 
-                        100, 100
-                    )
-                    if words:
-                        print(f"  Text detected near click: {', '.join(words)}")
-                        
-                        # If we find text, add a click_text action as an alternative
-                        # This can make the automation more robust
-                        for word in words:
-                            if len(word) > 3:  # Only consider words with >3 chars
-                                alt_action = {
-                                    'type': 'click_text',
-                                    'text': word,
-                                    'button': event.detail,
-                                    'timestamp': timestamp,
-                                    'is_alternative': True
-                                }
-                                self.actions.append(alt_action)
-                                print(f"  Added alternative text click action for: '{word}'")
-                                break
-            except Exception as e:
-                if self.debug_mode:
-                    print(f"Error analyzing click position: {e}")
+            self._queue_click_analysis(action)
+    
+    def _queue_click_analysis(self, action: Dict[str, Any]) -> None:
+        """
+        Queue a recorded click for screenshot and OCR on the analysis thread.
+        
+        Args:
+            action: Recorded click_position action
+        """
+        self._analysis_jobs = [job for job in self._analysis_jobs if not job.done()]
+        if len(self._analysis_jobs) >= self.max_pending_analyses:
+            print("  Click analysis is behind, skipping this click")
+            return
+        
+        if self._analysis_pool is None:
+            self._analysis_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='click-analysis')
+        self._analysis_jobs.append(self._analysis_pool.submit(self._analyze_click, action))
+    
+    def _analyze_click(self, action: Dict[str, Any]) -> None:
+        """
+        Look for text at a recorded click and add a click_text alternative for it.
+        
+        Runs on the analysis thread; the alternative ends up right after the click.
+        
+        Args:
+            action: Recorded click_position action
+        """
+        x_rel, y_rel = action['x'], action['y']
+        
+        # Take a screenshot and check if there's text or an image at the clicked location
+        try:
+            screenshot = self.image_processor.capture_window_screenshot(self.target_window_id)
+            if screenshot is not None:
+                # Try to find text near the click
+                words = self.image_processor.get_text_in_region(
+                    screenshot, 
+                    x_rel - 50, y_rel - 50, 
+                    100, 100
+                )
+                if words:
+                    print(f"  Text detected near click: {', '.join(words)}")
+                    
+                    # If we find text, add a click_text action as an alternative
+                    # This can make the automation more robust
+                    for word in words:
+                        if len(word) > 3:  # Only consider words with >3 chars
+                            alt_action = {
+                                'type': 'click_text',
+                                'text': word,
+                                'button': action['button'],
+                                'timestamp': action['timestamp'],
+                                'is_alternative': True
+                            }
+                            self._alternatives[id(action)] = alt_action
+                            print(f"  Added alternative text click action for: '{word}'")
+                            break
+        except Exception as e:
+            if self.debug_mode:
+                print(f"Error analyzing click position: {e}")
     
     def _add_keyboard_action(self, event, timestamp: float) -> None:
         """
@@ -302,73 +407,101 @@ class ActionRecorder:
         """
         # Convert keycode to character
         keycode = event.detail
-        keysym = self.display.keycode_to_keysym(keycode, 0)
+        if keycode in self._char_cache:
+            char = self._char_cache[keycode]
+        else:
+            char = self._char_cache[keycode] = self._keycode_to_char(keycode)
         
-        # Skip modifiers
-        if keysym in (0xffe1, 0xffe2, 0xffe3, 0xffe4, 0xffe5, 0xffe6, 0xffe7, 0xffe8, 0xffe9, 0xffea):
-            return
-        
-        # Try to get character
-        try:
-            char = self.display.lookup_string(keysym)
-            if not char:
-                if self.debug_mode:
-                    print(f"Unmappable key: {keysym}")
-                return
-        except:
+        # Skip modifiers and keys without a character
+        if char is None:
             return
         
         # If this is the first keystroke or it's been a while since the last one,
         # start a new type_text action
-        if not self.actions or self.actions[-1]['type'] != 'type_text' or \
+        pending = self._pending
+        if not pending or pending[-1] is not self._typing_action or \
            timestamp - self.last_action_time > 1.0:
+            self._flush_typed_text()
             action = {
                 'type': 'type_text',
                 'text': char,
                 'timestamp': timestamp
             }
-            self.actions.append(action)
-        else:
-            # Append to existing type_text action
-            self.actions[-1]['text'] += char
+            pending.append(action)
+            self._typing_action = action
+            self._typed_chars = []
+        
+        # Append to the type_text action being typed
+        self._typed_chars.append(char)
         
         self.last_action_time = timestamp
         
         if self.debug_mode:
             print(f"Recorded keystroke: '{char}'")
     
-    def _get_relative_coordinates(self, root_x: int, root_y: int) -> Tuple[int, int]:
+    def _flush_typed_text(self) -> None:
         """
-        Convert root window coordinates to coordinates relative to the target window.
+        Join the characters typed so far into the text of their type_text action.
+        
+        Typing may continue afterwards. Called on the record thread, or once it
+        has stopped.
+        """
+        if self._typing_action is not None and len(self._typed_chars) > 1:
+            self._typing_action['text'] = ''.join(self._typed_chars)
+    
+    def _keycode_to_char(self, keycode: int) -> Optional[str]:
+        """
+        Look up the character a key types.
         
         Args:
-            root_x: X coordinate relative to root window
-            root_y: Y coordinate relative to root window
+            keycode: X11 keycode
             
         Returns:
-            Tuple of (x, y) coordinates relative to target window
+            Character, or None for modifier and unmappable keys
         """
-        # Translate global coordinates to window-relative
-        x_rel = root_x - self.window_geometry['x']
-        y_rel = root_y - self.window_geometry['y']
+        keysym = self.display.keycode_to_keysym(keycode, 0)
+        if keysym in MODIFIER_KEYSYMS:
+            return None
+        
+        try:
+            char = self.display.lookup_string(keysym)
+        except Exception:
+            return None
         
-        return x_rel, y_rel
+        if not char:
+            if self.debug_mode:
+                print(f"Unmappable key: {keysym}")
+            return None
+        return char
+    
+    def _set_window_geometry(self, window: Dict[str, Any]) -> None:
+        """
+        Set the window whose events are recorded.
+        
+        Args:
+            window: Window information with 'x', 'y', 'width' and 'height'
+        """
+        self.window_geometry = window
+        self._wx, self._wy = int(window['x']), int(window['y'])
+        self._ww, self._wh = int(window['width']), int(window['height'])
     
     def _normalize_action_timing(self) -> None:
         """
         Convert absolute timestamps to relative delays between actions.
         """
-        prev_time = self.start_time
-        
-        for action in self.actions:
-            if 'timestamp' in action:
-                # Calculate delay since last action
-                delay = action['timestamp'] - prev_time
-                action['delay'] = max(0.1, round(delay, 2))  # Minimum delay of 0.1s, rounded to 2 decimal places
-                prev_time = action['timestamp']
-                
-                # Remove original timestamp
-                del action['timestamp']
+        timed = [action for action in self.actions if 'timestamp' in action]
+        if not timed:
+            return
+        
+        # Remove the original timestamps, computing all delays in one array pass
+        timestamps = np.fromiter((action.pop('timestamp') for action in timed),
+                                 dtype=np.float64, count=len(timed))
+        delays = np.diff(timestamps, prepend=self.start_time)
+        
+        # Minimum delay of 0.1s, rounded to 2 decimal places
+        delays = np.maximum(0.1, np.round(delays, 2))
+        for action, delay in zip(timed, delays.tolist()):
+            action['delay'] = delay
     
     def save_recording(self, filepath: str) -> bool:
         """
@@ -380,13 +513,12 @@ class ActionRecorder:
         Returns:
             Whether saving was successful
         """
-        # Add any missing delay values
-        for action in self.actions:
-            if 'delay' not in action:
-                action['delay'] = 0.1  # Default delay
+        self._flush_typed_text()
         
-        # Remove any alternative actions
-        actions = [a for a in self.actions if not a.get('is_alternative', False)]
+        # Stream the actions without alternatives; only those missing a delay
+        # are copied, to add the default one
+        actions = (action if 'delay' in action else {**action, 'delay': 0.1}
+                   for action in self.actions if not action.get('is_alternative', False))
         
         # Create config structure
         config = {
@@ -407,11 +539,12 @@ class ActionRecorder:
             if dir_path and not os.path.exists(dir_path):
                 os.makedirs(dir_path, exist_ok=True)
             
-            with open(filepath, 'w') as f:
-                json.dump(config, f, indent=2)
+            with open(filepath, 'wb') as f:
+                write_config(config, f)
             
             if self.debug_mode:
-                print(f"Saved {len(actions)} actions to {filepath}")
+                saved = sum(1 for action in self.actions if not action.get('is_alternative', False))
+                print(f"Saved {saved} actions to {filepath}")
             
             return True
         except Exception as e:
@@ -463,64 +596,57 @@ class ActionAnalyzer:
         if not actions:
             return []
         
-        optimized = []
-        skip_next = False
+        # Pull the fields the patterns compare into parallel lists once, so the
+        # pass below doesn't look them up in the action dicts again
+        types = [action['type'] for action in actions]
+        xs = [action.get('x', 0) for action in actions]
+        ys = [action.get('y', 0) for action in actions]
+        delays = [action.get('delay') for action in actions]
         
-        for i, action in enumerate(actions):
-            # Skip if marked in previous iteration
-            if skip_next:
-                skip_next = False
-                continue
-            
-            # Handle specific action types
-            if action['type'] == 'click_position':
-                # Check for a click followed by typing - this is likely a form field
-                if i < len(actions) - 1 and actions[i+1]['type'] == 'type_text':
-                    # Combine into a single action with an explicit click before typing
-                    combined = action.copy()
-                    combined['text'] = actions[i+1]['text']
-                    combined['type'] = 'click_and_type'
-                    
-                    if 'delay' in actions[i+1]:
-                        combined['delay'] = actions[i+1]['delay']
-                    
-                    optimized.append(combined)
-                    skip_next = True
-                else:
-                    optimized.append(action)
+        optimized = []
+        count = len(actions)
+        i = 0
+        while i < count:
+            action = actions[i]
+            kind = types[i]
+            nxt = i + 1
             
-            # Handle double-clicks
-            elif action['type'] == 'click_position' and i < len(actions) - 1:
-                next_action = actions[i+1]
-                if (next_action['type'] == 'click_position' and 
-                    abs(next_action['x'] - action['x']) < 5 and 
-                    abs(next_action['y'] - action['y']) < 5 and
-                    'delay' in next_action and next_action['delay'] < 0.3):
-                    
-                    # Looks like a double-click
+            if kind == 'click_position' and nxt < count:
+                next_kind = types[nxt]
+                
+                # A second click on the same spot right after the first is a double-click
+                if (next_kind == 'click_position' and
+                    abs(xs[nxt] - xs[i]) < 5 and abs(ys[nxt] - ys[i]) < 5 and
+                    delays[nxt] is not None and delays[nxt] < 0.3):
                     double_click = action.copy()
                     double_click['is_double_click'] = True
-                    
-                    if 'delay' in next_action:
-                        double_click['delay'] = next_action['delay']
-                    
+                    double_click['delay'] = delays[nxt]
                     optimized.append(double_click)
-                    skip_next = True
-                else:
-                    optimized.append(action)
+                    i += 2
+                    continue
+                
+                # A click followed by typing is likely a form field; combine them
+                # into a single action with an explicit click before typing
+                if next_kind == 'type_text':
+                    combined = action.copy()
+                    combined['text'] = actions[nxt]['text']
+                    combined['type'] = 'click_and_type'
+                    if delays[nxt] is not None:
+                        combined['delay'] = delays[nxt]
+                    optimized.append(combined)
+                    i += 2
+                    continue
             
-            else:
-                optimized.append(action)
+            optimized.append(action)
             
-            # Add a small wait after certain actions
-            if action['type'] in ('click_text', 'click_template'):
-                # Add a small wait to allow UI to update
-                wait_action = {
+            # Add a small wait after certain actions to allow the UI to update
+            if kind in ('click_text', 'click_template'):
+                optimized.append({
                     'type': 'wait',
                     'duration': 0.5,
                     'delay': 0
-                }
-                optimized.append(wait_action)
+                })
+            i += 1
         
         if self.debug_mode:
             print(f"Optimized {len(actions)} actions to {len(optimized)} actions")
@@ -7,12 +7,18 @@ Supports different window managers, including i3 and other tiling window manager
 """
 
 import os
+import shutil
 import subprocess
 import re
+import functools
 from typing import Dict, List, Tuple, Optional, Any
 import Xlib
 from Xlib import X, display
 
+# Position and size in `xdotool getwindowgeometry` output
+_POSITION_RE = re.compile(r"Position: (\d+),(\d+)")
+_GEOMETRY_RE = re.compile(r"Geometry: (\d+)x(\d+)")
+
 class WindowManager:
     """
     Manages window detection, coordinates, and focus.
@@ -32,6 +38,13 @@ class WindowManager:
         self.display = display.Display()
         self.root = self.display.screen().root
         
+        # EWMH root property listing the windows the window manager manages
+        self._NET_CLIENT_LIST = self.display.intern_atom('_NET_CLIENT_LIST')
+        
+        # EWMH window title, which holds UTF-8 where WM_NAME may be COMPOUND_TEXT
+        self._NET_WM_NAME = self.display.intern_atom('_NET_WM_NAME')
+        self._UTF8_STRING = self.display.intern_atom('UTF8_STRING')
+        
     def list_windows(self) -> List[Dict[str, Any]]:
         """
         List all visible windows with their properties.
@@ -42,8 +55,18 @@ class WindowManager:
         windows = []
         
         try:
-            # Try xdotool first, which works in most environments
-            if self._command_exists("xdotool"):
+            # Read the window manager's client list over our own connection when
+            # it provides one, instead of running xdotool for every window
+            client_ids = self._get_client_window_ids()
+            if client_ids is not None:
+                if self.debug_mode:
+                    print("Using _NET_CLIENT_LIST to list windows")
+                windows = self._list_windows_xlib(
+                    [self.display.create_resource_object('window', window_id)
+                     for window_id in client_ids])
+            
+            # Otherwise try xdotool, which works in most environments
+            elif self._command_exists("xdotool"):
                 if self.debug_mode:
                     print("Using xdotool to list windows")
                     
@@ -71,8 +94,8 @@ class WindowManager:
                         )
                         
                         # Parse geometry
-                        position_match = re.search(r"Position: (\d+),(\d+)", geom_output)
-                        size_match = re.search(r"Geometry: (\d+)x(\d+)", geom_output)
+                        position_match = _POSITION_RE.search(geom_output)
+                        size_match = _GEOMETRY_RE.search(geom_output)
                         
                         if position_match and size_match:
                             x, y = map(int, position_match.groups())
@@ -101,9 +124,31 @@ class WindowManager:
         
         return windows
     
-    def _list_windows_xlib(self) -> List[Dict[str, Any]]:
+    def _get_client_window_ids(self) -> Optional[List[int]]:
         """
-        List windows using Xlib directly (fallback method).
+        Get the IDs of the windows managed by the window manager.
+        
+        Returns:
+            Window IDs from the EWMH _NET_CLIENT_LIST property, or None if the
+            window manager doesn't set it
+        """
+        try:
+            prop = self.root.get_full_property(self._NET_CLIENT_LIST, X.AnyPropertyType)
+        except Exception as e:
+            if self.debug_mode:
+                print(f"Error reading _NET_CLIENT_LIST: {e}")
+            return None
+        
+        if prop is None:
+            return None
+        return list(prop.value)
+    
+    def _list_windows_xlib(self, window_ids: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """
+        List windows using Xlib directly.
+        
+        Args:
+            window_ids: Xlib window objects to list; defaults to all top-level windows
         
         Returns:
             List of dictionaries containing window information
@@ -112,7 +157,8 @@ class WindowManager:
         
         try:
             # Get all top-level windows
-            window_ids = self.root.query_tree().children
+            if window_ids is None:
+                window_ids = self.root.query_tree().children
             
             for window in window_ids:
                 try:
@@ -122,7 +168,7 @@ class WindowManager:
                         continue
                         
                     # Get window name
-                    name = window.get_wm_name() or "Unnamed window"
+                    name = self._get_window_name(window)
                     
                     # Get geometry
                     geom = window.get_geometry()
@@ -148,6 +194,25 @@ class WindowManager:
                 
         return windows
     
+    def _get_window_name(self, window: Any) -> str:
+        """
+        Get a window's title, as xdotool getwindowname reports it.
+        
+        Args:
+            window: Xlib window object
+            
+        Returns:
+            Title from _NET_WM_NAME, falling back to WM_NAME, or "Unnamed window"
+        """
+        name = window.get_full_text_property(self._NET_WM_NAME, self._UTF8_STRING)
+        if not name:
+            name = window.get_wm_name()
+        
+        # Xlib leaves values in encodings it can't decode (e.g. COMPOUND_TEXT) as bytes
+        if isinstance(name, bytes):
+            name = name.decode('utf-8', errors='replace')
+        return name or "Unnamed window"
+    
     def get_window_by_id(self, window_id: int) -> Optional[Dict[str, Any]]:
         """
         Get information about a specific window by ID.
@@ -169,7 +234,7 @@ class WindowManager:
                 return None
             
             # Get window name
-            name = window.get_wm_name() or "Unnamed window"
+            name = self._get_window_name(window)
             
             # Get geometry
             geom = window.get_geometry()
@@ -207,44 +272,11 @@ class WindowManager:
         abs_x, abs_y = x, y
         
         try:
-            if self.is_i3:
-                # For i3, we need to handle differently due to how it manages windows
-                # Just get the geometry directly and don't try to traverse the tree
-                geom = window.get_geometry()
-                abs_x, abs_y = geom.x, geom.y
-                
-                # For i3, we might need to use xwininfo as a more reliable source
-                try:
-                    output = subprocess.check_output(
-                        ["xwininfo", "-id", str(window.id)],
-                        text=True
-                    )
-                    
-                    # Parse xwininfo output
-                    abs_x_match = re.search(r"Absolute upper-left X:\s+(\d+)", output)
-                    abs_y_match = re.search(r"Absolute upper-left Y:\s+(\d+)", output)
-                    
-                    if abs_x_match and abs_y_match:
-                        abs_x = int(abs_x_match.group(1))
-                        abs_y = int(abs_y_match.group(1))
-                except Exception as e:
-                    if self.debug_mode:
-                        print(f"Error getting i3 window coordinates with xwininfo: {e}")
-            else:
-                # For regular window managers, traverse the window tree to get absolute coordinates
-                # Get window geometry
-                geom = window.get_geometry()
-                
-                # Initialize absolute coordinates
-                abs_x, abs_y = geom.x, geom.y
-                
-                # Traverse up the window tree until we reach the root
-                parent = window.query_tree().parent
-                while parent.id != self.root.id:
-                    parent_geom = parent.get_geometry()
-                    abs_x += parent_geom.x
-                    abs_y += parent_geom.y
-                    parent = parent.query_tree().parent
+            # Have the server translate the window's origin to root coordinates in
+            # a single request. This is what xwininfo reports as the absolute
+            # upper-left corner, and it holds under i3's reparenting as well
+            coords = self.root.translate_coords(window, 0, 0)
+            abs_x, abs_y = coords.x, coords.y
         except Exception as e:
             if self.debug_mode:
                 print(f"Error calculating absolute coordinates: {e}")
@@ -307,21 +339,22 @@ class WindowManager:
                 print(f"Error taking window screenshot: {e}")
             return None
     
-    def _command_exists(self, cmd: str) -> bool:
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _command_exists(cmd: str) -> bool:
         """
         Check if a command exists on the system.
         
+        The PATH is searched once per command; call _command_exists.cache_clear()
+        if it changes.
+        
         Args:
             cmd: Command name to check
             
         Returns:
             True if command exists, False otherwise
         """
-        return subprocess.call(
-            ["which", cmd], 
-            stdout=subprocess.DEVNULL, 
-            stderr=subprocess.DEVNULL
-        ) == 0
+        return shutil.which(cmd) is not None
     
     def cleanup(self) -> None:
         """Clean up resources."""
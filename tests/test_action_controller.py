@@ -217,10 +217,17 @@ class TestActionController:
         assert success == True
         self.mock_image_processor.capture_window_screenshot.assert_called_once_with(123)
         self.mock_image_processor.find_template_in_screenshot.assert_called_once_with(
-            "template.png", mock_screenshot, threshold=0.8
+            "template.png", mock_screenshot, threshold=0.8, search_roi=None
         )
         self.mock_input_manager.click.assert_called_once_with(150, 250, 1, 123)
         
+        # Test the next search starts around the last match
+        self.mock_image_processor.find_template_in_screenshot.reset_mock()
+        self.controller.perform_action(action, window_id=123)
+        self.mock_image_processor.find_template_in_screenshot.assert_called_once_with(
+            "template.png", mock_screenshot, threshold=0.8, search_roi=(22, 122, 278, 378)
+        )
+        
         # Test template not found
         self.mock_image_processor.capture_window_screenshot.reset_mock()
         self.mock_image_processor.find_template_in_screenshot.reset_mock()
@@ -234,9 +241,10 @@ class TestActionController:
         assert success == False
         self.mock_image_processor.capture_window_screenshot.assert_called_once_with(123)
         self.mock_image_processor.find_template_in_screenshot.assert_called_once_with(
-            "template.png", mock_screenshot, threshold=0.8
+            "template.png", mock_screenshot, threshold=0.8, search_roi=(22, 122, 278, 378)
         )
         self.mock_input_manager.click.assert_not_called()
+        assert "template.png" not in self.controller._template_regions
         
         # Test template file doesn't exist
         self.mock_image_processor.capture_window_screenshot.reset_mock()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the CLI module
+"""
+
+import os
+import sys
+import subprocess
+import pytest
+
+# Add parent directory to path for importing modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.cli import CLI, parse_flags, _LazyComponents
+
+class TestCLI:
+    """Tests for the CLI argument handling."""
+    
+    def test_parse_flags_defaults(self):
+        """Test that unspecified flags get their defaults."""
+        # Test
+        args = parse_flags([])
+        
+        # Assert
+        assert args.debug == False
+        assert args.window_id is None
+        assert args.interval == 0.1
+        assert args.max_cycles == 0
+    
+    def test_parse_flags_values(self):
+        """Test parsing flags with separate and inline values."""
+        # Test
+        args = parse_flags(['--window-id', '42', '--interval=0.5', '--loop', '--config', 'test'])
+        
+        # Assert
+        assert args.window_id == 42
+        assert args.interval == 0.5
+        assert args.loop == True
+        assert args.config == 'test'
+    
+    def test_parse_flags_fallback(self):
+        """Test that anything the table can't handle is left to argparse."""
+        assert parse_flags(['--help']) is None
+        assert parse_flags(['--unknown']) is None
+        assert parse_flags(['--window-id']) is None
+        assert parse_flags(['--window-id', 'abc']) is None
+        assert parse_flags(['--loop=yes']) is None
+    
+    def test_parse_args_invalid_value(self):
+        """Test that invalid values still produce an argparse usage error."""
+        cli = CLI()
+        
+        with pytest.raises(SystemExit):
+            cli.parse_args(['--max-cycles', 'many'])
+    
+    def test_lazy_components(self):
+        """Test that components are only constructed on first access."""
+        # Setup
+        created = []
+        components = _LazyComponents({'manager': lambda: created.append('manager') or object()})
+        
+        # Assert
+        assert created == []
+        
+        # Test
+        first = components.manager
+        second = components.manager
+        
+        # Assert
+        assert first is second
+        assert created == ['manager']
+        with pytest.raises(AttributeError):
+            components.unknown
+    
+    def test_import_defers_components(self):
+        """Test that importing the CLI module doesn't import any component."""
+        # Setup
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = ("import sys, modules.cli; "
+                "print(sorted(m for m in sys.modules if m.startswith(('modules.', 'cv2', 'Xlib'))))")
+        
+        # Test
+        output = subprocess.check_output([sys.executable, "-c", code], cwd=root, text=True)
+        
+        # Assert
+        assert output.strip() == "['modules.cli', 'modules.config_manager']"
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the ConfigManager module
+"""
+
+import os
+import sys
+import pytest
+from unittest.mock import patch
+
+# Add parent directory to path for importing modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.config_manager import ConfigManager
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path_factory, monkeypatch):
+    """Keep listing indexes out of the user's cache directory."""
+    path = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(path))
+    return path
+
+class TestConfigManager:
+    """Tests for the ConfigManager class."""
+    
+    def test_list_configs(self, tmp_path):
+        """Test listing configuration files."""
+        # Setup
+        (tmp_path / "first.json").write_text("{}")
+        (tmp_path / "notes.txt").write_text("not a config")
+        (tmp_path / ".hidden.json").write_text("{}")
+        (tmp_path / "folder.json").mkdir()
+        
+        config_manager = ConfigManager(config_dir=str(tmp_path))
+        
+        # Test
+        configs = config_manager.list_configs()
+        
+        # Assert
+        assert configs == ["first.json"]
+    
+    def test_list_configs_sees_new_files(self, tmp_path):
+        """Test that the cached listing is refreshed when the directory changes."""
+        # Setup
+        config_manager = ConfigManager(config_dir=str(tmp_path))
+        assert config_manager.list_configs() == []
+        
+        # Test
+        config_manager.save_config({"actions": []}, "added")
+        
+        # Assert
+        assert config_manager.list_configs() == ["added.json"]
+    
+    def test_load_config_cache(self, tmp_path):
+        """Test that cached configurations are copied and refreshed on change."""
+        # Setup
+        config_manager = ConfigManager(config_dir=str(tmp_path))
+        config_manager.save_config({"actions": [{"type": "wait"}]}, "cached")
+        
+        # Test that mutating a loaded config doesn't leak into the cache
+        config = config_manager.load_config("cached")
+        config["actions"].append({"type": "click_text"})
+        
+        # Assert
+        assert len(config_manager.load_config("cached")["actions"]) == 1
+        
+        # Test that rewriting the file is picked up
+        path = tmp_path / "cached.json"
+        path.write_text('{"actions": []}')
+        os.utime(path, ns=(0, 1))
+        
+        # Assert
+        assert config_manager.load_config("cached")["actions"] == []
+    
+    def test_load_config_cache_hit(self, tmp_path):
+        """Test that loading an unchanged large configuration doesn't read the file again."""
+        # Setup
+        config_manager = ConfigManager(config_dir=str(tmp_path))
+        actions = [{"type": "click_position", "x": i, "y": i, "delay": 0.1} for i in range(3000)]
+        config_manager.save_config({"actions": actions}, "large")
+        first = config_manager.load_config("large")
+        
+        # Test
+        with patch('modules.config_manager.open', create=True, side_effect=open) as mock_open:
+            loaded = [config_manager.load_config("large") for _ in range(20)]
+        
+        # Assert
+        mock_open.assert_not_called()
+        assert all(config == first for config in loaded)
+        assert loaded[0]["actions"][0] is not loaded[1]["actions"][0]
+    
+    def test_missing_config(self, tmp_path):
+        """Test loading and deleting configurations that don't exist."""
+        # Setup
+        config_manager = ConfigManager(config_dir=str(tmp_path))
+        config_manager.save_config({"actions": []}, "removed")
+        
+        # Test
+        deleted = config_manager.delete_config("removed")
+        
+        # Assert
+        assert deleted == True
+        assert config_manager.load_config("removed") is None
+        assert config_manager.delete_config("removed") == False
+    
+    def test_list_configs_index(self, tmp_path, cache_home):
+        """Test that the listing is shared across instances through the on-disk index."""
+        # Setup
+        (tmp_path / "first.json").write_text("{}")
+        ConfigManager(config_dir=str(tmp_path)).list_configs()
+        
+        # Test
+        config_manager = ConfigManager(config_dir=str(tmp_path))
+        constructed_cache = config_manager._list_cache
+        with patch('modules.config_manager.os.scandir') as mock_scandir:
+            configs = config_manager.list_configs()
+        
+        # Assert
+        assert constructed_cache is None
+        assert configs == ["first.json"]
+        mock_scandir.assert_not_called()
+        assert sorted(os.listdir(tmp_path)) == ["first.json"]
+        assert [path.suffix for path in (cache_home / "clickytheclicker").iterdir()] == [".json"]
+        
+        # Test that the index is ignored once the directory changes
+        (tmp_path / "second.json").write_text("{}")
+        configs = ConfigManager(config_dir=str(tmp_path)).list_configs()
+        
+        # Assert
+        assert sorted(configs) == ["first.json", "second.json"]
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Tests for the ErrorRecovery module
+"""
+
+import os
+import sys
+import shutil
+import pytest
+import tempfile
+from collections import deque
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+
+# Add parent directory to path for importing modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.error_recovery import ErrorRecoveryManager, RecoveryAction, RecoveryStrategy
+
+class TestErrorRecoveryManager:
+    """Tests for the ErrorRecoveryManager class."""
+    
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_window_manager = MagicMock()
+        self.mock_image_processor = MagicMock()
+        
+        self.checkpoint_dir = tempfile.mkdtemp()
+        
+        self.manager = ErrorRecoveryManager(
+            window_manager=self.mock_window_manager,
+            image_processor=self.mock_image_processor,
+            checkpoint_dir=self.checkpoint_dir,
+            min_checkpoint_interval=0
+        )
+    
+    def teardown_method(self):
+        """Remove any checkpoint screenshots written by the test."""
+        self.manager.cleanup()
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+    
+    def test_create_checkpoint_saves_screenshot(self):
+        """Test that a checkpoint screenshot is written as a readable PNG."""
+        # Setup
+        Image = pytest.importorskip("PIL.Image")
+        screenshot = Image.new('RGB', (32, 24), 'red')
+        
+        # Test
+        checkpoint = self.manager.create_checkpoint(3, screenshot=screenshot)
+        self.manager.wait_for_checkpoints()
+        
+        # Assert
+        assert checkpoint['action_index'] == 3
+        assert os.path.dirname(checkpoint['screenshot_path']) == self.checkpoint_dir
+        with Image.open(checkpoint['screenshot_path']) as saved:
+            assert saved.format == 'PNG'
+            assert saved.size == (32, 24)
+    
+    def test_create_checkpoint_from_future(self):
+        """Test that a background capture is resolved and saved by the checkpoint writer."""
+        # Setup
+        Image = pytest.importorskip("PIL.Image")
+        capture = Future()
+        
+        # Test
+        checkpoint = self.manager.create_checkpoint(1, screenshot=capture)
+        capture.set_result(Image.new('RGB', (16, 8), 'blue'))
+        self.manager.wait_for_checkpoints()
+        
+        # Assert
+        with Image.open(checkpoint['screenshot_path']) as saved:
+            assert saved.size == (16, 8)
+        self.mock_image_processor.capture_window_screenshot.assert_not_called()
+    
+    def test_failed_checkpoint_write_drops_path(self):
+        """Test that a checkpoint whose screenshot couldn't be saved has no screenshot_path."""
+        # Setup
+        capture = Future()
+        
+        # Test
+        checkpoint = self.manager.create_checkpoint(1, screenshot=capture)
+        capture.set_result(None)
+        self.manager.wait_for_checkpoints()
+        
+        # Assert
+        assert 'screenshot_path' not in checkpoint
+        
+        # Test a screenshot that can't be encoded
+        self.manager.min_checkpoint_interval = 0
+        checkpoint = self.manager.create_checkpoint(2, screenshot=object())
+        self.manager.wait_for_checkpoints()
+        
+        # Assert
+        assert 'screenshot_path' not in checkpoint
+        assert os.listdir(self.checkpoint_dir) == []
+    
+    def test_cleanup_removes_screenshots(self):
+        """Test that cleanup removes checkpoint screenshots."""
+        # Setup
+        Image = pytest.importorskip("PIL.Image")
+        checkpoint = self.manager.create_checkpoint(0, screenshot=Image.new('RGB', (8, 8)))
+        
+        # Test
+        self.manager.cleanup()
+        
+        # Assert
+        assert not os.path.exists(checkpoint['screenshot_path'])
+    
+    def test_checkpoint_eviction(self):
+        """Test that only the last 5 checkpoints and their screenshots are kept."""
+        # Setup
+        Image = pytest.importorskip("PIL.Image")
+        checkpoints = [
+            self.manager.create_checkpoint(i, screenshot=Image.new('RGB', (8, 8)))
+            for i in range(7)
+        ]
+        self.manager.wait_for_checkpoints()
+        
+        # Assert
+        assert [cp['action_index'] for cp in self.manager.checkpoints] == [2, 3, 4, 5, 6]
+        assert not os.path.exists(checkpoints[0]['screenshot_path'])
+        assert not os.path.exists(checkpoints[1]['screenshot_path'])
+        assert os.path.exists(checkpoints[6]['screenshot_path'])
+    
+    def test_analyze_failure_pattern(self):
+        """Test that failure counts reflect the applied recoveries."""
+        # Setup
+        recovery = RecoveryAction(RecoveryStrategy.SKIP)
+        for i in range(3):
+            self.manager.apply_recovery_strategy({'type': 'click_text'}, recovery, i)
+        self.manager.apply_recovery_strategy({'type': 'type_text'}, recovery, 3)
+        
+        # Test
+        analysis = self.manager.analyze_failure_pattern()
+        
+        # Assert
+        assert analysis['action_failures'] == {'click_text': 3, 'type_text': 1}
+        assert analysis['strategy_usage'] == {'skip': 4}
+        assert "Action type 'click_text' failed 3 times" in analysis['patterns']
+    
+    def test_get_checkpoint_before_action(self):
+        """Test finding the most recent checkpoint before an action."""
+        # Setup
+        for i in (0, 4, 8):
+            self.manager.create_checkpoint(i)
+        
+        # Test/Assert
+        assert self.manager.get_checkpoint_before_action(6)['action_index'] == 4
+        assert self.manager.get_checkpoint_before_action(9)['action_index'] == 8
+        assert self.manager.get_checkpoint_before_action(0) is None
+    
+    def test_create_checkpoint_from_array(self):
+        """Test that numpy screenshots are saved without going through PIL."""
+        # Setup
+        np = pytest.importorskip("numpy")
+        pytest.importorskip("cv2")
+        Image = pytest.importorskip("PIL.Image")
+        screenshot = np.zeros((24, 32, 3), dtype=np.uint8)
+        
+        # Test
+        checkpoint = self.manager.create_checkpoint(1, screenshot=screenshot)
+        self.manager.wait_for_checkpoints()
+        
+        # Assert
+        with Image.open(checkpoint['screenshot_path']) as saved:
+            assert saved.format == 'PNG'
+            assert saved.size == (32, 24)
+    
+    def test_checkpoint_throttling(self):
+        """Test that checkpoints requested too quickly reuse the latest one."""
+        # Setup
+        self.manager.min_checkpoint_interval = 60
+        first = self.manager.create_checkpoint(0)
+        
+        # Test
+        second = self.manager.create_checkpoint(5)
+        
+        # Assert
+        assert second is first
+        assert len(self.manager.checkpoints) == 1
+        assert self.manager.checkpoint_due() == False
+    
+    def test_get_recovery_for_action(self):
+        """Test default and explicit recovery strategies."""
+        # Test
+        text_recovery = self.manager.get_recovery_for_action({'type': 'click_text'})
+        other_recovery = self.manager.get_recovery_for_action({'type': 'wait'})
+        explicit_recovery = self.manager.get_recovery_for_action(
+            {'type': 'click_text', 'on_failure': {'strategy': 'skip'}}
+        )
+        
+        # Assert
+        assert text_recovery.strategy == RecoveryStrategy.WAIT_AND_RETRY
+        assert text_recovery.params == {'max_retries': 3, 'wait_time': 2.0}
+        assert other_recovery.strategy == RecoveryStrategy.RETRY
+        assert other_recovery.params == {'max_retries': 1}
+        assert explicit_recovery.strategy == RecoveryStrategy.SKIP
+    
+    def test_recovery_history_bounded(self):
+        """Test that old recovery entries are dropped and uncounted."""
+        # Setup
+        self.manager.recovery_history = deque(maxlen=2)
+        recovery = RecoveryAction(RecoveryStrategy.SKIP)
+        
+        # Test
+        self.manager.apply_recovery_strategy({'type': 'click_text'}, recovery, 0)
+        self.manager.apply_recovery_strategy({'type': 'type_text'}, recovery, 1)
+        self.manager.apply_recovery_strategy({'type': 'type_text'}, recovery, 2)
+        
+        # Assert
+        assert len(self.manager.recovery_history) == 2
+        assert self.manager.analyze_failure_pattern()['action_failures'] == {'type_text': 2}
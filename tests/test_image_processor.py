@@ -5,15 +5,18 @@ Tests for the ImageProcessor module
 
 import os
 import sys
+import struct
 import pytest
 import numpy as np
+import cv2
 from unittest.mock import MagicMock, patch
 from PIL import Image
 
 # Add parent directory to path for importing modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from modules.image_processor import ImageProcessor
+from modules.image_processor import ImageProcessor, _to_gray_ndarray, _gray_to_pil, _load_template, _decode_xwd, _parse_tsv, \
+    _find_tessdata_fast
 
 class TestImageProcessor:
     """Tests for the ImageProcessor class."""
@@ -81,6 +84,137 @@ class TestImageProcessor:
         assert screenshot is not None
         mock_grab.assert_called_once() 
     
+    def test_decode_xwd(self):
+        """Test decoding a 32-bit ZPixmap XWD dump."""
+        # Setup: 3x2 pixels, rows padded to 4 pixels, LSB-first BGRX with a name and 2 colormap entries
+        name = b"window\0\0"
+        header = [100 + len(name), 7, 2, 24, 3, 2, 0, 0, 32, 0, 32, 32, 16, 4,
+                  0xff0000, 0xff00, 0xff, 8, 256, 2, 3, 2, 0, 0, 0]
+        pixels = np.zeros((2, 4), dtype='<u4')
+        pixels[0, 0] = 0x00ff8001  # r=255 g=128 b=1
+        pixels[1, 2] = 0x000a141e  # r=10 g=20 b=30
+        pixels[0, 3] = 0x00ffffff  # padding
+        data = struct.pack('>25I', *header) + name + b"\0" * 24 + pixels.tobytes()
+        
+        # Test
+        rgb = _decode_xwd(data)
+        
+        # Assert
+        assert rgb.shape == (2, 3, 3)
+        assert tuple(rgb[0, 0]) == (255, 128, 1)
+        assert tuple(rgb[1, 2]) == (10, 20, 30)
+        assert tuple(rgb[0, 1]) == (0, 0, 0)
+        assert _decode_xwd(data[:-4]) is None
+        assert _decode_xwd(struct.pack('>25I', *header[:11], 24, *header[12:])) is None
+    
+    def test_parse_tsv(self):
+        """Test extracting the word box columns from tesseract TSV output."""
+        # Setup
+        tsv = (
+            "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext\n"
+            "1\t1\t0\t0\t0\t0\t0\t0\t200\t100\t-1\n"
+            "5\t1\t1\t1\t1\t1\t74\t10\t40\t20\t96.5\ttest\n"
+        )
+        
+        # Test
+        data = _parse_tsv(tsv)
+        
+        # Assert
+        assert data == {
+            'left': ['0', '74'], 'top': ['0', '10'], 'width': ['200', '40'],
+            'height': ['100', '20'], 'conf': ['-1', '96.5'], 'text': ['', 'test'],
+        }
+        assert _parse_tsv("")['text'] == []
+    
+    def test_tessdata_fast(self, tmp_path):
+        """Test that installed fast models are found and passed to tesseract."""
+        # Setup
+        fast_dir = tmp_path / "tessdata fast"
+        fast_dir.mkdir()
+        (fast_dir / "eng.traineddata").write_bytes(b"")
+        
+        # Test
+        with patch('modules.image_processor.TESSDATA_FAST_DIRS', (str(tmp_path / "missing"), str(fast_dir))):
+            found = _find_tessdata_fast()
+        processor = ImageProcessor()
+        processor.tessdata_dir = found
+        
+        # Assert
+        assert found == str(fast_dir)
+        assert processor._tesseract_config("--psm 6") == (
+            f"-c tessedit_create_tsv=1 --tessdata-dir '{fast_dir}' --psm 6")
+        processor.tessdata_dir = None
+        assert processor._tesseract_config("") == "-c tessedit_create_tsv=1"
+    
+    def test_capture_with_mss(self):
+        """Test in-process window capture from the window's screen area."""
+        # Setup
+        processor = ImageProcessor()
+        mock_display = MagicMock()
+        mock_window = mock_display.create_resource_object.return_value
+        mock_window.get_geometry.return_value = MagicMock(width=4, height=2)
+        mock_display.screen.return_value.root.translate_coords.return_value = MagicMock(x=100, y=200)
+        
+        raw = MagicMock(width=4, height=2, size=(4, 2), raw=bytearray([10, 20, 30, 255]) * 8)
+        mock_sct = MagicMock()
+        mock_sct.grab.return_value = raw
+        
+        # Test
+        with patch('modules.image_processor.display', create=True) as mock_xdisplay, \
+             patch('modules.image_processor.mss', create=True) as mock_mss:
+            mock_xdisplay.Display.return_value = mock_display
+            mock_mss.mss.return_value = mock_sct
+            screenshot = processor._capture_with_mss(123)
+        processor.cleanup()
+        
+        # Assert
+        mock_sct.grab.assert_called_once_with({'left': 100, 'top': 200, 'width': 4, 'height': 2})
+        assert screenshot.shape == (2, 4, 4)
+        assert tuple(screenshot[0, 0]) == (10, 20, 30, 255)
+        assert np.shares_memory(screenshot, np.frombuffer(raw.raw, dtype=np.uint8))
+        mock_sct.close.assert_called_once()
+        mock_display.close.assert_called_once()
+    
+    def test_capture_window_screenshot_async(self):
+        """Test that a capture can run on the background capture thread."""
+        # Setup
+        processor = ImageProcessor()
+        screenshot = np.zeros((10, 20, 4), dtype=np.uint8)
+        
+        # Test
+        with patch.object(processor, 'capture_window_screenshot', return_value=screenshot) as mock_capture:
+            future = processor.capture_window_screenshot_async(123)
+            result = future.result(timeout=5)
+        processor.cleanup()
+        
+        # Assert
+        assert result is screenshot
+        mock_capture.assert_called_once_with(123)
+        assert processor._capture_pool is None
+    
+    def test_capture_with_import(self):
+        """Test that import's output is decoded in memory when xwd is unavailable."""
+        # Setup
+        processor = ImageProcessor()
+        ppm = b"P6\n2 1\n255\n" + bytes([255, 0, 0, 0, 0, 255])
+        
+        def run(args, **kwargs):
+            if args[0] != "import":
+                raise FileNotFoundError(args[0])
+            return MagicMock(stdout=ppm)
+        
+        # Test
+        with patch('modules.image_processor.HAVE_MSS', False), \
+             patch('modules.image_processor.subprocess.run', side_effect=run) as mock_run:
+            screenshot = processor.capture_window_screenshot(123)
+        processor.cleanup()
+        
+        # Assert
+        assert screenshot.size == (2, 1)
+        assert screenshot.getpixel((0, 0)) == (255, 0, 0)
+        assert mock_run.call_args[0][0] == ["import", "-window", "123", "ppm:-"]
+        assert processor._tmpdir is None  # nothing was written to disk
+    
     @patch('modules.image_processor.pytesseract.image_to_data')
     def test_find_text_in_screenshot(self, mock_image_to_data):
         """Test finding text in screenshot."""
@@ -115,6 +249,267 @@ class TestImageProcessor:
         # Assert
         assert result is None
     
+    def test_find_text_ocr_passes(self):
+        """Test that every image variation and configuration is OCR'd and merged."""
+        # Setup
+        processor = ImageProcessor()
+        processor.has_ocr = True
+        screenshot = Image.new('RGB', (200, 100), 'white')
+        ocr_data = {
+            'text': ['', 'test', 'button'],
+            'conf': [-1, 96.5, 91.0],
+            'left': [0, 74, 171],
+            'top': [0, 10, 10],
+            'width': [200, 40, 60],
+            'height': [100, 20, 20],
+        }
+        
+        # Test
+        with patch.object(processor, '_image_to_data', return_value=ocr_data) as mock_ocr:
+            result = processor.find_text_in_screenshot("test", screenshot)
+            missing = processor.find_text_in_screenshot("nonexistent", screenshot)
+        processor.cleanup()
+        
+        # Assert
+        assert result == (74 + 40 // 2, 10 + 20 // 2, 0.965)
+        assert missing is None
+        assert mock_ocr.call_count > 0
+    
+    def test_find_text_stops_early(self):
+        """Test that a confident match on the first pass skips the other passes."""
+        # Setup
+        processor = ImageProcessor()
+        processor.has_ocr = True
+        confident = {'text': ['test'], 'conf': [96.5], 'left': [74], 'top': [10], 'width': [40], 'height': [20]}
+        unsure = dict(confident, conf=[60.0])
+        
+        # Test
+        with patch.object(processor, '_image_to_data', return_value=confident) as mock_confident:
+            result = processor.find_text_in_screenshot("test", Image.new('RGB', (200, 100), 'white'))
+        with patch.object(processor, '_image_to_data', return_value=unsure) as mock_unsure:
+            processor.find_text_in_screenshot("test", Image.new('RGB', (200, 100), 'gray'))
+        processor.cleanup()
+        
+        # Assert
+        assert result == (94, 20, 0.965)
+        assert mock_confident.call_count == 1
+        assert mock_unsure.call_count > 1
+        assert max(processor._ocr_success, key=processor._ocr_success.get) == "original_"
+    
+    def test_find_text_downscales_tall_screenshots(self):
+        """Test that tall screenshots are OCR'd smaller and coordinates mapped back."""
+        # Setup
+        processor = ImageProcessor()
+        processor.has_ocr = True
+        ocr_data = {'text': ['test'], 'conf': [96.5], 'left': [100], 'top': [500], 'width': [40], 'height': [20]}
+        sizes = []
+        
+        def image_to_data(image, config=""):
+            sizes.append(image.size)
+            return ocr_data
+        
+        # Test
+        with patch.object(processor, '_image_to_data', side_effect=image_to_data):
+            result = processor.find_text_in_screenshot("test", Image.new('RGB', (1440, 2160), 'white'))
+        processor.cleanup()
+        
+        # Assert
+        assert sizes == [(720, 1080)]
+        assert result == (200 + 80 // 2, 1000 + 40 // 2, 0.965)
+    
+    def test_find_text_in_regions(self):
+        """Test that text regions are OCR'd as cropped lines before the full frame."""
+        # Setup
+        processor = ImageProcessor()
+        processor.has_ocr = True
+        screenshot = np.full((200, 300, 3), 255, dtype=np.uint8)
+        screenshot[40:52, 20:80] = 0     # a short line of "text"
+        screenshot[120:132, 150:260] = 0  # a longer one
+        calls = []
+        
+        def image_to_data(image, config=""):
+            calls.append((image.size, config))
+            if image.size[0] > 100:
+                return {'text': ['test'], 'conf': [96.5], 'left': [4], 'top': [4], 'width': [110], 'height': [12]}
+            return {'text': ['other'], 'conf': [90.0], 'left': [4], 'top': [4], 'width': [60], 'height': [12]}
+        
+        # Test
+        with patch.object(processor, '_image_to_data', side_effect=image_to_data):
+            result = processor.find_text_in_screenshot("test", screenshot)
+        processor.cleanup()
+        
+        # Assert
+        assert calls == [((68, 20), "--psm 7"), ((118, 20), "--psm 7")]
+        assert result == (150 + 110 // 2, 120 + 12 // 2, 0.965)
+    
+    def test_find_texts_in_screenshots(self):
+        """Test that uncached screenshots are OCR'd together in one tesseract run."""
+        # Setup
+        processor = ImageProcessor()
+        processor.has_ocr = True
+        processor.use_tesserocr = False
+        first = Image.new('RGB', (200, 100), 'white')
+        second = Image.new('RGB', (200, 100), 'gray')
+        tsv = (
+            "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext\n"
+            "5\t1\t1\t1\t1\t1\t74\t10\t40\t20\t96.5\tsave\n"
+            "5\t2\t1\t1\t1\t1\t10\t50\t60\t20\t90\topen\n"
+        )
+        listed = []
+        
+        def run_and_get_output(image, extension='', config=''):
+            with open(image) as f:
+                listed.extend(line for line in f.read().splitlines() if os.path.exists(line))
+            return tsv
+        
+        # Test
+        with patch('modules.image_processor.HAVE_TESSERACT', True), \
+             patch('modules.image_processor.pytesseract.run_and_get_output',
+                   side_effect=run_and_get_output) as mock_batch, \
+             patch.object(processor, '_image_to_data', return_value={
+                 'text': [], 'conf': [], 'left': [], 'top': [], 'width': [], 'height': []}) as mock_ocr:
+            results = processor.find_texts_in_screenshots([("save", first), ("open", second), ("close", first)])
+        processor.cleanup()
+        
+        # Assert
+        assert results[:2] == [(94, 20, 0.965), (40, 60, 0.9)]
+        assert results[2] is None
+        assert mock_batch.call_count == 1
+        assert len(listed) == 2
+        assert mock_ocr.call_count > 0  # only "close" needed the full sweep
+    
+    def test_find_text_reuses_ocr(self):
+        """Test that an unchanged screenshot is not OCR'd again."""
+        # Setup
+        processor = ImageProcessor()
+        processor.has_ocr = True
+        screenshot = Image.new('RGB', (200, 100), 'white')
+        changed = Image.new('RGB', (200, 100), 'gray')
+        ocr_data = {'text': ['test'], 'conf': [96.5], 'left': [74], 'top': [10], 'width': [40], 'height': [20]}
+        
+        # Test
+        with patch.object(processor, '_image_to_data', return_value=ocr_data) as mock_ocr:
+            first = processor.find_text_in_screenshot("test", screenshot)
+            passes = mock_ocr.call_count
+            second = processor.find_text_in_screenshot("test", screenshot.copy())
+            repeated = mock_ocr.call_count
+            processor.find_text_in_screenshot("test", changed)
+        processor.cleanup()
+        
+        # Assert
+        assert first == second
+        assert repeated == passes
+        assert mock_ocr.call_count > passes
+    
+    def test_find_text_reuses_ocr_array(self):
+        """Test that an unchanged array screenshot skips OCR and the PIL conversion."""
+        # Setup
+        processor = ImageProcessor()
+        processor.has_ocr = True
+        screenshot = np.full((100, 200, 3), 255, dtype=np.uint8)
+        ocr_data = {'text': ['test'], 'conf': [96.5], 'left': [74], 'top': [10], 'width': [40], 'height': [20]}
+        
+        # Test
+        with patch.object(processor, '_image_to_data', return_value=ocr_data) as mock_ocr:
+            first = processor.find_text_in_screenshot("test", screenshot)
+            passes = mock_ocr.call_count
+            with patch.object(processor, '_array_to_pil') as mock_convert:
+                second = processor.find_text_in_screenshot("test", screenshot.copy())
+        processor.cleanup()
+        
+        # Assert
+        assert first is not None
+        assert first == second
+        assert mock_ocr.call_count == passes
+        mock_convert.assert_not_called()
+    
+    def test_array_to_pil(self):
+        """Test that BGR and BGRA arrays are unpacked straight into RGB images."""
+        # Setup
+        processor = ImageProcessor()
+        bgr = np.zeros((2, 3, 3), dtype=np.uint8)
+        bgr[0, 0] = (1, 2, 3)
+        bgra = np.dstack([bgr, np.full((2, 3), 255, dtype=np.uint8)])
+        
+        # Test
+        from_bgr = processor._array_to_pil(bgr)
+        from_bgra = processor._array_to_pil(bgra)
+        
+        # Assert
+        assert from_bgr.mode == from_bgra.mode == 'RGB'
+        assert from_bgr.size == (3, 2)
+        assert from_bgr.getpixel((0, 0)) == from_bgra.getpixel((0, 0)) == (3, 2, 1)
+    
+    def test_image_to_data_writes_pnm(self):
+        """Test that pytesseract is given an uncompressed file instead of an image to encode."""
+        # Setup
+        processor = ImageProcessor()
+        processor.use_tesserocr = False
+        seen = []
+        
+        def run_and_get_output(image, extension='', config=''):
+            with Image.open(image) as f:
+                seen.append((f.format, f.mode))
+            return "left\ttop\twidth\theight\tconf\ttext\n"
+        
+        # Test
+        with patch('modules.image_processor.pytesseract.run_and_get_output', side_effect=run_and_get_output):
+            processor._image_to_data(Image.new('RGB', (8, 4)), "--psm 6")
+            processor._image_to_data(_gray_to_pil(np.zeros((4, 8), dtype=np.uint8)), "--psm 6")
+        processor.cleanup()
+        
+        # Assert
+        assert seen == [('PPM', 'RGB'), ('PPM', 'L')]
+    
+    def test_gray_conversion(self):
+        """Test that BGR arrays and RGB images convert to the same grayscale."""
+        # Setup
+        rgb = np.zeros((20, 30, 3), dtype=np.uint8)
+        rgb[:, :10] = (255, 0, 0)
+        rgb[:, 10:20] = (0, 0, 255)
+        bgr = rgb[:, :, ::-1].copy()
+        
+        # Test
+        from_array = _to_gray_ndarray(bgr)
+        from_image = _to_gray_ndarray(Image.fromarray(rgb))
+        wrapped = _gray_to_pil(from_array)
+        
+        # Assert
+        assert from_array.shape == (20, 30)
+        assert from_array.flags['C_CONTIGUOUS']
+        assert np.abs(from_array.astype(int) - from_image.astype(int)).max() <= 1
+        assert from_array[0, 0] > from_array[0, 15]  # red is brighter than blue
+        assert wrapped.size == (30, 20)
+        assert np.array_equal(np.asarray(wrapped), from_array)
+    
+    def test_get_all_text_regions(self):
+        """Test that text regions are filtered by confidence and centred."""
+        # Setup
+        processor = ImageProcessor()
+        processor.has_ocr = True
+        ocr_data = {
+            'text': ['', ' test ', 'button', 'noise', '  '],
+            'conf': [-1, 96.5, 91.0, '12', 95],
+            'left': [0, 74, 171, 5, 9],
+            'top': [0, 10, 10, 5, 9],
+            'width': [200, 40, 60, 3, 9],
+            'height': [100, 20, 20, 3, 9],
+        }
+        
+        # Test
+        with patch.object(processor, '_image_to_data', return_value=ocr_data) as mock_ocr:
+            regions = processor.get_all_text_regions(Image.new('RGB', (200, 100), 'white'))
+            found = processor.find_text_in_screenshot("button", Image.new('RGB', (200, 100), 'white'))
+            confident = processor.get_all_text_regions(Image.new('RGB', (200, 100), 'white'), min_confidence=0.95)
+        processor.cleanup()
+        
+        # Assert
+        assert regions[0] == ('test', 94, 20, 0.965)
+        assert set(regions) == {('test', 94, 20, 0.965), ('button', 201, 20, 0.91)}
+        assert len(regions) == 2 * mock_ocr.call_count
+        assert found == (201, 20, 0.91)  # served from the blocks OCR'd for the regions
+        assert confident and {region[0] for region in confident} == {'test'}
+    
     @patch('modules.image_processor.cv2.matchTemplate')
     @patch('modules.image_processor.cv2.minMaxLoc')
     @patch('modules.image_processor.cv2.imread')
@@ -158,6 +553,169 @@ class TestImageProcessor:
         # Assert
         assert result is None
     
+    def test_find_template_pyramid(self):
+        """Test coarse-to-fine template search on a real image."""
+        # Setup
+        rng = np.random.default_rng(0)
+        screenshot = rng.integers(0, 256, (240, 320, 3), dtype=np.uint8)
+        screenshot = cv2.GaussianBlur(screenshot, (5, 5), 0)
+        template = cv2.cvtColor(screenshot[101:141, 157:205], cv2.COLOR_BGR2GRAY)
+        
+        processor = ImageProcessor()
+        
+        # Test
+        with patch('modules.image_processor.cv2.imread', return_value=template):
+            result = processor.find_template_in_screenshot("template.png", screenshot, threshold=0.9)
+        
+        # Assert
+        assert result is not None
+        assert result[:2] == (157 + 48 // 2, 101 + 40 // 2)
+        assert type(result[0]) is int
+        assert result[2] > 0.99
+    
+    def test_find_template_deep_pyramid(self):
+        """Test that large templates are searched from several halvings down."""
+        # Setup
+        rng = np.random.default_rng(1)
+        screenshot = rng.integers(0, 256, (480, 640), dtype=np.uint8)
+        screenshot = cv2.GaussianBlur(screenshot, (9, 9), 0)
+        template = screenshot[203:283, 311:407].copy()
+        
+        processor = ImageProcessor()
+        
+        # Test
+        with patch('modules.image_processor.cv2.imread', return_value=template), \
+             patch.object(processor, '_match_template', wraps=processor._match_template) as mock_match:
+            result = processor.find_template_in_screenshot("deep.png", screenshot, threshold=0.9)
+        
+        # Assert
+        assert result[:2] == (311 + 96 // 2, 203 + 80 // 2)
+        assert result[2] > 0.99
+        coarse_image, coarse_template = mock_match.call_args[0]
+        assert coarse_image.shape == (60, 80)
+        assert coarse_template.shape == (10, 12)
+    
+    def test_find_template_search_roi(self):
+        """Test that a search region is tried first and the result buffer is reused."""
+        # Setup
+        screenshot = np.full((200, 300), 200, dtype=np.uint8)
+        screenshot[50:60, 40:50] = 0
+        screenshot[150:160, 240:250] = 0
+        template = np.full((14, 14), 200, dtype=np.uint8)
+        template[2:12, 2:12] = 0
+        
+        processor = ImageProcessor()
+        
+        # Test
+        with patch('modules.image_processor.cv2.imread', return_value=template):
+            near = processor.find_template_in_screenshot("square.png", screenshot, search_roi=(200, 100, 300, 200))
+            buffer = processor._result_buf
+            outside = processor.find_template_in_screenshot("square.png", screenshot, search_roi=(0, 100, 100, 200))
+            full = processor.find_template_in_screenshot("square.png", screenshot)
+            reused = processor._result_buf
+            processor.find_template_in_screenshot("square.png", screenshot)
+        
+        # Assert
+        assert near[:2] == (245, 155)
+        assert outside[:2] == (45, 55)  # nothing in the region, found by the full search
+        assert full[:2] == (45, 55)
+        assert processor._result_buf is not buffer
+        assert processor._result_buf is reused
+        assert reused.shape == (187, 287)
+    
+    def test_find_template_reuses_gray_buffer(self):
+        """Test that same-sized screenshots are converted into one grayscale buffer."""
+        # Setup
+        first = np.full((60, 80, 3), 255, dtype=np.uint8)
+        first[10:20, 10:20] = 0
+        second = np.full((60, 80, 4), 255, dtype=np.uint8)
+        second[30:40, 50:60] = 0
+        template = np.full((14, 14), 255, dtype=np.uint8)
+        template[2:12, 2:12] = 0
+        processor = ImageProcessor()
+        
+        # Test
+        with patch('modules.image_processor.cv2.imread', return_value=template):
+            found_first = processor.find_template_in_screenshot("square.png", first)
+            buffer = processor._gray_buf
+            found_second = processor.find_template_in_screenshot("square.png", second)
+        
+        # Assert
+        assert found_first[:2] == (15, 15)
+        assert found_second[:2] == (55, 35)
+        assert processor._gray_buf is buffer
+        assert buffer[35, 55] == 0  # holds the second screenshot now
+        assert not np.shares_memory(buffer, first)
+    
+    def test_find_template_unchanged_frame(self, tmp_path):
+        """Test that an unchanged screenshot reuses the last result without matching."""
+        # Setup
+        screenshot = np.full((60, 80), 255, dtype=np.uint8)
+        template = np.full((14, 14), 255, dtype=np.uint8)
+        template[2:12, 2:12] = 0
+        path = str(tmp_path / "square.png")
+        cv2.imwrite(path, template)
+        processor = ImageProcessor()
+        
+        # Test
+        with patch.object(processor, '_locate_template', wraps=processor._locate_template) as mock_locate:
+            missing = processor.find_template_in_screenshot(path, screenshot)
+            repeated = processor.find_template_in_screenshot(path, screenshot.copy())
+            searches = mock_locate.call_count
+            screenshot[10:20, 10:20] = 0
+            found = processor.find_template_in_screenshot(path, screenshot)
+            stricter = processor.find_template_in_screenshot(path, screenshot, threshold=0.99)
+        
+        # Assert
+        assert missing is None and repeated is None
+        assert searches == 1
+        assert found[:2] == (15, 15)
+        assert stricter[:2] == (15, 15)
+        assert mock_locate.call_count == 3
+    
+    def test_template_umat_reused(self):
+        """Test that the OpenCL path uploads each template once."""
+        # Setup
+        screenshot = np.zeros((40, 40), dtype=np.uint8)
+        template = np.zeros((10, 10), dtype=np.uint8)
+        processor = ImageProcessor()
+        processor.use_opencl = True
+        
+        # Test
+        with patch('modules.image_processor.cv2.UMat', side_effect=lambda array: ('umat', array.shape)) as mock_umat, \
+             patch('modules.image_processor.cv2.matchTemplate') as mock_match:
+            mock_match.return_value.get.return_value = np.zeros((31, 31), dtype=np.float32)
+            processor._match_template(screenshot, template)
+            result = processor._match_template(screenshot, template)
+        processor.cleanup()
+        
+        # Assert
+        assert result.shape == (31, 31)
+        assert [call.args[0].shape for call in mock_umat.call_args_list] == [(40, 40), (10, 10), (40, 40)]
+        assert mock_match.call_args[0][1] == ('umat', (10, 10))
+        assert not processor._umat_cache
+    
+    def test_template_cache(self, tmp_path):
+        """Test that templates are decoded once and reloaded when the file changes."""
+        # Setup
+        path = str(tmp_path / "template.png")
+        cv2.imwrite(path, np.full((20, 20, 3), 50, dtype=np.uint8))
+        
+        # Test
+        first = _load_template(path)
+        second = _load_template(path)
+        cv2.imwrite(path, np.full((30, 30, 3), 50, dtype=np.uint8))
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        changed = _load_template(path)
+        
+        # Assert
+        assert first is second
+        assert first[0].shape == (20, 20)
+        assert first[1].shape == (10, 10)
+        assert len(first) == 2
+        assert changed[0].shape == (30, 30)
+        assert _load_template(str(tmp_path / "missing.png")) is None
+    
     def test_text_matches(self):
         """Test text matching functionality."""
         processor = ImageProcessor(debug_mode=True)
@@ -173,6 +731,25 @@ class TestImageProcessor:
         
         # Test non-match
         assert processor._text_matches("button", "test") is False
+        
+        # Test words in a different order
+        assert processor._text_matches("File Save As", "save file") is True
+        
+        # Test a matcher reused across found texts
+        matches = processor._text_matcher("Cancel")
+        assert [matches(found) for found in ("cancel", "Cancle", "OK", "")] == [True, True, False, False]
+    
+    def test_match_search_words(self):
+        """Test that search words resolve to the highest-ranked matching block."""
+        processor = ImageProcessor()
+        block_texts = ["cancel", "save file", "savee", "file"]
+        
+        # Test
+        matches = processor._match_search_words(["save", "file", "cancell", "open"], block_texts)
+        
+        # Assert
+        assert matches == {"save": 1, "file": 1, "cancell": 0}
+        assert processor._match_search_words(["savee"], ["file", "save", "savee"]) == {"savee": 1}
     
     def test_cleanup(self):
         """Test cleanup method."""
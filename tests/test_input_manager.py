@@ -6,6 +6,7 @@ Tests for the InputManager module
 import os
 import sys
 import pytest
+import Xlib.X
 from unittest.mock import MagicMock, patch
 
 # Add parent directory to path for importing modules
@@ -70,6 +71,76 @@ class TestInputManager:
         mock_fake_input.assert_any_call(mock_display, X.ButtonPress, 3, root_x=300, root_y=400)
         mock_fake_input.assert_any_call(mock_display, X.ButtonRelease, 3, root_x=300, root_y=400)
     
+    @patch('modules.input_manager.Xlib.display.Display')
+    @patch('modules.input_manager.xtest.fake_input')
+    def test_click_window_batched(self, mock_fake_input, mock_display_class):
+        """Test that a click in a window is translated in one request and sent without syncs."""
+        # Setup
+        mock_display = mock_display_class.return_value
+        input_manager = InputManager()
+        input_manager.root.translate_coords.return_value = MagicMock(x=100, y=200)
+        input_manager.root.query_pointer.return_value = MagicMock(root_x=5, root_y=6)
+        
+        # Test
+        success = input_manager.click(50, 60, window_id=42)
+        
+        # Assert
+        assert success == True
+        mock_display.create_resource_object.assert_called_once_with('window', 42)
+        input_manager.root.translate_coords.assert_called_once_with(
+            mock_display.create_resource_object.return_value, 0, 0)
+        assert [call.args[1] for call in mock_fake_input.call_args_list] == [
+            Xlib.X.MotionNotify, Xlib.X.ButtonPress, Xlib.X.ButtonRelease, Xlib.X.MotionNotify]
+        assert mock_fake_input.call_args_list[0].kwargs == {'x': 150, 'y': 260}
+        mock_display.sync.assert_not_called()
+        mock_display.flush.assert_called_once()
+    
+    @patch('modules.input_manager.Xlib.display.Display')
+    @patch('modules.input_manager.xtest.fake_input')
+    def test_click_send_event(self, mock_fake_input, mock_display_class):
+        """Test that a click can be sent straight to the window without touching the pointer."""
+        # Setup
+        mock_display = mock_display_class.return_value
+        input_manager = InputManager(use_send_event=True)
+        input_manager.root.translate_coords.return_value = MagicMock(x=100, y=200)
+        window = mock_display.create_resource_object.return_value
+        
+        # Test
+        success = input_manager.click(50, 60, button=3, window_id=42)
+        
+        # Assert
+        assert success == True
+        press, release = [call.args[0] for call in window.send_event.call_args_list]
+        assert press.type == Xlib.X.ButtonPress and release.type == Xlib.X.ButtonRelease
+        assert (press.detail, press.event_x, press.event_y, press.root_x, press.root_y) == (3, 50, 60, 150, 260)
+        assert release.state == Xlib.X.Button3Mask
+        mock_fake_input.assert_not_called()
+        input_manager.root.query_pointer.assert_not_called()
+        mock_display.flush.assert_called_once()
+    
+    @patch('modules.input_manager.Xlib.display.Display')
+    @patch('modules.input_manager.xtest.fake_input')
+    def test_window_geometry_cache(self, mock_fake_input, mock_display_class):
+        """Test that window offsets are reused until they expire or are invalidated."""
+        # Setup
+        input_manager = InputManager()
+        input_manager.root.translate_coords.return_value = MagicMock(x=100, y=200)
+        
+        # Test
+        first = input_manager._to_root_coords(1, 2, 42)
+        second = input_manager._to_root_coords(3, 4, 42)
+        lookups = input_manager.root.translate_coords.call_count
+        input_manager.invalidate_geometry(42)
+        input_manager._to_root_coords(1, 2, 42)
+        input_manager.geometry_ttl = 0
+        input_manager._to_root_coords(1, 2, 42)
+        
+        # Assert
+        assert first == (101, 202)
+        assert second == (103, 204)
+        assert lookups == 1
+        assert input_manager.root.translate_coords.call_count == 3
+    
     @patch('modules.input_manager.Xlib.display.Display')
     @patch('modules.input_manager.Xlib.ext.xtest.fake_input')
     def test_type_text(self, mock_fake_input, mock_display_class):
@@ -78,6 +149,7 @@ class TestInputManager:
         mock_display = mock_display_class.return_value
         input_manager = InputManager(debug_mode=True)
         input_manager.display = mock_display
+        input_manager.has_xdotool = False
         
         # Mock string_to_keysym to return the char code
         input_manager._string_to_keysym = lambda c: ord(c)
@@ -96,6 +168,64 @@ class TestInputManager:
             mock_fake_input.assert_any_call(mock_display, X.KeyPress, keycode)
             mock_fake_input.assert_any_call(mock_display, X.KeyRelease, keycode)
     
+    @patch('modules.input_manager.Xlib.display.Display')
+    @patch('modules.input_manager.xtest.fake_input')
+    @patch('modules.input_manager.subprocess.run')
+    def test_type_text_xdotool(self, mock_run, mock_fake_input, mock_display_class):
+        """Test that whole strings are typed with one xdotool run, falling back to XTest."""
+        # Setup
+        mock_display = mock_display_class.return_value
+        input_manager = InputManager()
+        input_manager.display = mock_display
+        input_manager.has_xdotool = True
+        mock_run.return_value = MagicMock(returncode=0)
+        
+        # Test
+        success = input_manager.type_text("-v hello")
+        
+        # Assert
+        assert success == True
+        assert mock_run.call_args[0][0] == ["xdotool", "type", "--delay", "1", "--", "-v hello"]
+        mock_fake_input.assert_not_called()
+        
+        # Test fallback when xdotool fails
+        mock_run.return_value = MagicMock(returncode=1)
+        mock_display.sync.reset_mock()
+        success = input_manager.type_text("ab")
+        
+        # Assert
+        assert success == True
+        assert mock_fake_input.call_count == 4
+        mock_display.sync.assert_called_once()
+        
+        # Test XTest typing into a window without xdotool
+        input_manager.has_xdotool = False
+        mock_display.sync.reset_mock()
+        success = input_manager.type_text("ab", window_id=42)
+        
+        # Assert
+        assert success == True
+        mock_display.create_resource_object.return_value.set_input_focus.assert_called_once()
+        mock_display.sync.assert_called_once()  # focus and keys share one round-trip
+    
+    @patch('modules.input_manager.Xlib.display.Display')
+    @patch('modules.input_manager.xtest.fake_input')
+    def test_keycode_cache(self, mock_fake_input, mock_display_class):
+        """Test that each character's keycode is only looked up once."""
+        # Setup
+        mock_display = mock_display_class.return_value
+        mock_display.keysym_to_keycode.side_effect = lambda keysym: keysym % 256
+        input_manager = InputManager()
+        input_manager.has_xdotool = False
+        
+        # Test
+        input_manager.type_text("abba")
+        
+        # Assert
+        assert mock_display.keysym_to_keycode.call_count == 2
+        assert mock_fake_input.call_count == 8
+        assert input_manager._keycode_cache == {'a': ord('a'), 'b': ord('b')}
+    
     @patch('modules.input_manager.Xlib.display.Display')
     @patch('subprocess.run')
     def test_create_virtual_pointer(self, mock_run, mock_display_class):
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Tests for the Recorder module
+"""
+
+import os
+import sys
+import json
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from Xlib import X
+from Xlib.ext import record
+from Xlib.protocol import event as xevent
+
+# Add parent directory to path for importing modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import recorder as recorder_module
+from modules.recorder import ActionRecorder, ActionAnalyzer
+
+class TestActionRecorder:
+    """Tests for the ActionRecorder class."""
+    
+    def setup_method(self):
+        """Set up a recorder without an X connection."""
+        with patch('modules.recorder.Display'):
+            self.recorder = ActionRecorder(MagicMock(), MagicMock(), debug_mode=True)
+        self.recorder._set_window_geometry({'x': 100, 'y': 200, 'width': 800, 'height': 600, 'name': 'test'})
+        self.recorder._stop.clear()
+    
+    def test_click_analysis_off_record_thread(self):
+        """Test that OCR of a click runs in the background and its alternative follows the click."""
+        # Setup
+        release = threading.Event()
+        
+        def get_text_in_region(*args):
+            release.wait(5)
+            return ['Submit']
+        
+        self.recorder.image_processor.get_text_in_region.side_effect = get_text_in_region
+        event = MagicMock(root_x=150, root_y=260, detail=1)
+        
+        # Test
+        self.recorder._add_mouse_click_action(event, 1.0)
+        self.recorder._add_mouse_click_action(event, 2.0)
+        recorded_before = [action['type'] for action in self.recorder._pending]
+        release.set()
+        actions = self.recorder.stop_recording()
+        
+        # Assert
+        assert recorded_before == ['click_position', 'click_position']
+        assert [action['type'] for action in actions] == [
+            'click_position', 'click_text', 'click_position', 'click_text']
+        assert actions[1]['text'] == 'Submit'
+        assert actions[1]['is_alternative'] == True
+    
+    def test_process_event_filters_before_parsing(self):
+        """Test that only recorded event types for the target window are parsed."""
+        # Setup
+        self.recorder.debug_mode = False
+        self.recorder.target_window_id = 42
+        self.recorder.record_display = MagicMock()
+        self.recorder.record_display.display.event_classes = dict(xevent.event_class)
+        
+        def button_event(event_type, window, x, y):
+            return event_type(time=0, root=1, window=window, same_screen=1, child=0, root_x=x, root_y=y,
+                              event_x=0, event_y=0, state=0, detail=1)._binary
+        
+        data = b''.join([
+            button_event(xevent.MotionNotify, 42, 120, 220),
+            button_event(xevent.ButtonPress, 7, 130, 230),
+            button_event(xevent.ButtonPress, 42, 150, 260),
+            button_event(xevent.ButtonRelease, 42, 150, 260),
+        ])
+        reply = MagicMock(category=record.FromServer, client_swapped=False, data=data)
+        
+        # Test
+        field = recorder_module._EVENT_FIELD
+        with patch.object(field, 'parse_binary_value', wraps=field.parse_binary_value) as mock_parse:
+            self.recorder._process_event(reply)
+        
+        # Assert
+        assert mock_parse.call_count == 1
+        assert [(action['x'], action['y']) for action in self.recorder._pending] == [(50, 60)]
+    
+    def test_stop_recording_disables_context(self):
+        """Test that stopping disables the context from the other connection and leaves freeing to the thread."""
+        # Setup
+        ctx = MagicMock()
+        self.recorder.ctx = ctx
+        self.recorder.record_display = MagicMock()
+        
+        # Test
+        self.recorder.stop_recording()
+        
+        # Assert
+        assert self.recorder.is_recording == False
+        self.recorder.display.record_disable_context.assert_called_once_with(ctx)
+        self.recorder.record_display.record_free_context.assert_not_called()
+    
+    def test_record_thread_closes_connection(self):
+        """Test that the record connection only stays open while recording."""
+        # Setup
+        record_display = MagicMock()
+        self.recorder.record_display = record_display
+        self.recorder.ctx = ctx = MagicMock()
+        
+        # Test
+        self.recorder._record_thread()
+        
+        # Assert
+        record_display.record_enable_context.assert_called_once_with(ctx, self.recorder._process_event)
+        record_display.record_free_context.assert_called_once_with(ctx)
+        record_display.close.assert_called_once()
+        assert self.recorder.record_display is None
+        assert self.recorder.ctx is None
+    
+    def test_click_bounds(self):
+        """Test that only clicks inside the target window are recorded, in window coordinates."""
+        # Setup
+        self.recorder.debug_mode = False
+        
+        # Test
+        for root_x, root_y in ((150, 260), (99, 260), (150, 199), (901, 260), (900, 800)):
+            self.recorder._add_mouse_click_action(MagicMock(root_x=root_x, root_y=root_y, detail=1), 1.0)
+        
+        # Assert
+        assert [(action['x'], action['y']) for action in self.recorder._pending] == [(50, 60), (800, 600)]
+    
+    def test_keyboard_char_cache(self):
+        """Test that each keycode is translated once and modifiers are skipped."""
+        # Setup
+        keysyms = {38: ord('a'), 50: 0xffe1}
+        self.recorder.display.keycode_to_keysym.side_effect = lambda keycode, index: keysyms[keycode]
+        self.recorder.display.lookup_string.side_effect = chr
+        
+        # Test
+        for keycode in (38, 50, 38, 50, 38):
+            self.recorder._add_keyboard_action(MagicMock(detail=keycode), 1.0)
+        actions = self.recorder.stop_recording()
+        
+        # Assert
+        assert [action['text'] for action in actions] == ['aaa']
+        assert self.recorder.display.keycode_to_keysym.call_count == 2
+        assert self.recorder.display.lookup_string.call_count == 1
+    
+    def test_typed_text_joined(self):
+        """Test that keystrokes are buffered and joined into their type_text actions."""
+        # Setup
+        self.recorder.debug_mode = False
+        self.recorder.display.keycode_to_keysym.side_effect = lambda keycode, index: keycode
+        self.recorder.display.lookup_string.side_effect = chr
+        
+        # Test
+        for char, timestamp in (('h', 1.0), ('i', 1.5), ('y', 3.0), ('o', 3.2)):
+            self.recorder._add_keyboard_action(MagicMock(detail=ord(char)), timestamp)
+        self.recorder._add_mouse_click_action(MagicMock(root_x=150, root_y=260, detail=1), 3.5)
+        self.recorder._add_keyboard_action(MagicMock(detail=ord('u')), 3.6)
+        actions = self.recorder.stop_recording()
+        
+        # Assert
+        assert [(action['type'], action.get('text')) for action in actions] == [
+            ('type_text', 'hi'), ('type_text', 'yo'), ('click_position', None), ('type_text', 'u')]
+    
+    def test_normalize_action_timing(self):
+        """Test that timestamps become rounded delays of at least 0.1 seconds."""
+        # Setup
+        self.recorder.start_time = 10.0
+        self.recorder.actions = [
+            {'type': 'click_position', 'timestamp': 11.234},
+            {'type': 'click_text', 'timestamp': 11.234},
+            {'type': 'wait'},
+            {'type': 'type_text', 'timestamp': 13.0},
+        ]
+        
+        # Test
+        self.recorder._normalize_action_timing()
+        
+        # Assert
+        assert [action.get('delay') for action in self.recorder.actions] == [1.23, 0.1, None, 1.77]
+        assert not any('timestamp' in action for action in self.recorder.actions)
+        assert type(self.recorder.actions[0]['delay']) is float
+    
+    def test_save_recording(self, tmp_path):
+        """Test that alternatives are left out and missing delays default without changing the recording."""
+        # Setup
+        self.recorder.target_window_id = 42
+        self.recorder.actions = [
+            {'type': 'click_position', 'x': 1, 'y': 2, 'delay': 0.5},
+            {'type': 'click_text', 'text': 'OK', 'is_alternative': True},
+            {'type': 'type_text', 'text': 'hi'},
+        ]
+        path = tmp_path / "recording.json"
+        
+        # Test
+        success = self.recorder.save_recording(str(path))
+        
+        # Assert
+        assert success == True
+        saved = json.loads(path.read_text())
+        assert saved['actions'] == [
+            {'type': 'click_position', 'x': 1, 'y': 2, 'delay': 0.5},
+            {'type': 'type_text', 'text': 'hi', 'delay': 0.1},
+        ]
+        assert saved['metadata']['window_id'] == 42
+        assert 'delay' not in self.recorder.actions[2]
+
+class TestActionAnalyzer:
+    """Tests for the ActionAnalyzer class."""
+    
+    def test_optimize_action_sequence(self):
+        """Test that double-clicks and click-then-type pairs are merged in one pass."""
+        # Setup
+        analyzer = ActionAnalyzer(MagicMock(), MagicMock())
+        actions = [
+            {'type': 'click_position', 'x': 10, 'y': 10, 'button': 1, 'delay': 1.0},
+            {'type': 'click_position', 'x': 12, 'y': 11, 'button': 1, 'delay': 0.2},
+            {'type': 'click_position', 'x': 50, 'y': 50, 'button': 1, 'delay': 0.5},
+            {'type': 'type_text', 'text': 'hello', 'delay': 0.4},
+            {'type': 'click_text', 'text': 'OK', 'delay': 1.0},
+            {'type': 'click_position', 'x': 90, 'y': 90, 'button': 1, 'delay': 2.0},
+        ]
+        
+        # Test
+        optimized = analyzer.optimize_action_sequence(actions)
+        
+        # Assert
+        assert [action['type'] for action in optimized] == [
+            'click_position', 'click_and_type', 'click_text', 'wait', 'click_position']
+        assert optimized[0]['is_double_click'] == True
+        assert optimized[0]['delay'] == 0.2
+        assert optimized[1]['text'] == 'hello'
+        assert optimized[1]['delay'] == 0.4
+        assert 'is_double_click' not in actions[0]
+        assert analyzer.optimize_action_sequence([]) == []
@@ -7,6 +7,7 @@ import os
 import sys
 import pytest
 from unittest.mock import MagicMock, patch
+from Xlib import X
 
 # Add parent directory to path for importing modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -88,12 +89,40 @@ class TestWindowManager:
         assert windows[1]["id"] == 456
         assert windows[1]["name"] == "Browser"
     
+    @patch('modules.window_manager.subprocess')
+    @patch('modules.window_manager.Xlib.display.Display')
+    def test_list_windows_client_list(self, mock_display_class, mock_subprocess):
+        """Test listing windows from _NET_CLIENT_LIST without running xdotool."""
+        # Setup
+        mock_display = mock_display_class.return_value
+        window_manager = WindowManager(debug_mode=True)
+        window_manager.root.get_full_property.return_value = MagicMock(value=[123, 456])
+        
+        def create_window(resource_type, window_id):
+            window = MagicMock(id=window_id)
+            window.get_attributes.return_value.map_state = X.IsViewable if window_id == 123 else X.IsUnmapped
+            window.get_full_text_property.return_value = "Terminal"
+            window.get_geometry.return_value = MagicMock(x=0, y=0, width=800, height=600)
+            return window
+        
+        mock_display.create_resource_object.side_effect = create_window
+        window_manager._get_absolute_coordinates = MagicMock(return_value=(10, 20))
+        
+        # Test
+        windows = window_manager.list_windows()
+        
+        # Assert
+        assert windows == [{"id": 123, "name": "Terminal", "x": 10, "y": 20, "width": 800, "height": 600}]
+        mock_subprocess.check_output.assert_not_called()
+        mock_subprocess.call.assert_not_called()
+    
     @patch('modules.window_manager.Xlib.display.Display')
     def test_get_window_by_id(self, mock_display_class):
         """Test getting window by ID."""
         # Setup
         mock_display = mock_display_class.return_value
         mock_window = MagicMock()
+        mock_window.get_full_text_property.return_value = None
         mock_window.get_wm_name.return_value = "Test Window"
         mock_geometry = MagicMock()
         mock_geometry.width = 800
@@ -128,6 +157,50 @@ class TestWindowManager:
         # Assert
         assert window is None
     
+    @patch('modules.window_manager.Xlib.display.Display')
+    def test_get_window_name(self, mock_display_class):
+        """Test that titles come from _NET_WM_NAME first and are always strings."""
+        # Setup
+        window_manager = WindowManager()
+        window = MagicMock()
+        window.get_full_text_property.return_value = "Start — Mozilla Firefox"
+        
+        # Test/Assert
+        assert window_manager._get_window_name(window) == "Start — Mozilla Firefox"
+        window.get_full_text_property.assert_called_once_with(
+            window_manager._NET_WM_NAME, window_manager._UTF8_STRING)
+        window.get_wm_name.assert_not_called()
+        
+        # Test falling back to WM_NAME, left undecoded by Xlib
+        window.get_full_text_property.return_value = None
+        window.get_wm_name.return_value = b"Terminal"
+        assert window_manager._get_window_name(window) == "Terminal"
+        
+        # Test windows without a title
+        window.get_wm_name.return_value = b""
+        assert window_manager._get_window_name(window) == "Unnamed window"
+    
+    @patch('modules.window_manager.Xlib.display.Display')
+    def test_get_absolute_coordinates(self, mock_display_class):
+        """Test that absolute coordinates come from one translate_coords request."""
+        # Setup
+        window_manager = WindowManager(debug_mode=True)
+        window = MagicMock()
+        window_manager.root.translate_coords.return_value = MagicMock(x=310, y=420)
+        
+        # Test
+        coords = window_manager._get_absolute_coordinates(window, 10, 20)
+        window_manager.is_i3 = True
+        with patch('modules.window_manager.subprocess') as mock_subprocess:
+            i3_coords = window_manager._get_absolute_coordinates(window, 10, 20)
+        
+        # Assert
+        assert coords == (310, 420)
+        assert i3_coords == (310, 420)
+        window_manager.root.translate_coords.assert_called_with(window, 0, 0)
+        window.query_tree.assert_not_called()
+        mock_subprocess.check_output.assert_not_called()
+    
     @patch('modules.window_manager.Xlib.display.Display')
     def test_focus_window(self, mock_display_class):
         """Test focusing a window."""
@@ -156,6 +229,25 @@ class TestWindowManager:
         # Assert
         assert result is False
     
+    @patch('modules.window_manager.shutil.which')
+    @patch('modules.window_manager.subprocess')
+    def test_command_exists_cached(self, mock_subprocess, mock_which):
+        """Test that command lookups search the PATH once and don't run which."""
+        # Setup
+        WindowManager._command_exists.cache_clear()
+        mock_which.side_effect = lambda cmd: "/usr/bin/xdotool" if cmd == "xdotool" else None
+        
+        # Test
+        results = [WindowManager._command_exists("xdotool") for _ in range(3)]
+        missing = WindowManager._command_exists("xwininfo")
+        WindowManager._command_exists.cache_clear()
+        
+        # Assert
+        assert results == [True, True, True]
+        assert missing == False
+        assert mock_which.call_count == 2
+        mock_subprocess.call.assert_not_called()
+    
     @patch('modules.window_manager.Xlib.display.Display')
     def test_cleanup(self, mock_display_class):
         """Test cleanup method."""
@@ -31,7 +31,7 @@ except ImportError:
 pyautogui.FAILSAFE = False
 
 class WindowAutoclicker:
-    def __init__(self):
+    def __init__(self, cache_ttl: float = 0.25):
         self.display = display.Display()
         self.screen = self.display.screen()
         self.root = self.screen.root
@@ -42,6 +42,12 @@ class WindowAutoclicker:
         self.click_count = 0
         self.max_clicks = None  # Default: No limit
         self.click_positions = []  # List of positions to click
+        
+        # Window names and geometries looked up with xdotool, reused for
+        # cache_ttl seconds (0 disables caching): window_id -> (time, value)
+        self.cache_ttl = cache_ttl
+        self._name_cache = {}
+        self._geom_cache = {}
 
     def select_window(self):
         """Prompt user to click on a window to select it"""
@@ -55,6 +61,7 @@ class WindowAutoclicker:
         window_id = self.get_window_at_position(x, y)
         
         if window_id:
+            self.invalidate(window_id)
             self.selected_window = window_id
             window_name = self.get_window_name(window_id)
             print(f"Selected window: {window_name} (id: {window_id})")
@@ -82,8 +89,29 @@ class WindowAutoclicker:
                         pass
         return None
 
+    def invalidate(self, window_id: int):
+        """Drop the cached name and geometry of a window"""
+        self._name_cache.pop(window_id, None)
+        self._geom_cache.pop(window_id, None)
+
+    def _cached(self, cache: dict, window_id: int, lookup):
+        """Return lookup(window_id), reusing a result younger than cache_ttl"""
+        now = time.monotonic()
+        hit = cache.get(window_id)
+        if hit and now - hit[0] < self.cache_ttl:
+            return hit[1]
+        
+        value = lookup(window_id)
+        if self.cache_ttl > 0 and value is not None:
+            cache[window_id] = (now, value)
+        return value
+
     def get_window_name(self, window_id: int) -> str:
         """Get the window name from its ID"""
+        return self._cached(self._name_cache, window_id, self._query_window_name)
+
+    def _query_window_name(self, window_id: int) -> str:
+        """Look up the window name with xdotool"""
         result = subprocess.run(["xdotool", "getwindowname", str(window_id)], 
                                capture_output=True, text=True)
         if result.returncode == 0:
@@ -92,6 +120,10 @@ class WindowAutoclicker:
 
     def get_window_geometry(self, window_id: int) -> Optional[Tuple[int, int, int, int]]:
         """Get the geometry (position and size) of a window"""
+        return self._cached(self._geom_cache, window_id, self._query_window_geometry)
+
+    def _query_window_geometry(self, window_id: int) -> Optional[Tuple[int, int, int, int]]:
+        """Look up the window geometry with xdotool"""
         result = subprocess.run(["xdotool", "getwindowgeometry", "--shell", str(window_id)], 
                                capture_output=True, text=True)
         if result.returncode == 0:
@@ -13,8 +13,16 @@ import sys
 import subprocess
 import random
 import os
+import atexit
 from typing import Tuple, Optional, List
 
+# Check for optional dependencies
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+except ImportError:
+    HAVE_NUMPY = False
+
 try:
     from Xlib import display, X
     from Xlib.ext import xtest
@@ -24,9 +32,34 @@ except ImportError:
     from Xlib import display, X
     from Xlib.ext import xtest
 
+# Shared X display connection, opened on first use and closed at interpreter exit
+_DISPLAY = None
+
+def _get_display():
+    """Get the shared X display connection, opening it if needed"""
+    global _DISPLAY
+    if _DISPLAY is None:
+        _DISPLAY = display.Display()
+        atexit.register(_close_display)
+    return _DISPLAY
+
+def _close_display():
+    """Close the shared X display connection"""
+    global _DISPLAY
+    if _DISPLAY is not None:
+        _DISPLAY.close()
+        _DISPLAY = None
+
 class XTestAutoclicker:
+    __slots__ = (
+        "display", "root", "selected_window", "window_geometry", "is_running",
+        "click_interval", "jitter", "click_count", "max_clicks", "activate_window",
+        "click_delay", "click_positions", "_rng", "_random", "_jitter_batch", "_jitter_offsets",
+        "_jitter_index", "_jitter_value", "_np_rng",
+    )
+    
     def __init__(self):
-        self.display = display.Display()
+        self.display = _get_display()
         self.root = self.display.screen().root
         self.selected_window = None
         self.window_geometry = None
@@ -35,8 +68,21 @@ class XTestAutoclicker:
         self.jitter = 0  # Default: No jitter
         self.click_count = 0
         self.max_clicks = None  # Default: No limit
+        self.activate_window = True  # Default: Activate window before clicking
+        self.click_delay = 20  # Default: 20 ms between press and release
         self.click_positions = []  # List of positions to click
         
+        # Private generator, bound once so jittered clicks skip randint's overhead
+        self._rng = random.Random()
+        self._random = self._rng.random
+        
+        # Jitter offsets are sampled in batches and consumed one pair per click
+        self._jitter_batch = 256
+        self._jitter_offsets = []
+        self._jitter_index = 0
+        self._jitter_value = 0
+        self._np_rng = np.random.default_rng() if HAVE_NUMPY else None
+        
     def select_window_by_click(self):
         """Prompt user to click on a window to select it"""
         print("Click on the window you want to automate (you have 3 seconds)...")
@@ -136,6 +182,27 @@ class XTestAutoclicker:
         self.click_positions.append((relative_x, relative_y))
         print(f"Added click position: ({relative_x}, {relative_y})")
     
+    def get_mouse_position(self):
+        """Get the absolute pointer position, querying the X server directly"""
+        try:
+            # Reuses the open display connection instead of spawning xdotool
+            pointer = self.root.query_pointer()
+            return pointer.root_x, pointer.root_y
+        except Exception:
+            pass
+        
+        # Fall back to xdotool if the X query fails
+        result = subprocess.run(["xdotool", "getmouselocation", "--shell"], 
+                              capture_output=True, text=True, check=True)
+        
+        mouse_x, mouse_y = None, None
+        for line in result.stdout.splitlines():
+            if line.startswith("X="):
+                mouse_x = int(line.split("=")[1])
+            elif line.startswith("Y="):
+                mouse_y = int(line.split("=")[1])
+        return mouse_x, mouse_y
+    
     def capture_click_position(self):
         """Capture the current mouse position to add as a click position"""
         if not self.selected_window or not self.window_geometry:
@@ -146,15 +213,7 @@ class XTestAutoclicker:
         input()
         
         try:
-            result = subprocess.run(["xdotool", "getmouselocation", "--shell"], 
-                                  capture_output=True, text=True, check=True)
-            
-            mouse_x, mouse_y = None, None
-            for line in result.stdout.splitlines():
-                if line.startswith("X="):
-                    mouse_x = int(line.split("=")[1])
-                elif line.startswith("Y="):
-                    mouse_y = int(line.split("=")[1])
+            mouse_x, mouse_y = self.get_mouse_position()
             
             if mouse_x is not None and mouse_y is not None:
                 window_x, window_y, _, _ = self.window_geometry
@@ -166,24 +225,55 @@ class XTestAutoclicker:
         except subprocess.SubprocessError as e:
             print(f"Error getting mouse position: {e}")
     
-    def send_click_event(self, x, y, button=1):
-        """Send a synthetic click event using XTest at absolute coordinates"""
+    def sample_jitter_offsets(self, count):
+        """Sample count (x, y) jitter offsets in one batch"""
+        jitter = self.jitter
+        if self._np_rng is not None:
+            offsets = self._np_rng.integers(-jitter, jitter + 1, size=(count, 2), dtype=np.int32)
+            return offsets.tolist()
+        
+        rand = self._random
+        span = 2 * jitter + 1
+        return [[int(rand() * span) - jitter, int(rand() * span) - jitter]
+                for _ in range(count)]
+    
+    def next_jitter_offset(self):
+        """Get the next (x, y) jitter offset, refilling the batch when it runs out"""
+        index = self._jitter_index
+        if index >= len(self._jitter_offsets) or self._jitter_value != self.jitter:
+            self._jitter_offsets = self.sample_jitter_offsets(self._jitter_batch)
+            self._jitter_value = self.jitter
+            index = 0
+        
+        self._jitter_index = index + 1
+        return self._jitter_offsets[index]
+    
+    def send_click_event(self, x, y, button=1, flush=True):
+        """Send a synthetic click event using XTest at absolute coordinates
+        
+        Pass flush=False to queue several clicks and send them with flush_pending().
+        """
         try:
             # IMPORTANT: Do NOT use MotionNotify as it moves the actual cursor
             # Instead, pass coordinates directly to button events
             
-            # Simulate mouse down and up (click)
+            # Simulate mouse down and up (click). Both events are queued back to back;
+            # the server holds the release for click_delay ms, so we never block here,
+            # and a single flush sends them without waiting for a reply.
             xtest.fake_input(self.display, X.ButtonPress, button, x=x, y=y)
-            self.display.sync()
-            time.sleep(0.1)  # Small delay between press and release
-            xtest.fake_input(self.display, X.ButtonRelease, button, x=x, y=y)
-            self.display.sync()
+            xtest.fake_input(self.display, X.ButtonRelease, button, self.click_delay, x=x, y=y)
+            if flush:
+                self.display.flush()
             
             return True
         except Exception as e:
             print(f"Error sending XTest click event: {e}")
             return False
     
+    def flush_pending(self):
+        """Send all queued events to the X server without waiting for a reply"""
+        self.display.flush()
+    
     def click_at_window_position(self, window_id, rel_x, rel_y):
         """Click at a position relative to window using XTest (invisible to user)"""
         if not self.window_geometry:
@@ -194,10 +284,9 @@ class XTestAutoclicker:
         
         window_x, window_y, _, _ = self.window_geometry
         
-        # Apply optional jitter
+        # Apply optional jitter (uniform integer offset in [-jitter, jitter])
         if self.jitter > 0:
-            jitter_x = random.randint(-self.jitter, self.jitter)
-            jitter_y = random.randint(-self.jitter, self.jitter)
+            jitter_x, jitter_y = self.next_jitter_offset()
             target_x = window_x + rel_x + jitter_x
             target_y = window_y + rel_y + jitter_y
         else:
@@ -249,6 +338,10 @@ class XTestAutoclicker:
         self.is_running = True
         self.click_count = 0
         
+        # Snapshot the positions once; the loop only reads them
+        positions = tuple(self.click_positions)
+        position_count = len(positions)
+        
         try:
             position_index = 0
             while self.is_running:
@@ -258,13 +351,13 @@ class XTestAutoclicker:
                     break
                     
                 # Get next position to click
-                rel_x, rel_y = self.click_positions[position_index]
+                rel_x, rel_y = positions[position_index]
                 
                 # Send synthetic click at this position
                 self.click_at_window_position(self.selected_window, rel_x, rel_y)
                 
                 # Move to next position (cycling through the list)
-                position_index = (position_index + 1) % len(self.click_positions)
+                position_index = (position_index + 1) % position_count
                 
                 # Wait for next click
                 time.sleep(self.click_interval)
@@ -273,8 +366,9 @@ class XTestAutoclicker:
             print("\nStopping autoclicker")
             self.is_running = False
         finally:
-            # Clean up X display connection
-            self.display.close()
+            # Send any queued clicks; the shared connection stays open for the
+            # other instances using it and is closed at exit
+            self.flush_pending()
 
 def main():
     parser = argparse.ArgumentParser(description="Automate clicking in a specific window without moving your cursor")
@@ -282,6 +376,8 @@ def main():
                        help="Time between clicks in seconds (default: 1.0)")
     parser.add_argument("--jitter", type=int, default=0,
                        help="Random jitter in pixels (default: 0)")
+    parser.add_argument("--click-delay", type=int, default=20,
+                       help="Delay between press and release in milliseconds (default: 20)")
     parser.add_argument("--clicks", type=int,
                        help="Maximum number of clicks (default: unlimited)")
     parser.add_argument("--window-name", type=str,
@@ -303,6 +399,7 @@ def main():
     clicker = XTestAutoclicker()
     clicker.click_interval = args.interval
     clicker.jitter = args.jitter
+    clicker.click_delay = args.click_delay
     clicker.max_clicks = args.clicks
     clicker.activate_window = not args.no_activate
     